@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Backfill school coordinates and government contact fields on the School table
+
+Usage:
+    python backfill_school_coordinates.py           # geocode schools without stored coordinates
+    python backfill_school_coordinates.py --force   # re-geocode every school
+"""
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from flask import Flask
+
+from src.config import get_database_url
+from src.models.user import db
+from src.services import government_data
+from src.services.school_locations import backfill_school_coordinates
+from src.services.schema import upgrade_schema
+
+def create_app():
+    """Create Flask app for the backfill, without the web app's startup work and background jobs"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    # Government school data is read from the local mirror
+    government_data.init_app(app)
+    return app
+
+if __name__ == "__main__":
+    app = create_app()
+    force = '--force' in sys.argv[1:]
+    print(f"🚀 Starting school coordinate backfill{' (forced)' if force else ''}...")
+
+    with app.app_context():
+        # Create tables, columns and indexes the web app would create on startup
+        db.create_all()
+        upgrade_schema()
+        located = backfill_school_coordinates(force=force)
+
+    if located:
+        print(f"\n🎉 Backfill completed - {len(located)} schools located")
+    else:
+        print("\n❌ Backfill failed - no schools could be located. Check errors above.")
+
+    sys.exit(0 if located else 1)
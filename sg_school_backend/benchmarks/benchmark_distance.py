@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scalar haversine loop vs NumPy batch distance engine
+
+Usage:
+    python benchmarks/benchmark_distance.py [schools] [origins]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.distance import haversine_matrix, haversine_vector
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    """Scalar haversine distance in km, the reference for the batch engine"""
+    R = 6371  # Earth's radius in kilometers
+
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+
+    a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+    return R * c
+
+def best_of(func, repeat=5):
+    """Return the fastest wall time of several runs in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    school_count = int(sys.argv[1]) if len(sys.argv) > 1 else 180
+    origin_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    rng = np.random.default_rng(42)
+    # Random points spread over mainland Singapore
+    school_lats = rng.uniform(1.25, 1.45, school_count)
+    school_lons = rng.uniform(103.62, 104.00, school_count)
+    origin_lats = rng.uniform(1.25, 1.45, origin_count)
+    origin_lons = rng.uniform(103.62, 104.00, origin_count)
+
+    school_points = list(zip(school_lats.tolist(), school_lons.tolist()))
+    origin_points = list(zip(origin_lats.tolist(), origin_lons.tolist()))
+
+    print(f"📏 Distance benchmark: {origin_count} origins x {school_count} schools\n")
+
+    # One origin against every school
+    origin_lat, origin_lon = origin_points[0]
+    scalar_single = best_of(lambda: [calculate_distance(origin_lat, origin_lon, lat, lon) for lat, lon in school_points])
+    vector_single = best_of(lambda: haversine_vector(origin_lat, origin_lon, school_lats, school_lons))
+    print(f"1 x {school_count}:")
+    print(f"  scalar loop : {scalar_single * 1e6:10.1f} µs")
+    print(f"  numpy vector: {vector_single * 1e6:10.1f} µs  ({scalar_single / vector_single:.1f}x faster)")
+
+    # Many origins against every school
+    scalar_matrix = best_of(lambda: [[calculate_distance(o_lat, o_lon, lat, lon) for lat, lon in school_points]
+                                     for o_lat, o_lon in origin_points], repeat=3)
+    vector_matrix = best_of(lambda: haversine_matrix(origin_lats, origin_lons, school_lats, school_lons), repeat=3)
+    print(f"\n{origin_count} x {school_count}:")
+    print(f"  scalar loop : {scalar_matrix * 1e3:10.2f} ms")
+    print(f"  numpy matrix: {vector_matrix * 1e3:10.2f} ms  ({scalar_matrix / vector_matrix:.1f}x faster)")
+
+    # Results must agree with the scalar reference
+    reference = np.array([[calculate_distance(o_lat, o_lon, lat, lon) for lat, lon in school_points]
+                          for o_lat, o_lon in origin_points[:50]])
+    max_error = float(np.max(np.abs(reference - haversine_matrix(origin_lats[:50], origin_lons[:50], school_lats, school_lons))))
+    print(f"\n✓ Max absolute difference vs scalar haversine: {max_error:.2e} km")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory and time to first byte of the full-dataset responses,
+building the /database payload from the database vs streaming /export
+
+The bundled dataset is copied into an in-memory SQLite database several
+times to stand in for more years and school levels. Memory is the Python
+allocation peak measured with tracemalloc.
+
+Usage:
+    python benchmarks/benchmark_export.py [copies]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+from flask import Flask
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.initialize_db import initialize_database_if_empty
+from src.models.user import db, School, SCHOOL_FULL_LOAD
+from src.services.export import csv_chunks, ndjson_chunks
+from src.services.json_provider import FastJSONProvider
+
+def add_copies(copies):
+    """Duplicate the bundled schools copies - 1 times under new keys"""
+    columns = [column.name for column in School.__table__.columns if column.name != 'id']
+    originals = School.query.count()
+    with db.engine.begin() as connection:
+        for copy in range(1, copies):
+            selected = ', '.join(f"school_key || '_{copy}'" if column == 'school_key' else column for column in columns)
+            connection.execute(text(f"INSERT INTO school ({', '.join(columns)}) "
+                                    f"SELECT {selected} FROM school WHERE id <= :originals"), {'originals': originals})
+
+def database_payload(app):
+    """The /database SQL path: every row and to_dict() in memory, then one JSON document"""
+    schools = School.query.options(*SCHOOL_FULL_LOAD).all()
+    body = app.json.dumps({'schools': [school.to_dict() for school in schools], 'total_count': len(schools)})
+    yield body
+
+def measure(chunks):
+    """(time to first chunk, total time, peak MB, bytes) for one response body"""
+    db.session.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in chunks():
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak / 1024 / 1024, size
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.json = FastJSONProvider(app)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        initialize_database_if_empty(db, School)
+        add_copies(copies)
+        total = School.query.count()
+
+        print(f"\n📦 Export benchmark: {total} schools ({copies} copies of the dataset)\n")
+        for name, chunks in (('/database (in memory)', lambda: database_payload(app)),
+                             ('/export NDJSON', ndjson_chunks),
+                             ('/export CSV', csv_chunks)):
+            first, elapsed, peak, size = measure(chunks)
+            print(f"  {name:22s} first byte {first * 1e3:8.1f} ms, total {elapsed * 1e3:8.1f} ms, "
+                  f"peak {peak:7.1f} MB, {size / 1024 / 1024:.1f} MB written")
+
+if __name__ == "__main__":
+    main()
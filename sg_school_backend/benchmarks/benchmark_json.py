@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Flask's stdlib JSON provider vs FastJSONProvider on the
+/database and /search response payloads
+
+FastJSONProvider uses orjson when it is installed; without it this measures
+the stdlib fallback.
+
+Usage:
+    python benchmarks/benchmark_json.py [repeat]
+"""
+import json
+import os
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.user import School
+from src.services.json_provider import FastJSONProvider
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'src', 'database', 'p1_2024_complete_data.json')
+
+def load_schools():
+    """Transient School objects built the way initialize_db stores them"""
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        schools = json.load(f)['schools']
+
+    result = []
+    for index, school in enumerate(schools):
+        phases = school.get('phases', {})
+        result.append(School(
+            school_key=f"school_{index}",
+            name=school['name'],
+            total_vacancy=school.get('total_vacancies', 0),
+            balloted=any(isinstance(phase, dict) and phase.get('balloting') for phase in phases.values()),
+            year=2024,
+            phase_1_data=json.dumps(phases.get('phase_1', {})),
+            phase_2a_data=json.dumps(phases.get('phase_2a', {})),
+            phase_2b_data=json.dumps(phases.get('phase_2b', {})),
+            phase_2c_data=json.dumps(phases.get('phase_2c', {})),
+            phase_2c_supp_data=json.dumps(phases.get('phase_2c_supplementary', {})),
+            competitiveness_metrics=json.dumps({'overall_score': 1.5, 'tier': 'Medium', 'balloting_phases': []}),
+            overall_competitiveness_score=1.5,
+            competitiveness_tier='Medium',
+            address=f"{index} SCHOOL ROAD",
+            postal_code=f"{500000 + index}",
+            latitude=1.35,
+            longitude=103.8
+        ))
+    return result
+
+def database_payload(schools):
+    return {'schools': [school.to_dict() for school in schools], 'total_count': len(schools)}
+
+def search_payload(schools, count=30):
+    results = []
+    for index, school in enumerate(schools[:count]):
+        results.append({
+            'name': school.name.upper(),
+            'address': school.address,
+            'postal_code': school.postal_code,
+            'phone': '60000000',
+            'email': 'school@moe.edu.sg',
+            'website': 'https://www.moe.gov.sg',
+            'mrt_desc': 'MRT',
+            'bus_desc': 'BUS',
+            'latitude': school.latitude,
+            'longitude': school.longitude,
+            'distance': round(0.1 * index, 2),
+            'p1_data': school.to_p1_data_format()
+        })
+    return {'user_location': {'latitude': 1.35, 'longitude': 103.8, 'address': 'BLK 1'},
+            'schools': results, 'total_found': len(results)}
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    app = Flask(__name__)
+    stdlib_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+
+    schools = load_schools()
+    payloads = {'/database': database_payload(schools), '/search': search_payload(schools)}
+
+    print(f"⚡ JSON encoding benchmark (FastJSONProvider backend: {fast_provider.backend}), best of {repeat}\n")
+    with app.app_context():
+        for name, payload in payloads.items():
+            stdlib_body = stdlib_provider.response(payload).get_data()
+            fast_body = fast_provider.response(payload).get_data()
+            assert json.loads(stdlib_body) == json.loads(fast_body), f"{name}: encoders disagree"
+
+            stdlib_time = best_of(lambda: stdlib_provider.response(payload), repeat)
+            fast_time = best_of(lambda: fast_provider.response(payload), repeat)
+            print(f"{name} ({len(fast_body) / 1024:.0f} KB):")
+            print(f"  stdlib json: {stdlib_time * 1e3:8.2f} ms  ({len(stdlib_body) / stdlib_time / 1e6:7.1f} MB/s)")
+            print(f"  fast       : {fast_time * 1e3:8.2f} ms  ({len(fast_body) / fast_time / 1e6:7.1f} MB/s, "
+                  f"{stdlib_time / fast_time:.1f}x faster)\n")
+
+        # Non-finite floats are encoded the same way by both backends
+        print(f"✓ float('inf') encodes as {fast_provider.dumps({'ratio_2c': float('inf')})}")
+
+if __name__ == "__main__":
+    main()
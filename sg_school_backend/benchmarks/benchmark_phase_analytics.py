@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: competitiveness analysis of every school (phase ratios, most
+competitive phase, success rate, score percentile) from per-school Python
+dicts vs from the arrays of a PhaseStatsStore
+
+The store itself is built once per dataset version; its build time is
+reported separately. The bundled dataset is repeated to stand in for several
+years of data.
+
+Usage:
+    python benchmarks/benchmark_phase_analytics.py [copies] [repeat]
+"""
+import bisect
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.user import School, PHASE_NAMES
+from src.services.phase_analytics import (PhaseStatsStore, competitiveness_scores, most_competitive_phases,
+                                          phase_matrix, phase_ratios, score_percentiles)
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'src', 'database', 'p1_2024_complete_data.json')
+
+def load_phases(copies):
+    """Normalized phase dictionaries per school, as the snapshot holds them"""
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        schools = json.load(f)['schools']
+
+    phases_by_school = []
+    for school in schools:
+        source = school.get('phases', {})
+        row = School(**{f"{phase_name}_data": json.dumps(source.get(phase_name, {}))
+                        for phase_name in PHASE_NAMES if phase_name != 'phase_2c_supp'},
+                     phase_2c_supp_data=json.dumps(source.get('phase_2c_supplementary', {})))
+        phases_by_school.append({phase_name: row.get_phase_data(phase_name) for phase_name in PHASE_NAMES})
+    return phases_by_school * copies
+
+def per_school(phases_by_school, scores):
+    """The per-school Python analysis the store replaces"""
+    helper = School()
+    ranked = sorted(scores)
+    results = []
+    for phases, score in zip(phases_by_school, scores):
+        total_applicants = sum(phase.get('applicants', 0) for phase in phases.values())
+        total_taken = sum(phase.get('taken', 0) for phase in phases.values())
+        at_or_below = bisect.bisect_right(ranked, score)
+        results.append((
+            helper._get_most_competitive_phase(phases),
+            (total_taken / total_applicants) * 100 if total_applicants > 0 else 0,
+            round(at_or_below / len(ranked) * 100, 1)
+        ))
+    return results
+
+def columnar(store):
+    """The same analysis for all schools at once from the store's arrays"""
+    ratios = phase_ratios(store.applicants, store.vacancies)
+    success_rates = phase_ratios(store.taken.sum(axis=1), store.applicants.sum(axis=1)) * 100
+    return most_competitive_phases(ratios), success_rates, score_percentiles(store.scores)
+
+def as_rows(most_competitive, success_rates, percentiles):
+    # No applicants: NaN in the arrays, 0 from the per-school version
+    return [(phase, 0 if math.isnan(rate) else rate, percentile)
+            for phase, rate, percentile in zip(most_competitive.tolist(), success_rates.tolist(), percentiles.tolist())]
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    phases_by_school = load_phases(copies)
+    scores = competitiveness_scores(phase_matrix(phases_by_school, 'vacancies'),
+                                    phase_matrix(phases_by_school, 'applicants')).tolist()
+
+    start = time.perf_counter()
+    store = PhaseStatsStore(phases_by_school, scores)
+    build_time = time.perf_counter() - start
+
+    print(f"🧮 Phase analytics benchmark: {len(phases_by_school)} schools, best of {repeat}\n")
+    assert per_school(phases_by_school, scores) == as_rows(*columnar(store)), "results differ"
+
+    python_time = best_of(lambda: per_school(phases_by_school, scores), repeat)
+    store_time = best_of(lambda: columnar(store), repeat)
+    print(f"  store build (once per version): {build_time * 1e3:8.2f} ms\n")
+    print(f"  per-school dicts: {python_time * 1e3:8.2f} ms")
+    print(f"  store arrays    : {store_time * 1e3:8.2f} ms  ({python_time / store_time:.1f}x faster)")
+    print("\n✓ Both produce identical results")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Guard: request validation and conditional GET of the school endpoints
+
+Loads the bundled P1 data into an in-memory SQLite database, sends valid and
+invalid parameters and If-None-Match revalidations to the school endpoints
+through the Flask test client and exits with status 1 when a response status
+is not the expected one (e.g. a 500 for a malformed parameter instead of a
+400, or a 304 for a representation the client would not be served).
+Addresses are geocoded to a fixed point, so no external API is called.
+
+Usage:
+    python benchmarks/check_api_validation.py
+"""
+import os
+import sys
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.initialize_db import initialize_database_if_empty
+from src.models.user import db, School
+from src.routes import schools
+from src.services.json_provider import FastJSONProvider
+from src.services.phase_stats import ensure_phase_stats
+from src.services.schema import upgrade_schema
+
+# Central Singapore
+FIXED_LOCATION = {'latitude': 1.3521, 'longitude': 103.8198, 'address': 'SINGAPORE'}
+
+def post(path, body):
+    return lambda client: client.post(f'/api/schools{path}', json=body)
+
+def get(path, **params):
+    return lambda client: client.get(f'/api/schools{path}', query_string=params)
+
+def accept_encoding(gzip):
+    return {'Accept-Encoding': 'gzip' if gzip else 'identity'}
+
+def revalidate(path, served_gzip, request_gzip, **params):
+    """Fetch path, then revalidate its ETag with or without accepting gzip"""
+    def send(client):
+        first = client.get(f'/api/schools{path}', query_string=params, headers=accept_encoding(served_gzip))
+        headers = {**accept_encoding(request_gzip), 'If-None-Match': first.headers.get('ETag', '')}
+        return client.get(f'/api/schools{path}', query_string=params, headers=headers)
+    return send
+
+LOCATION = {'latitude': 1.35, 'longitude': 103.82, 'sort': 'distance'}
+
+# name: (request function taking the test client, expected status)
+CHECKS = {
+    'search radius default': (post('/search', {'address': 'x'}), 200),
+    'search radius number': (post('/search', {'address': 'x', 'radius': 3.5}), 200),
+    'search radius string': (post('/search', {'address': 'x', 'radius': '5'}), 200),
+    'search radius non-numeric string': (post('/search', {'address': 'x', 'radius': 'far'}), 400),
+    'search radius null': (post('/search', {'address': 'x', 'radius': None}), 400),
+    'search radius bool': (post('/search', {'address': 'x', 'radius': True}), 400),
+    'search radius negative': (post('/search', {'address': 'x', 'radius': -1}), 400),
+    'search radius too large': (post('/search', {'address': 'x', 'radius': 1000}), 400),
+    'nearest k default': (post('/nearest', {'address': 'x'}), 200),
+    'nearest k integer': (post('/nearest', {'address': 'x', 'k': 3}), 200),
+    'nearest k integer string': (post('/nearest', {'address': 'x', 'k': '7'}), 200),
+    'nearest k whole float': (post('/nearest', {'address': 'x', 'k': 4.0}), 200),
+    'nearest k bool': (post('/nearest', {'address': 'x', 'k': True}), 400),
+    'nearest k fractional float': (post('/nearest', {'address': 'x', 'k': 2.9}), 400),
+    'nearest k null': (post('/nearest', {'address': 'x', 'k': None}), 400),
+    'nearest k zero': (post('/nearest', {'address': 'x', 'k': 0}), 400),
+    'nearest k too large': (post('/nearest', {'address': 'x', 'k': 51}), 400),
+    'rankings default page': (get('/rankings'), 200),
+    'rankings limit 0': (get('/rankings', limit=0), 200),
+    'rankings limit at maximum': (get('/rankings', limit=500), 200),
+    'rankings negative limit': (get('/rankings', limit=-1), 400),
+    'rankings limit above maximum': (get('/rankings', limit=501), 400),
+    'rankings negative offset': (get('/rankings', offset=-1), 400),
+    'rankings sorted negative offset': (get('/rankings', sort='ratio_2c', offset=-5), 400),
+    'database gzip tag, gzip accepted': (revalidate('/database', True, True), 304),
+    'database identity tag, gzip not accepted': (revalidate('/database', False, False), 304),
+    'database gzip tag, gzip not accepted': (revalidate('/database', True, False), 200),
+    'database identity tag, gzip accepted': (revalidate('/database', False, True), 200),
+    'rankings near a location (never gzipped), gzip accepted': (revalidate('/rankings', True, True, **LOCATION), 304),
+}
+
+def create_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.json = FastJSONProvider(app)
+    db.init_app(app)
+    app.register_blueprint(schools.schools_bp, url_prefix='/api/schools')
+    return app
+
+def main():
+    app = create_app()
+    schools.geocode_address = lambda address: dict(FIXED_LOCATION)
+
+    failed = False
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
+        initialize_database_if_empty(db, School)
+        ensure_phase_stats()
+
+    client = app.test_client()
+    print("\n🧪 Request validation\n")
+    for name, (send, expected) in CHECKS.items():
+        response = send(client)
+        ok = response.status_code == expected
+        failed = failed or not ok
+        body = response.get_json(silent=True)
+        error = f" - {body['error']}" if isinstance(body, dict) and 'error' in body else ''
+        print(f"{'✓' if ok else '✗'} {name}: {response.status_code} (expected {expected}){error}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Guard: queries and loaded bytes per list-endpoint database path
+
+Loads the bundled P1 data into an in-memory SQLite database and runs the
+database queries behind /rankings, /search-by-name and the school snapshot.
+For each one it counts the SQL statements, the bytes of column data loaded
+and the heavy Text columns that were selected. It exits with status 1 when a
+path goes over its query budget or selects a heavy column it does not use.
+
+Usage:
+    python benchmarks/check_query_footprint.py
+"""
+import os
+import sys
+
+from flask import Flask
+from sqlalchemy import event, inspect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.initialize_db import initialize_database_if_empty
+from src.models.user import db, School, PHASE_NAMES
+from src.services.rankings import query_rankings
+from src.services.name_search import load_database_rows
+from src.services.phase_stats import ensure_phase_stats
+from src.services.school_snapshot import build_school_snapshot
+
+HEAVY_COLUMNS = [f"{phase_name}_data" for phase_name in PHASE_NAMES] + ['competitiveness_metrics', 'mrt_desc', 'bus_desc']
+
+# name: (load function, query budget, heavy columns the path may select)
+CHECKS = {
+    'rankings': (lambda: query_rankings(None, None, 50, 0)[0], 2, set()),
+    'rankings?competitiveness=High&balloted=true': (lambda: query_rankings('High', True, 50, 0)[0], 2, set()),
+    'search-by-name index': (load_database_rows, 1, set()),
+    'school snapshot': (lambda: build_school_snapshot().records, 2, set(HEAVY_COLUMNS)),
+}
+
+def loaded_bytes(item):
+    """Approximate size of the column values an ORM object or row holds"""
+    if isinstance(item, School):
+        # Loaded columns of the row and of its selectin-loaded PhaseStat rows
+        objects = [item] + list(item.__dict__.get('phase_stats', []))
+        values = [obj.__dict__[column.key] for obj in objects
+                  for column in inspect(obj).mapper.column_attrs if column.key in obj.__dict__]
+    elif hasattr(item, '_mapping'):
+        values = list(item._mapping.values())
+    else:
+        # Snapshot records: the row's fields plus its parsed phases and metrics
+        values = [getattr(item, field) for field in item.__slots__]
+    return sum(len(str(value)) for value in values if value is not None)
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    statements = []
+    failed = False
+    with app.app_context():
+        db.create_all()
+        initialize_database_if_empty(db, School)
+        ensure_phase_stats()
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        print("\n📏 Query footprint per database path\n")
+        for name, (load, query_budget, allowed_columns) in CHECKS.items():
+            db.session.expunge_all()
+            statements.clear()
+            items = load()
+            size = sum(loaded_bytes(item) for item in items)
+
+            selected = {column for column in HEAVY_COLUMNS
+                        for statement in statements if f"school.{column}" in statement}
+            problems = []
+            if len(statements) > query_budget:
+                problems.append(f"{len(statements)} queries (budget {query_budget})")
+            if selected - allowed_columns:
+                problems.append(f"selects {', '.join(sorted(selected - allowed_columns))}")
+            failed = failed or bool(problems)
+
+            status = '✗' if problems else '✓'
+            print(f"{status} {name}: {len(statements)} queries, {len(items)} rows, {size / 1024:.1f} KB loaded"
+                  + (f" - {'; '.join(problems)}" if problems else ''))
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Guard: query plans of the hot database paths
+
+Runs the database queries behind /rankings (every filter combination and a
+cursor page), /database/<key>, /school-detail, the competitiveness percentile
+and the unmatched-alias report, captures each SQL statement and its EXPLAIN
+plan, and exits with status 1 when a plan contains a sequential scan of a
+table. Full index scans (SQLite "SCAN ... USING INDEX") are fine.
+
+By default the bundled P1 data is loaded into an in-memory SQLite database.
+Pass a database URL to check another database, e.g. PostgreSQL; there the
+planner is run with enable_seqscan off, so a sequential scan means no usable
+index exists rather than that the table is small.
+
+Usage:
+    python benchmarks/check_query_plans.py [database_url]
+"""
+import os
+import re
+import sys
+
+from flask import Flask
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.initialize_db import initialize_database_if_empty
+from src.models.user import db, School
+from src.routes.schools import query_school_by_key, query_school_by_name
+from src.services.name_aliases import get_unmatched_aliases
+from src.services.phase_stats import ensure_phase_stats
+from src.services.rankings import query_rankings
+from src.services.schema import upgrade_schema
+
+# Plan lines that read a whole table without an index
+SEQUENTIAL_SCANS = {
+    'sqlite': re.compile(r'^SCAN (\w+)\b(?! USING)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+def first_school():
+    return School.query.order_by(School.id).first()
+
+def rankings_cursor_page():
+    # Keyset page after the 50th school
+    last = query_rankings(None, None, 50, 0)[0][-1]
+    return lambda: query_rankings(None, None, 50, after=(last.overall_competitiveness_score, last.id, 50))
+
+# name: function returning the load to check (called once to set up, e.g. to find a school key)
+CHECKS = {
+    'rankings': lambda: lambda: query_rankings(None, None, 50, 0),
+    'rankings?competitiveness=High': lambda: lambda: query_rankings('High', None, 50, 0),
+    'rankings?balloted=true': lambda: lambda: query_rankings(None, True, 50, 0),
+    'rankings?competitiveness=High&balloted=true': lambda: lambda: query_rankings('High', True, 50, 0),
+    'rankings?cursor=': rankings_cursor_page,
+    'database/<key>': lambda: (lambda key: lambda: query_school_by_key(key))(first_school().school_key),
+    'school-detail/<name>': lambda: (lambda name: lambda: query_school_by_name(name.upper()))(first_school().name),
+    'school-detail/<pattern>': lambda: (lambda name: lambda: query_school_by_name(name[:6] + '%'))(first_school().name),
+    'competitiveness percentile': lambda: first_school().get_competitiveness_percentile,
+    'unmatched aliases': lambda: get_unmatched_aliases,
+}
+
+# Pattern lookups can only use an index through pg_trgm
+POSTGRESQL_ONLY = {'school-detail/<pattern>'}
+
+def explain(connection, dialect, statement, parameters):
+    """Plan lines of one captured statement"""
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[-1] for row in rows]
+    return [row[0] for row in connection.exec_driver_sql('EXPLAIN ' + statement, parameters)]
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = sys.argv[1] if len(sys.argv) > 1 else 'sqlite://'
+    db.init_app(app)
+
+    statements = []
+    failed = False
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
+        initialize_database_if_empty(db, School)
+        ensure_phase_stats()
+
+        dialect = db.engine.dialect.name
+        sequential_scan = SEQUENTIAL_SCANS.get(dialect)
+        if sequential_scan is None:
+            print(f"Unsupported database dialect: {dialect}")
+            sys.exit(2)
+
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters)))
+
+        print(f"\n🔎 Query plans per hot path ({dialect})\n")
+        for name, setup in CHECKS.items():
+            if name in POSTGRESQL_ONLY and dialect != 'postgresql':
+                print(f"- {name}: skipped (PostgreSQL only)")
+                continue
+
+            load = setup()
+            db.session.expunge_all()
+            statements.clear()
+            load()
+            captured = list(statements)
+
+            with db.engine.connect() as connection:
+                if dialect == 'postgresql':
+                    connection.exec_driver_sql('SET enable_seqscan = off')
+                plans = [(statement, explain(connection, dialect, statement, parameters))
+                         for statement, parameters in captured]
+
+            scans = sorted({match.group(1) for _, plan in plans for line in plan
+                            for match in [sequential_scan.search(line.strip())] if match})
+            failed = failed or bool(scans)
+            status = '✗' if scans else '✓'
+            print(f"{status} {name}: {len(plans)} queries"
+                  + (f" - sequential scan of {', '.join(scans)}" if scans else ''))
+            if scans:
+                for statement, plan in plans:
+                    print(f"    {' '.join(statement.split())[:160]}")
+                    for line in plan:
+                        print(f"      {line}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
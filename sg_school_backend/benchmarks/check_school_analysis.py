@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Guard: per-school analysis values are in range and agree between paths
+
+Loads the bundled P1 data into an in-memory SQLite database and, for every
+school, computes the overall success rate, most competitive phase and
+competitiveness percentile both with the School model methods (the SQL path)
+and from the snapshot's PhaseStatsStore. Exits with status 1 when a rate or
+percentile lies outside 0..100, a phase is not a known phase, or the two
+paths disagree.
+
+Usage:
+    python benchmarks/check_school_analysis.py [database_url]
+"""
+import math
+import os
+import sys
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.initialize_db import initialize_database_if_empty
+from src.models.user import db, School, PHASE_NAMES, SCHOOL_FULL_LOAD
+from src.services.school_snapshot import build_school_snapshot
+
+def in_percent_range(value):
+    return value is not None and math.isfinite(value) and 0 <= value <= 100
+
+def analysis(school):
+    return {
+        'overall_success_rate': school.calculate_overall_success_rate(),
+        'most_competitive_phase': school.get_most_competitive_phase(),
+        'competitiveness_percentile': school.get_competitiveness_percentile(),
+    }
+
+def problems(school, model, store):
+    """Descriptions of everything wrong with one school's analysis"""
+    found = []
+    for path, values in (('model', model), ('store', store)):
+        if not in_percent_range(values['overall_success_rate']):
+            found.append(f"{path} overall_success_rate {values['overall_success_rate']}")
+        percentile = values['competitiveness_percentile']
+        if percentile is not None and not in_percent_range(percentile):
+            found.append(f"{path} competitiveness_percentile {percentile}")
+        if values['most_competitive_phase'] not in PHASE_NAMES + [None]:
+            found.append(f"{path} most_competitive_phase {values['most_competitive_phase']!r}")
+    for field in model:
+        if model[field] != store[field] and not (isinstance(model[field], float)
+                                                 and math.isclose(model[field], store[field] or 0.0)):
+            found.append(f"{field} differs: model {model[field]!r}, store {store[field]!r}")
+    return found
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = sys.argv[1] if len(sys.argv) > 1 else 'sqlite://'
+    db.init_app(app)
+
+    failed = 0
+    with app.app_context():
+        db.create_all()
+        initialize_database_if_empty(db, School)
+        snapshot = build_school_snapshot()
+        schools = School.query.options(*SCHOOL_FULL_LOAD).order_by(School.id).all()
+
+        print(f"\n🔎 Analysis of {len(schools)} schools\n")
+        for school in schools:
+            found = problems(school, analysis(school), analysis(snapshot.by_key[school.school_key]))
+            if found:
+                failed += 1
+                print(f"✗ {school.name}")
+                for problem in found:
+                    print(f"    {problem}")
+
+    print(f"\n{'✗' if failed else '✓'} {failed} of {len(schools)} schools with problems")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Build the offline postal code table from coordinates already known to the app
+
+Collects postal codes from School rows (filled by backfill_school_coordinates.py)
+and from positive GeocodeCache entries whose address contains a postal code, then
+writes them to src/database/postal_codes.csv (or POSTAL_CODES_FILE).
+
+Usage:
+    python build_postal_code_table.py [output.csv]
+"""
+import csv
+import os
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from flask import Flask
+
+from src.config import get_database_url
+from src.models.user import db, School, GeocodeCache
+from src.services.postal_codes import DEFAULT_POSTAL_CODES_FILE, extract_postal_code, load_postal_code_table
+
+def create_app():
+    """Create Flask app for building the table, without the web app's startup work and background jobs"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def collect_postal_codes():
+    """Return {postal_code: (latitude, longitude, address)}"""
+    entries = {}
+
+    for entry in GeocodeCache.query.filter_by(found=True).all():
+        postal_code = extract_postal_code(entry.address) or extract_postal_code(entry.query_key)
+        if postal_code and entry.latitude is not None and entry.longitude is not None:
+            entries[postal_code] = (entry.latitude, entry.longitude, entry.address or '')
+
+    # School coordinates take priority over ad-hoc lookups
+    for school in School.query.filter(School.latitude.isnot(None), School.longitude.isnot(None)).all():
+        postal_code = extract_postal_code(school.postal_code)
+        if postal_code:
+            entries[postal_code] = (school.latitude, school.longitude, school.address or '')
+
+    return entries
+
+if __name__ == "__main__":
+    app = create_app()
+    output_file = sys.argv[1] if len(sys.argv) > 1 else os.getenv('POSTAL_CODES_FILE', DEFAULT_POSTAL_CODES_FILE)
+    print("🚀 Building postal code table...")
+
+    with app.app_context():
+        entries = collect_postal_codes()
+
+    # Keep rows from an existing table that we have no newer coordinates for
+    if os.path.exists(output_file):
+        for postal_code, latitude, longitude, address in load_postal_code_table(output_file).entries():
+            entries.setdefault(postal_code, (latitude, longitude, address))
+
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['postal_code', 'latitude', 'longitude', 'address'])
+        for postal_code in sorted(entries):
+            latitude, longitude, address = entries[postal_code]
+            writer.writerow([postal_code, latitude, longitude, address])
+
+    print(f"✅ Wrote {len(entries)} postal codes to {output_file}")
@@ -10,7 +10,7 @@ import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from flask import Flask
-from models.user import db, School, User
+from models.user import db, School, User, PhaseStat
 
 # Create Flask app for migration
 def create_app():
@@ -91,6 +91,7 @@ def migrate_p1_data():
         
         # Clear existing school data
         print("Clearing existing school data...")
+        PhaseStat.query.delete()
         School.query.delete()
         
         # Add each school to database
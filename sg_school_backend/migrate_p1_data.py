@@ -11,7 +11,7 @@ from flask_sqlalchemy import SQLAlchemy
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.models.user import db, School
+from src.models.user import db, School, PhaseStat
 
 def create_app():
     """Create Flask app for migration"""
@@ -103,6 +103,7 @@ def migrate_p1_data():
             print("✓ Database tables ready")
             
             # Clear existing schools (for fresh migration)
+            PhaseStat.query.delete()
             School.query.delete()
             db.session.commit()
             print("✓ Cleared existing school data")
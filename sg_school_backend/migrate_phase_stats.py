@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Migrate phase results from the School phase JSON columns into phase_stats
+and the School Phase 2C columns
+
+Creates the table, columns and indexes if needed and writes one typed row
+per school, year and phase. Safe to re-run: existing rows are updated in
+place. The app also does this on startup when the table is empty or the
+Phase 2C columns are unset.
+
+Usage:
+    python migrate_phase_stats.py
+"""
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from flask import Flask
+
+from src.config import get_database_url
+from src.models.user import db, PhaseStat, PHASE_FORMAT_LEGACY
+from src.services.phase_stats import backfill_phase_stats
+from src.services.schema import upgrade_schema
+
+def create_app():
+    """Create Flask app for migration, without the web app's startup work and background jobs"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+if __name__ == "__main__":
+    app = create_app()
+    print("🚀 Migrating phase data to phase_stats...")
+
+    with app.app_context():
+        try:
+            db.create_all()
+            upgrade_schema()
+            processed = backfill_phase_stats()
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            sys.exit(1)
+
+        legacy_rows = PhaseStat.query.filter_by(data_format=PHASE_FORMAT_LEGACY).count()
+
+    if legacy_rows:
+        print(f"ℹ️  {legacy_rows} legacy-format phases keep being served from their JSON column")
+    print(f"\n🎉 Migration completed for {processed} schools")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Re-match government school names to schools in the database
+
+Rebuilds the SchoolNameAlias table from the local government mirror and prints
+the government names that matched no school, so they can be fixed by hand.
+The dataset sync does this automatically after every run.
+
+Usage:
+    python rebuild_school_aliases.py
+"""
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from flask import Flask
+
+from src.config import get_database_url
+from src.models.user import db
+from src.services import government_data
+from src.services.government_data import load_mirrored_schools
+from src.services.name_aliases import get_unmatched_aliases, rebuild_school_aliases
+from src.services.schema import upgrade_schema
+
+def create_app():
+    """Create Flask app for the rebuild, without the web app's startup work and background jobs"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    # Government school data is read from the local mirror
+    government_data.init_app(app)
+    return app
+
+if __name__ == "__main__":
+    app = create_app()
+    print("🚀 Rebuilding school name aliases...")
+
+    with app.app_context():
+        # Create tables, columns and indexes the web app would create on startup
+        db.create_all()
+        upgrade_schema()
+        government_schools = load_mirrored_schools()
+        if not government_schools:
+            print("\n❌ The government school mirror is empty - run sync_government_data.py first")
+            sys.exit(1)
+
+        result = rebuild_school_aliases(government_schools)
+        unmatched = get_unmatched_aliases()
+
+    if unmatched:
+        print(f"\n⚠️  {len(unmatched)} government school names matched no school:")
+        for school in unmatched:
+            print(f"   - {school['name']}")
+
+    print(f"\n🎉 Aliases rebuilt: {result}")
@@ -5,59 +5,12 @@ Automatically populates database with P1 data if empty
 """
 import json
 import os
+from src.services.phase_analytics import competitiveness_scores, competitiveness_tiers, phase_matrix
 
 def normalize_school_key(school_name):
     """Convert school name to normalized key"""
     return school_name.lower().replace(' ', '_').replace("'", "").replace("-", "_")
 
-def calculate_competitiveness_score(phases):
-    """Calculate overall competitiveness score based on phase data"""
-    total_score = 0
-    weight_sum = 0
-    
-    # Phase 2C is most competitive indicator (highest weight)
-    if 'phase_2c' in phases and phases['phase_2c'].get('applicants', 0) > 0:
-        vacancies = phases['phase_2c'].get('vacancies', 1)
-        applicants = phases['phase_2c'].get('applicants', 0)
-        if vacancies > 0:
-            ratio = applicants / vacancies
-            total_score += ratio * 0.5  # 50% weight
-            weight_sum += 0.5
-    
-    # Phase 2B (medium weight)
-    if 'phase_2b' in phases and phases['phase_2b'].get('applicants', 0) > 0:
-        vacancies = phases['phase_2b'].get('vacancies', 1)
-        applicants = phases['phase_2b'].get('applicants', 0)
-        if vacancies > 0:
-            ratio = applicants / vacancies
-            total_score += ratio * 0.3  # 30% weight
-            weight_sum += 0.3
-    
-    # Phase 2A (lower weight)
-    if 'phase_2a' in phases and phases['phase_2a'].get('applicants', 0) > 0:
-        vacancies = phases['phase_2a'].get('vacancies', 1)
-        applicants = phases['phase_2a'].get('applicants', 0)
-        if vacancies > 0:
-            ratio = applicants / vacancies
-            total_score += ratio * 0.2  # 20% weight
-            weight_sum += 0.2
-    
-    # Return weighted average if we have data, otherwise 0
-    return total_score / weight_sum if weight_sum > 0 else 0.0
-
-def get_competitiveness_tier(score):
-    """Determine competitiveness tier based on score"""
-    if score >= 2.0:
-        return "Very High"
-    elif score >= 1.5:
-        return "High"
-    elif score >= 1.2:
-        return "Medium"
-    elif score > 0:
-        return "Low"
-    else:
-        return "Unknown"
-
 def initialize_database_if_empty(db, School):
     """Initialize database with P1 data if it's empty
     
@@ -113,7 +66,14 @@ def initialize_database_if_empty(db, School):
         print(f"📊 Populating database with {len(data)} schools...")
         schools_added = 0
         
-        for school_data in data:
+        # Competitiveness scores and tiers for all schools at once (a phase with
+        # applicants but no vacancy figure counts as 1 vacancy)
+        all_phases = [school_data.get('phases', {}) if isinstance(school_data, dict) else {} for school_data in data]
+        comp_scores = competitiveness_scores(phase_matrix(all_phases, 'vacancies', default=1),
+                                             phase_matrix(all_phases, 'applicants'))
+        comp_tiers = competitiveness_tiers(comp_scores)
+        
+        for index, school_data in enumerate(data):
             try:
                 school_name = school_data.get('name', '')
                 if not school_name:
@@ -123,8 +83,8 @@ def initialize_database_if_empty(db, School):
                 
                 # Calculate competitiveness metrics
                 phases = school_data.get('phases', {})
-                comp_score = calculate_competitiveness_score(phases)
-                comp_tier = get_competitiveness_tier(comp_score)
+                comp_score = float(comp_scores[index])
+                comp_tier = str(comp_tiers[index])
                 
                 # Create competitiveness metrics JSON
                 comp_metrics = {
@@ -7,14 +7,25 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-from flask import Flask, send_from_directory, Response
+from flask import Flask, send_from_directory
 from flask_cors import CORS
 import mimetypes
+from src.config import get_database_url
 from src.models.user import db, School
 from src.routes.user import user_bp
 from src.routes.schools import schools_bp
 from src.routes.strategy import strategy_bp
+from src.routes.status import status_bp
 from src.initialize_db import initialize_database_if_empty
+from src.services import government_data
+from src.services.dataset_sync import start_sync_scheduler
+from src.services.school_locations import start_location_backfill
+from src.services.name_matching import get_name_resolver
+from src.services.name_aliases import ensure_school_aliases
+from src.services.phase_stats import ensure_phase_stats
+from src.services.schema import upgrade_schema
+from src.services.school_snapshot import get_school_snapshot
+from src.services.json_provider import FastJSONProvider
 
 # Ensure proper MIME types are registered
 mimetypes.add_type('application/javascript', '.js')
@@ -23,6 +34,9 @@ mimetypes.add_type('text/html', '.html')
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 
+# Encode every JSON response with orjson when it is installed (stdlib json otherwise)
+app.json = FastJSONProvider(app)
+
 # Production-ready configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
 
@@ -32,38 +46,7 @@ CORS(app)
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(schools_bp, url_prefix='/api/schools')
 app.register_blueprint(strategy_bp, url_prefix='/api/strategy')
-
-# Database configuration with Railway deployment support
-def get_database_url():
-    """Get database URL with Railway deployment support"""
-    # Check for Railway PostgreSQL database URL first (recommended for production)
-    database_url = os.getenv('DATABASE_URL')
-    if database_url:
-        # Fix PostgreSQL URL format for SQLAlchemy compatibility
-        if database_url.startswith('postgres://'):
-            database_url = database_url.replace('postgres://', 'postgresql://', 1)
-        print(f"🔗 Using Railway DATABASE_URL (PostgreSQL): {database_url[:50]}...")
-        return database_url
-    
-    # Fallback to SQLite for local development and Railway with file system
-    db_dir = os.path.join(os.path.dirname(__file__), 'database')
-    db_path = os.path.join(db_dir, 'app.db')
-    
-    # Create database directory if it doesn't exist
-    try:
-        os.makedirs(db_dir, exist_ok=True)
-        print(f"📁 Database directory: {db_dir}")
-    except Exception as e:
-        print(f"⚠️  Could not create database directory: {e}")
-        # Try using a writable temporary location
-        import tempfile
-        db_dir = tempfile.gettempdir()
-        db_path = os.path.join(db_dir, 'sg_school_app.db')
-        print(f"📁 Using temporary database: {db_path}")
-    
-    sqlite_url = f"sqlite:///{db_path}"
-    print(f"🗄️  Using SQLite database: {sqlite_url}")
-    return sqlite_url
+app.register_blueprint(status_bp, url_prefix='/api/status')
 
 app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -75,16 +58,40 @@ with app.app_context():
         db.create_all()
         print("✅ Database tables created successfully")
         
+        # Add columns and indexes introduced since the database was created
+        upgrade_schema()
+        
         # Auto-initialize database with P1 data if empty (for production deployment)
         print("🔍 Checking database initialization...")
         initialize_database_if_empty(db, School)
         
+        # Copy phase JSON into phase_stats and the Phase 2C columns for databases created before they existed
+        ensure_phase_stats()
+        
+        # Build the in-memory school name index once at startup
+        print(f"🔤 Name resolver ready with {len(get_name_resolver())} schools")
+        
+        # Load the read-only dataset snapshot served by the read endpoints
+        snapshot = get_school_snapshot()
+        if snapshot is not None:
+            print(f"📦 School snapshot ready: {len(snapshot)} schools, version {snapshot.version[:12]}")
+        
+        # Match government names to schools now if the mirror is already populated
+        ensure_school_aliases()
+        
     except Exception as e:
         print(f"❌ Database initialization error: {e}")
         print("💡 Consider using Railway's PostgreSQL service for production")
         # Don't fail the app startup - let it continue without database
         pass
 
+# Serve government school data from the local mirror and keep it in sync
+government_data.init_app(app)
+start_sync_scheduler(app)
+
+# Locate schools without stored coordinates off the request path
+start_location_backfill(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -1,4 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, undefer_group
+from datetime import datetime
+from functools import lru_cache
 import json
 
 db = SQLAlchemy()
@@ -18,6 +22,98 @@ class User(db.Model):
             'email': self.email
         }
 
+PHASE_DATA_CACHE_SIZE = 8192
+PHASE_NAMES = ['phase_1', 'phase_2a', 'phase_2b', 'phase_2c', 'phase_2c_supp', 'phase_3']
+PHASE_FORMAT_CURRENT = 'current'  # typed columns reproduce the JSON exactly
+PHASE_FORMAT_LEGACY = 'legacy'  # typed columns are a summary; read the JSON column
+
+@lru_cache(maxsize=PHASE_DATA_CACHE_SIZE)
+def _decode_phase_data(phase_name, phase_json):
+    """Parse and normalize one phase JSON column
+
+    Returns the phase dictionary and the keys holding nested containers. The
+    result is shared between callers, so it is only handed out as copies.
+    """
+    data = _normalize_phase_data(phase_name, json.loads(phase_json))
+    return data, tuple(key for key, value in data.items() if isinstance(value, (dict, list)))
+
+@lru_cache(maxsize=PHASE_DATA_CACHE_SIZE)
+def _decode_json_object(raw_json):
+    """Parse a JSON object column once; returns the same shape as _decode_phase_data"""
+    data = json.loads(raw_json)
+    return data, tuple(key for key, value in data.items() if isinstance(value, (dict, list)))
+
+def _normalize_phase_data(phase_name, data):
+    """Convert new and legacy phase formats to the shape the frontend expects"""
+    
+    # Handle new comprehensive data format (from 2024 extraction)
+    if 'vacancies' in data or 'applicants' in data or 'status' in data:
+        # New format - enhance with calculated fields for frontend compatibility
+        result = {
+            'vacancies': data.get('vacancies', 0),
+            'applicants': data.get('applicants', 0),
+            'balloting': data.get('balloting', False),
+            'balloting_details': data.get('balloting_details', {}),
+            'status': data.get('status', ''),
+            # Calculated fields for backward compatibility
+            'applied': data.get('applicants', 0),  # Map applicants to applied
+            'taken': 0,  # Will be calculated based on balloting outcome
+            'vacancy': data.get('vacancies', 0)
+        }
+        
+        # For Phase 1, handle special status format
+        if phase_name == 'phase_1' and 'status' in data:
+            result['taken'] = result['applicants']  # Assume all eligible applicants got places
+            result['phase_1_status'] = data['status']
+        
+        # Calculate taken based on vacancies and balloting
+        elif result['vacancies'] > 0:
+            if result['balloting']:
+                # FIXED: If balloting occurred, ALL vacancies were filled (oversubscribed)
+                # Balloting is just the method to decide WHO gets the spots
+                result['taken'] = result['vacancies']
+            else:
+                # No balloting means either under-subscribed or exactly filled
+                result['taken'] = min(result['applicants'], result['vacancies'])
+        
+        return result
+    
+    # Handle legacy format (pre-2024 data)
+    else:
+        # Convert "accepted" to "taken" for frontend compatibility
+        if 'accepted' in data:
+            data['taken'] = data.pop('accepted')
+        
+        # Add vacancy field if missing
+        if 'vacancy' not in data:
+            applied = data.get('applied', 0)
+            taken = data.get('taken', 0)
+            
+            if applied > 0 and taken > 0:
+                if applied == taken:
+                    data['vacancy'] = taken
+                else:
+                    data['vacancy'] = taken
+            else:
+                data['vacancy'] = 0
+        
+        # Add new format fields for consistency
+        data['vacancies'] = data.get('vacancy', 0)
+        data['applicants'] = data.get('applied', 0)
+        data['balloting'] = data.get('applied', 0) > data.get('vacancy', 0)
+        data['balloting_details'] = {}
+        data['status'] = ''
+        
+        return data
+
+def _copy_phase_data(decoded):
+    """Copy a decoded phase dictionary, including its nested dictionaries and lists"""
+    data, nested_keys = decoded
+    copied = dict(data)
+    for key in nested_keys:
+        copied[key] = copied[key].copy()
+    return copied
+
 class School(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     school_key = db.Column(db.String(100), unique=True, nullable=False)  # normalized key like 'admiralty'
@@ -26,102 +122,108 @@ class School(db.Model):
     balloted = db.Column(db.Boolean, default=False)
     year = db.Column(db.Integer, default=2024)
     
-    # Phase data as JSON fields
-    phase_1_data = db.Column(db.Text)  # JSON string
-    phase_2a_data = db.Column(db.Text)  # JSON string
-    phase_2b_data = db.Column(db.Text)  # JSON string
-    phase_2c_data = db.Column(db.Text)  # JSON string
-    phase_2c_supp_data = db.Column(db.Text)  # JSON string
-    phase_3_data = db.Column(db.Text)  # JSON string
+    # Phase data as JSON fields (deferred: loaded on access or with SCHOOL_FULL_LOAD)
+    phase_1_data = db.deferred(db.Column(db.Text), group='phase_data')  # JSON string
+    phase_2a_data = db.deferred(db.Column(db.Text), group='phase_data')  # JSON string
+    phase_2b_data = db.deferred(db.Column(db.Text), group='phase_data')  # JSON string
+    phase_2c_data = db.deferred(db.Column(db.Text), group='phase_data')  # JSON string
+    phase_2c_supp_data = db.deferred(db.Column(db.Text), group='phase_data')  # JSON string
+    phase_3_data = db.deferred(db.Column(db.Text), group='phase_data')  # JSON string
     
     # Competitiveness metrics as JSON
-    competitiveness_metrics = db.Column(db.Text)  # JSON string
-    overall_competitiveness_score = db.Column(db.Float, default=0.0)
+    competitiveness_metrics = db.deferred(db.Column(db.Text), group='details')  # JSON string
+    overall_competitiveness_score = db.Column(db.Float, default=0.0, index=True)
     competitiveness_tier = db.Column(db.String(50))
     
+    # Phase 2C figures copied from phase_2c_data on flush, so rankings can filter and sort in SQL
+    vacancies_2c = db.Column(db.Integer)
+    applicants_2c = db.Column(db.Integer)
+    ratio_2c = db.Column(db.Float, index=True)  # applicants per vacancy; inf with applicants but no vacancies
+    
     # School basic info (from government data)
     address = db.Column(db.String(500))
     postal_code = db.Column(db.String(10))
     phone = db.Column(db.String(20))
     email = db.Column(db.String(100))
     website = db.Column(db.String(200))
-    mrt_desc = db.Column(db.Text)
-    bus_desc = db.Column(db.Text)
+    mrt_desc = db.deferred(db.Column(db.Text), group='details')
+    bus_desc = db.deferred(db.Column(db.Text), group='details')
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
 
+    # Typed copy of the phase JSON columns, loaded for all schools of a query in one extra SELECT
+    phase_stats = db.relationship('PhaseStat', back_populates='school', lazy='selectin',
+                                  cascade='all, delete-orphan', passive_deletes=True)
+
+    __table_args__ = (
+        # Filtered rankings: equality on tier and balloted, then walk the score order
+        db.Index('ix_school_tier_balloted_score', 'competitiveness_tier', 'balloted', 'overall_competitiveness_score'),
+        db.Index('ix_school_balloted_score', 'balloted', 'overall_competitiveness_score'),
+        # Case-insensitive name lookups: lower(name) = ... and, on SQLite, ilike
+        # (PostgreSQL also gets a trigram index for ILIKE patterns when pg_trgm is available, see upgrade_schema)
+        db.Index('ix_school_name_lower', db.func.lower(name)),
+    )
+
     def __repr__(self):
         return f'<School {self.name}>'
 
     def get_phase_data(self, phase_name):
-        """Get phase data as dictionary, handling both old and new data formats"""
-        phase_field = f"{phase_name}_data"
-        if hasattr(self, phase_field):
-            phase_json = getattr(self, phase_field)
-            if phase_json:
-                data = json.loads(phase_json)
-                
-                # Handle new comprehensive data format (from 2024 extraction)
-                if 'vacancies' in data or 'applicants' in data or 'status' in data:
-                    # New format - enhance with calculated fields for frontend compatibility
-                    result = {
-                        'vacancies': data.get('vacancies', 0),
-                        'applicants': data.get('applicants', 0),
-                        'balloting': data.get('balloting', False),
-                        'balloting_details': data.get('balloting_details', {}),
-                        'status': data.get('status', ''),
-                        # Calculated fields for backward compatibility
-                        'applied': data.get('applicants', 0),  # Map applicants to applied
-                        'taken': 0,  # Will be calculated based on balloting outcome
-                        'vacancy': data.get('vacancies', 0)
-                    }
-                    
-                    # For Phase 1, handle special status format
-                    if phase_name == 'phase_1' and 'status' in data:
-                        result['taken'] = result['applicants']  # Assume all eligible applicants got places
-                        result['phase_1_status'] = data['status']
-                    
-                    # Calculate taken based on vacancies and balloting
-                    elif result['vacancies'] > 0:
-                        if result['balloting']:
-                            # FIXED: If balloting occurred, ALL vacancies were filled (oversubscribed)
-                            # Balloting is just the method to decide WHO gets the spots
-                            result['taken'] = result['vacancies']
-                        else:
-                            # No balloting means either under-subscribed or exactly filled
-                            result['taken'] = min(result['applicants'], result['vacancies'])
-                    
-                    return result
-                
-                # Handle legacy format (pre-2024 data)
-                else:
-                    # Convert "accepted" to "taken" for frontend compatibility
-                    if 'accepted' in data:
-                        data['taken'] = data.pop('accepted')
-                    
-                    # Add vacancy field if missing
-                    if 'vacancy' not in data:
-                        applied = data.get('applied', 0)
-                        taken = data.get('taken', 0)
-                        
-                        if applied > 0 and taken > 0:
-                            if applied == taken:
-                                data['vacancy'] = taken
-                            else:
-                                data['vacancy'] = taken
-                        else:
-                            data['vacancy'] = 0
-                    
-                    # Add new format fields for consistency
-                    data['vacancies'] = data.get('vacancy', 0)
-                    data['applicants'] = data.get('applied', 0)
-                    data['balloting'] = data.get('applied', 0) > data.get('vacancy', 0)
-                    data['balloting_details'] = {}
-                    data['status'] = ''
-                    
-                    return data
+        """Get phase data as dictionary, handling both old and new data formats
+
+        Reads the typed PhaseStat row when there is one; legacy-format phases,
+        rows not migrated yet and unflushed changes use the JSON column. Each
+        distinct JSON value is parsed and normalized once per process; callers
+        receive a copy they are free to modify.
+        """
+        if 'phase_stats' in self.__dict__ and not inspect(self).modified:
+            for stat in self.phase_stats:
+                if stat.phase == phase_name and stat.year == self.year and stat.data_format == PHASE_FORMAT_CURRENT:
+                    return stat.to_phase_data()
+
+        phase_json = getattr(self, f"{phase_name}_data", None)
+        if phase_json:
+            return _copy_phase_data(_decode_phase_data(phase_name, phase_json))
         return {}
 
+    def sync_phase_stats(self):
+        """Bring the PhaseStat rows in line with the phase JSON columns"""
+        existing = {(stat.year, stat.phase): stat for stat in self.phase_stats}
+        wanted = set()
+        for phase_name in PHASE_NAMES:
+            phase_json = getattr(self, f"{phase_name}_data")
+            if not phase_json:
+                continue
+
+            wanted.add((self.year, phase_name))
+            stat = existing.get((self.year, phase_name))
+            if stat is None:
+                stat = PhaseStat(year=self.year, phase=phase_name)
+                self.phase_stats.append(stat)
+            for column, value in phase_stat_values(phase_name, phase_json).items():
+                setattr(stat, column, value)
+
+        for key, stat in existing.items():
+            if key not in wanted:
+                self.phase_stats.remove(stat)
+
+    def refresh_phase_2c_columns(self):
+        """Copy the Phase 2C vacancies, applicants and ratio from phase_2c_data"""
+        phase_2c = _decode_phase_data('phase_2c', self.phase_2c_data)[0] if self.phase_2c_data else {}
+        self.vacancies_2c, self.applicants_2c, self.ratio_2c = phase_2c_figures(phase_2c)
+
+    def get_phase_2c_figures(self):
+        """(vacancies_2c, applicants_2c, ratio_2c) as shown in rankings
+
+        Reads the stored columns, or phase_2c_data for rows that have not been
+        refreshed yet. A ratio of 0 is returned as int 0 when the phase had no
+        vacancies and no applicants, as rankings always reported it.
+        """
+        if self.vacancies_2c is None or self.applicants_2c is None or self.ratio_2c is None:
+            vacancies, applicants, ratio = phase_2c_figures(self.get_phase_data('phase_2c'))
+        else:
+            vacancies, applicants, ratio = self.vacancies_2c, self.applicants_2c, self.ratio_2c
+        return vacancies, applicants, ratio if vacancies > 0 or applicants > 0 else 0
+
     def set_phase_data(self, phase_name, data):
         """Set phase data from dictionary"""
         phase_field = f"{phase_name}_data"
@@ -131,7 +233,7 @@ class School(db.Model):
     def get_competitiveness_metrics(self):
         """Get competitiveness metrics as dictionary"""
         if self.competitiveness_metrics:
-            return json.loads(self.competitiveness_metrics)
+            return _copy_phase_data(_decode_json_object(self.competitiveness_metrics))
         return {}
 
     def set_competitiveness_metrics(self, metrics):
@@ -141,9 +243,8 @@ class School(db.Model):
     def to_dict(self):
         """Convert school to dictionary format matching the original JSON structure"""
         phases = {}
-        phase_names = ['phase_1', 'phase_2a', 'phase_2b', 'phase_2c', 'phase_2c_supp', 'phase_3']
         
-        for phase in phase_names:
+        for phase in PHASE_NAMES:
             phases[phase] = self.get_phase_data(phase)
 
         return {
@@ -222,7 +323,7 @@ class School(db.Model):
     def get_most_competitive_phase(self):
         """Get the most competitive phase for this school"""
         try:
-            phases_data = json.loads(self.phases_data) if isinstance(self.phases_data, str) else self.phases_data
+            phases_data = {phase_name: self.get_phase_data(phase_name) for phase_name in PHASE_NAMES}
             return self._get_most_competitive_phase(phases_data)
         except:
             return "Unknown"
@@ -230,24 +331,37 @@ class School(db.Model):
     def calculate_overall_success_rate(self):
         """Calculate overall success rate across all phases"""
         try:
-            phases_data = json.loads(self.phases_data) if isinstance(self.phases_data, str) else self.phases_data
+            phases_data = {phase_name: self.get_phase_data(phase_name) for phase_name in PHASE_NAMES}
             
             total_applicants = 0
-            total_taken = 0
+            total_admitted = 0
             
             for phase_name, phase_data in phases_data.items():
                 applicants = phase_data.get('applicants', 0)
                 taken = phase_data.get('taken', 0)
                 
                 total_applicants += applicants
-                total_taken += taken
+                # A balloted phase records its vacancies as taken, which can exceed its applicants
+                total_admitted += min(taken, applicants)
             
             if total_applicants > 0:
-                return (total_taken / total_applicants) * 100
+                return (total_admitted / total_applicants) * 100
             return 0
         except:
             return 0
 
+    def get_competitiveness_percentile(self):
+        """Share of scored schools (%) whose competitiveness score is at or below this school's"""
+        if self.overall_competitiveness_score is None:
+            return None
+        # One pass over the score index for both counts
+        score = School.overall_competitiveness_score
+        total, at_or_below = db.session.query(
+            db.func.count(score),
+            db.func.count(db.case((score <= self.overall_competitiveness_score, 1)))
+        ).filter(score.isnot(None)).one()
+        return round(at_or_below / total * 100, 1) if total else None
+
     def get_strategy_recommendation(self):
         """Generate strategic recommendation based on school data"""
         try:
@@ -272,3 +386,176 @@ class School(db.Model):
                 return "Contact school directly for most current information about availability and requirements."
         except:
             return "Strategic analysis not available for this school."
+
+
+# Loader options for queries that serialize whole School rows (to_dict, detail views):
+# the deferred Text columns come with the row instead of one extra SELECT per school
+SCHOOL_FULL_LOAD = (undefer_group('phase_data'), undefer_group('details'))
+
+class PhaseStat(db.Model):
+    """One school's results for one P1 registration phase and year, as typed columns"""
+    __tablename__ = 'phase_stats'
+    __table_args__ = (
+        db.UniqueConstraint('school_id', 'year', 'phase', name='uq_phase_stats_school_year_phase'),
+        db.Index('ix_phase_stats_phase_year_balloting', 'phase', 'year', 'balloting'),
+        db.Index('ix_phase_stats_phase_year_applicants', 'phase', 'year', 'applicants'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, db.ForeignKey('school.id', ondelete='CASCADE'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    phase = db.Column(db.String(20), nullable=False)  # 'phase_1' ... 'phase_3'
+    vacancies = db.Column(db.Integer)
+    applicants = db.Column(db.Integer)
+    taken = db.Column(db.Integer)
+    balloting = db.Column(db.Boolean, default=False)
+    status = db.Column(db.String(500))  # NULL when the source had no status
+    balloting_details = db.Column(db.Text)  # JSON string, NULL when the source had none
+    data_format = db.Column(db.String(10), nullable=False, default=PHASE_FORMAT_CURRENT)
+
+    school = db.relationship('School', back_populates='phase_stats')
+
+    def __repr__(self):
+        return f'<PhaseStat {self.school_id} {self.year} {self.phase}>'
+
+    def to_phase_data(self):
+        """Phase dictionary in the same shape as School.get_phase_data"""
+        result = {
+            'vacancies': self.vacancies,
+            'applicants': self.applicants,
+            'balloting': self.balloting,
+            'balloting_details': _copy_phase_data(_decode_json_object(self.balloting_details)) if self.balloting_details else {},
+            'status': self.status if self.status is not None else '',
+            'applied': self.applicants,
+            'taken': self.taken,
+            'vacancy': self.vacancies
+        }
+        if self.phase == 'phase_1' and self.status is not None:
+            result['phase_1_status'] = self.status
+        return result
+
+def phase_2c_figures(phase_2c_data):
+    """(vacancies, applicants, applicants per vacancy) of a Phase 2C dictionary"""
+    vacancies = phase_2c_data.get('vacancies', 0) if phase_2c_data else 0
+    applicants = phase_2c_data.get('applicants', 0) if phase_2c_data else 0
+    
+    # Calculate ratio (applicants per vacancy)
+    if vacancies > 0:
+        ratio = applicants / vacancies
+    elif applicants > 0:
+        ratio = float('inf')  # Infinity when no vacancies but have applicants
+    else:
+        ratio = 0.0  # No competition
+    return vacancies, applicants, ratio
+
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def phase_stat_values(phase_name, phase_json):
+    """PhaseStat column values for one phase JSON column
+
+    Current-format phases whose fields all have the expected types are stored
+    exactly; anything else is stored as a legacy summary and read from JSON.
+    """
+    data, _ = _decode_phase_data(phase_name, phase_json)
+    raw = json.loads(phase_json)
+    values = {
+        'vacancies': data.get('vacancies') if _is_count(data.get('vacancies')) else None,
+        'applicants': data.get('applicants') if _is_count(data.get('applicants')) else None,
+        'taken': data.get('taken') if _is_count(data.get('taken')) else None,
+        'balloting': bool(data.get('balloting')),
+        'status': None,
+        'balloting_details': None,
+        'data_format': PHASE_FORMAT_LEGACY
+    }
+
+    is_current = 'vacancies' in raw or 'applicants' in raw or 'status' in raw
+    if (is_current and _is_count(raw.get('vacancies', 0)) and _is_count(raw.get('applicants', 0))
+            and isinstance(raw.get('balloting', False), bool) and isinstance(raw.get('status', ''), str)
+            and isinstance(raw.get('balloting_details', {}), dict)):
+        values['status'] = raw.get('status')
+        if 'balloting_details' in raw:
+            values['balloting_details'] = json.dumps(raw['balloting_details'])
+        values['data_format'] = PHASE_FORMAT_CURRENT
+    return values
+
+_PHASE_SYNC_COLUMNS = ['year'] + [f"{phase_name}_data" for phase_name in PHASE_NAMES]
+
+@event.listens_for(Session, 'before_flush')
+def _sync_phase_stats_before_flush(session, flush_context, instances):
+    # Every writer keeps setting the JSON columns; PhaseStat rows and the Phase 2C columns follow them on flush
+    for school in list(session.new) + list(session.dirty):
+        if not isinstance(school, School):
+            continue
+        state = inspect(school)
+        if school in session.new or any(state.attrs[column].history.has_changes() for column in _PHASE_SYNC_COLUMNS):
+            school.sync_phase_stats()
+            school.refresh_phase_2c_columns()
+
+
+class GeocodeCache(db.Model):
+    """Persistent geocoding results shared across workers and restarts"""
+    id = db.Column(db.Integer, primary_key=True)
+    query_key = db.Column(db.String(500), unique=True, nullable=False)  # normalized address/postal code
+    found = db.Column(db.Boolean, default=True)  # False caches a negative (no result) lookup
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    address = db.Column(db.String(500))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GeocodeCache {self.query_key}>'
+
+    def to_location(self):
+        """Convert to the geocode_address result format"""
+        return {
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'address': self.address
+        }
+
+
+class GovernmentSchool(db.Model):
+    """Local mirror of primary school records from the data.gov.sg school dataset"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), unique=True, nullable=False)
+    address = db.Column(db.String(500))
+    postal_code = db.Column(db.String(10))
+    phone = db.Column(db.String(50))
+    email = db.Column(db.String(100))
+    website = db.Column(db.String(200))
+    mrt_desc = db.Column(db.Text)
+    bus_desc = db.Column(db.Text)
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    record_hash = db.Column(db.String(64), nullable=False)  # hash of the government fields, used to diff syncs
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GovernmentSchool {self.name}>'
+
+    def to_dict(self):
+        """Convert to the get_schools_data record format"""
+        return {
+            'name': self.name,
+            'address': self.address or '',
+            'postal_code': self.postal_code or '',
+            'phone': self.phone or '',
+            'email': self.email or '',
+            'website': self.website or '',
+            'mrt_desc': self.mrt_desc or '',
+            'bus_desc': self.bus_desc or ''
+        }
+
+
+class SchoolNameAlias(db.Model):
+    """Precomputed mapping from government school names (and known variants) to School.school_key"""
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(200), unique=True, nullable=False)  # lowercased name as received
+    display_name = db.Column(db.String(200))  # name with original casing
+    school_key = db.Column(db.String(100), index=True)  # NULL when the name could not be matched
+    source = db.Column(db.String(20), default='government')  # 'government' or 'variant'
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchoolNameAlias {self.alias} -> {self.school_key}>'
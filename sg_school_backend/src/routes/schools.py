@@ -1,92 +1,61 @@
-from flask import Blueprint, request, jsonify, current_app
-import requests
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 import pandas as pd
 from bs4 import BeautifulSoup
-import math
+import hmac
 import json
-from src.models.user import db, School
+import math
+import os
+from src.models.user import db, School, SCHOOL_FULL_LOAD
+from src.services.conditional_get import conditional_on_dataset
+from src.services.export import EXPORT_FORMATS
+from src.services.geocoding import geocode_address
+from src.services.government_data import find_government_school, get_loaded_schools_data, get_schools_data_version
+from src.services.name_aliases import contact_match_possible, get_unmatched_aliases, lookup_contact_name, lookup_school_key
+from src.services.name_matching import find_p1_school_key, get_school_count
+from src.services.name_search import get_name_search_index
+from src.services.prerendered import prerendered_json
+from src.services.rankings import (custom_rankings, decode_rankings_cursor, encode_rankings_cursor, parse_location,
+                                   parse_metric_filters, parse_page, parse_sort, query_rankings)
+from src.services.school_snapshot import get_school_snapshot, ranking_position
+from src.services.school_locations import find_nearest_schools, find_schools_within, refresh_school_locations
 
 schools_bp = Blueprint('schools', __name__)
 
-# Singapore government data API
-DATA_GOV_SG_API = "https://data.gov.sg/api/action/datastore_search"
-SCHOOL_DATASET_ID = "d_688b934f82c1059ed0a6993d2a829089"
-
-# OneMap API for geocoding
-ONEMAP_API = "https://www.onemap.gov.sg/api/common/elastic/search"
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points using Haversine formula"""
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lon = math.radians(lon2 - lon1)
-    
-    a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    
-    return R * c
+# Largest k accepted by /nearest
+MAX_NEAREST_SCHOOLS = 50
+# Prerendered cache key of /rankings without parameters
+DEFAULT_RANKINGS_KEY = ('rankings', 50, 0, None, None, None)
+# Largest radius accepted by /search; covers all of Singapore
+MAX_SEARCH_RADIUS_KM = 50
 
-def geocode_address(address):
-    """Geocode address using OneMap API"""
+def parse_nearest_count(value):
+    """Number of schools for /nearest from a request body value; raises ValueError when it is not usable"""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError('k must be an integer')
     try:
-        params = {
-            'searchVal': address,
-            'returnGeom': 'Y',
-            'getAddrDetails': 'Y'
-        }
-        response = requests.get(ONEMAP_API, params=params)
-        data = response.json()
-        
-        if data['found'] > 0:
-            result = data['results'][0]
-            return {
-                'latitude': float(result['LATITUDE']),
-                'longitude': float(result['LONGITUDE']),
-                'address': result['ADDRESS']
-            }
-    except Exception as e:
-        print(f"Geocoding error: {e}")
-    
-    return None
+        k = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('k must be an integer')
+    if not 1 <= k <= MAX_NEAREST_SCHOOLS:
+        raise ValueError(f'k must be between 1 and {MAX_NEAREST_SCHOOLS}')
+    return k
 
-def get_schools_data():
-    """Fetch schools data from data.gov.sg"""
+def parse_radius(value):
+    """Search radius in km from a request body value; raises ValueError when it is not usable"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError('radius must be a number')
     try:
-        params = {
-            'resource_id': SCHOOL_DATASET_ID,
-            'limit': 1000
-        }
-        response = requests.get(DATA_GOV_SG_API, params=params)
-        data = response.json()
-        
-        if data['success']:
-            schools = []
-            for record in data['result']['records']:
-                # Filter for primary schools only
-                if 'PRIMARY' in record.get('school_name', '').upper():
-                    schools.append({
-                        'name': record.get('school_name', ''),
-                        'address': record.get('address', ''),
-                        'postal_code': record.get('postal_code', ''),
-                        'phone': record.get('telephone_no', ''),
-                        'email': record.get('email_address', ''),
-                        'website': record.get('url_address', ''),
-                        'mrt_desc': record.get('mrt_desc', ''),
-                        'bus_desc': record.get('bus_desc', '')
-                    })
-            return schools
-    except Exception as e:
-        print(f"Error fetching schools data: {e}")
-    
-    return []
+        radius = float(value)
+    except ValueError:
+        raise ValueError('radius must be a number')
+    if not math.isfinite(radius) or not 0 <= radius <= MAX_SEARCH_RADIUS_KM:
+        raise ValueError(f'radius must be between 0 and {MAX_SEARCH_RADIUS_KM} km')
+    return radius
 
 def load_real_p1_data():
     """Load real 2024 P1 data from database"""
     try:
-        schools = School.query.all()
+        schools = School.query.options(*SCHOOL_FULL_LOAD).all()
         schools_dict = {}
         for school in schools:
             schools_dict[school.school_key] = school.to_dict()
@@ -95,119 +64,44 @@ def load_real_p1_data():
         print(f"Error loading real P1 data from database: {e}")
         return {}
 
+def query_school_by_key(school_key):
+    """Load a school by key from the database (unique index on school_key)"""
+    return School.query.options(*SCHOOL_FULL_LOAD).filter_by(school_key=school_key).first()
+
+def query_school_by_name(school_name):
+    """Load the first school whose name matches case-insensitively; % and _ act as LIKE wildcards"""
+    query = School.query.options(*SCHOOL_FULL_LOAD)
+    if any(char in school_name for char in '%_\\'):
+        # Pattern match: trigram index on PostgreSQL
+        return query.filter(School.name.ilike(school_name)).first()
+    # Plain name: equality on the lower(name) index
+    return query.filter(db.func.lower(School.name) == school_name.lower()).first()
+
+def find_school_by_key(school_key):
+    """Get a school from the in-memory snapshot, or from the database if the snapshot is unavailable"""
+    snapshot = get_school_snapshot()
+    if snapshot is not None:
+        return snapshot.by_key.get(school_key)
+    return query_school_by_key(school_key)
+
 def extract_p1_data_for_school(school_name, year=2024):
     """Extract real P1 data for a specific school from database with improved fuzzy matching"""
     try:
-            # Create school key from name - normalize the name
-            school_key = school_name.lower().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '').replace('.', '').replace("'", '').replace(',', '').replace('&', 'and')
-            
-            # 1. Direct lookup by school_key first
-            school = School.query.filter_by(school_key=school_key).first()
-            if school:
-                return format_p1_data_from_school(school, school_name)
-            
-            # 2. Try fuzzy matching by name (case-insensitive)
-            school = School.query.filter(School.name.ilike(f'%{school_name}%')).first()
-            if school:
-                return format_p1_data_from_school(school, school_name)
-            
-            # 3. ENHANCED: Aggressive suffix removal for government API names
-            cleaned_search_name = school_name.lower()
-            
-            # Remove common government API suffixes (more comprehensive)
-            suffixes_to_remove = [
-                ' school (primary)',
-                ' primary school', 
-                ' school',
-                ' primary',
-                ' (primary)',
-                ' (pri)',
-                ' pri'
-            ]
-            
-            for suffix in suffixes_to_remove:
-                cleaned_search_name = cleaned_search_name.replace(suffix, '').strip()
-            
-            # Remove extra whitespace and normalize
-            cleaned_search_name = ' '.join(cleaned_search_name.split())
-            
-            if cleaned_search_name != school_name.lower() and len(cleaned_search_name) > 2:
-                # Try exact match with cleaned name
-                school = School.query.filter(School.name.ilike(cleaned_search_name)).first()
-                if school:
-                    return format_p1_data_from_school(school, school_name)
-                
-                # Try partial match with cleaned name
-                school = School.query.filter(School.name.ilike(f'%{cleaned_search_name}%')).first()
-                if school:
-                    return format_p1_data_from_school(school, school_name)
-            
-            # 4. ENHANCED: Better word-by-word matching
-            # Split cleaned name into significant words (3+ chars)
-            search_words = [word.strip() for word in cleaned_search_name.split() if len(word.strip()) >= 3]
-            
-            if search_words:
-                # Try to find schools that contain ALL significant words
-                for school in School.query.all():
-                    school_name_lower = school.name.lower()
-                    if all(word in school_name_lower for word in search_words):
-                        return format_p1_data_from_school(school, school_name)
-                
-                # Try to find schools that contain MOST significant words (80%+ match)
-                if len(search_words) > 1:
-                    min_matches = max(1, int(len(search_words) * 0.8))  # 80% of words must match
-                    for school in School.query.all():
-                        school_name_lower = school.name.lower()
-                        matches = sum(1 for word in search_words if word in school_name_lower)
-                        if matches >= min_matches:
-                            return format_p1_data_from_school(school, school_name)
-            
-            # 5. ENHANCED: Try key-based matching with cleaned name
-            cleaned_key = cleaned_search_name.replace(' ', '_').replace('-', '_').replace('&', 'and')
-            school_words = [word for word in cleaned_key.split('_') if len(word) >= 3]
-            
-            for word in school_words:
-                school = School.query.filter(School.school_key.like(f'%{word}%')).first()
+            # Resolve the name in memory (key, partial name, suffix-stripped name, words, patterns);
+            # names already known not to match return straight away
+            school_key = find_p1_school_key(school_name)
+            if school_key:
+                school = find_school_by_key(school_key)
                 if school:
                     return format_p1_data_from_school(school, school_name)
             
-            # 6. ENHANCED: Advanced pattern matching for specific cases
-            search_patterns = {
-                # Handle common naming patterns
-                'fairfield': ['fairfield'],
-                'methodist': ['methodist'], 
-                'anderson': ['anderson'],
-                'ang_mo_kio': ['ang_mo_kio', 'ang mo kio'],
-                'ai_tong': ['ai_tong', 'ai tong'],
-                'chij': ['chij'],
-                'nanyang': ['nanyang'],
-                'raffles': ['raffles'],
-                'catholic': ['catholic'],
-                'tao_nan': ['tao_nan', 'tao nan'],
-                'new_town': ['new_town', 'new town'],
-                'anglo_chinese': ['anglo_chinese', 'anglo-chinese'],
-                'st_': ['st_', 'saint'],
-                'geylang': ['geylang'],
-                'queenstown': ['queenstown']
-            }
-            
-            for pattern, variants in search_patterns.items():
-                if any(variant in cleaned_search_name.replace('_', ' ') for variant in variants):
-                    for variant in variants:
-                        school = School.query.filter(School.school_key.like(f'%{variant.replace(" ", "_")}%')).first()
-                        if school:
-                            return format_p1_data_from_school(school, school_name)
-                        school = School.query.filter(School.name.ilike(f'%{variant}%')).first()
-                        if school:
-                            return format_p1_data_from_school(school, school_name)
-            
             # If no match found, return "no data available"
             return {
                 'year': year,
                 'school_name': school_name,
                 'data_available': False,
                 'message': 'No P1 data available for this school in our database',
-                'total_schools_in_database': School.query.count(),
+                'total_schools_in_database': get_school_count(),
                 'suggestion': 'Please check the school name or try searching for similar schools'
             }
         
@@ -248,117 +142,21 @@ def enrich_school_with_p1_data(school):
         # Try to find matching school in our database
         school_name = school.get('name', '')
         
-        # Use the same enhanced matching logic as extract_p1_data_for_school
-        
-        # 1. Direct exact match first
-        db_school = School.query.filter(School.name.ilike(school_name)).first()
-        if db_school:
-            # Found exact match, use it
-            school['p1_data'] = db_school.to_p1_data_format()
-            return school
-        
-        # 2. ENHANCED: Aggressive suffix removal for government API names
-        cleaned_search_name = school_name.lower()
-        
-        # Remove common government API suffixes (comprehensive)
-        suffixes_to_remove = [
-            ' school (primary)',
-            ' primary school', 
-            ' school',
-            ' primary',
-            ' (primary)',
-            ' (pri)',
-            ' pri'
-        ]
-        
-        for suffix in suffixes_to_remove:
-            cleaned_search_name = cleaned_search_name.replace(suffix, '').strip()
-        
-        # Remove extra whitespace and normalize
-        cleaned_search_name = ' '.join(cleaned_search_name.split())
-        
-        if cleaned_search_name != school_name.lower() and len(cleaned_search_name) > 2:
-            # Try exact match with cleaned name
-            db_school = School.query.filter(School.name.ilike(cleaned_search_name)).first()
-            if db_school:
-                school['p1_data'] = db_school.to_p1_data_format()
-                return school
-            
-            # Try partial match with cleaned name
-            db_school = School.query.filter(School.name.ilike(f'%{cleaned_search_name}%')).first()
-            if db_school:
-                school['p1_data'] = db_school.to_p1_data_format()
-                return school
-        
-        # 3. ENHANCED: Better word-by-word matching
-        search_words = [word.strip() for word in cleaned_search_name.split() if len(word.strip()) >= 3]
-        
-        if search_words:
-            # Try to find schools that contain ALL significant words
-            for db_school in School.query.all():
-                school_name_lower = db_school.name.lower()
-                if all(word in school_name_lower for word in search_words):
-                    school['p1_data'] = db_school.to_p1_data_format()
-                    return school
-            
-            # Try to find schools that contain MOST significant words (80%+ match)
-            if len(search_words) > 1:
-                min_matches = max(1, int(len(search_words) * 0.8))
-                for db_school in School.query.all():
-                    school_name_lower = db_school.name.lower()
-                    matches = sum(1 for word in search_words if word in school_name_lower)
-                    if matches >= min_matches:
-                        school['p1_data'] = db_school.to_p1_data_format()
-                        return school
-        
-        # 4. ENHANCED: Key-based matching
-        cleaned_key = cleaned_search_name.replace(' ', '_').replace('-', '_').replace('&', 'and')
-        school_words = [word for word in cleaned_key.split('_') if len(word) >= 3]
-        
-        for word in school_words:
-            db_school = School.query.filter(School.school_key.like(f'%{word}%')).first()
+        # Government names are matched to schools at sync time; this is a single alias lookup
+        school_key = lookup_school_key(school_name)
+        if school_key:
+            db_school = find_school_by_key(school_key)
             if db_school:
                 school['p1_data'] = db_school.to_p1_data_format()
                 return school
         
-        # 5. ENHANCED: Pattern matching for specific cases
-        search_patterns = {
-            'fairfield': ['fairfield'],
-            'methodist': ['methodist'], 
-            'anderson': ['anderson'],
-            'ang_mo_kio': ['ang_mo_kio', 'ang mo kio'],
-            'ai_tong': ['ai_tong', 'ai tong'],
-            'chij': ['chij'],
-            'nanyang': ['nanyang'],
-            'raffles': ['raffles'],
-            'catholic': ['catholic'],
-            'tao_nan': ['tao_nan', 'tao nan'],
-            'new_town': ['new_town', 'new town'],
-            'anglo_chinese': ['anglo_chinese', 'anglo-chinese'],
-            'st_': ['st_', 'saint'],
-            'geylang': ['geylang'],
-            'queenstown': ['queenstown']
-        }
-        
-        for pattern, variants in search_patterns.items():
-            if any(variant in cleaned_search_name.replace('_', ' ') for variant in variants):
-                for variant in variants:
-                    db_school = School.query.filter(School.school_key.like(f'%{variant.replace(" ", "_")}%')).first()
-                    if db_school:
-                        school['p1_data'] = db_school.to_p1_data_format()
-                        return school
-                    db_school = School.query.filter(School.name.ilike(f'%{variant}%')).first()
-                    if db_school:
-                        school['p1_data'] = db_school.to_p1_data_format()
-                        return school
-        
         # If no match found, return no data available
         school['p1_data'] = {
             'year': 2024,
             'school_name': school_name,
             'data_available': False,
             'message': 'No P1 data available for this school in our database',
-            'total_schools_in_database': School.query.count()
+            'total_schools_in_database': get_school_count()
         }
         return school
             
@@ -379,7 +177,10 @@ def search_schools():
     """Search for schools near a given location"""
     data = request.get_json()
     address = data.get('address', '')
-    radius = data.get('radius', 2)  # Default 2km radius
+    try:
+        radius = parse_radius(data.get('radius', 2))  # Default 2km radius
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     if not address:
         return jsonify({'error': 'Address is required'}), 400
@@ -389,31 +190,12 @@ def search_schools():
     if not user_location:
         return jsonify({'error': 'Could not geocode address'}), 400
     
-    # Get all schools data from government API
-    schools = get_schools_data()
-    
-    # Calculate distances and filter by radius
+    # Radius query against the school spatial index (already sorted by distance)
     nearby_schools = []
-    for school in schools:
-        # Geocode school address
-        school_location = geocode_address(school['address'])
-        if school_location:
-            distance = calculate_distance(
-                user_location['latitude'], user_location['longitude'],
-                school_location['latitude'], school_location['longitude']
-            )
-            
-            if distance <= radius:
-                school['distance'] = round(distance, 2)
-                school['latitude'] = school_location['latitude']
-                school['longitude'] = school_location['longitude']
-                
-                # Enrich with P1 data from database
-                enriched_school = enrich_school_with_p1_data(school)
-                nearby_schools.append(enriched_school)
-    
-    # Sort by distance
-    nearby_schools.sort(key=lambda x: x['distance'])
+    for school in find_schools_within(user_location['latitude'], user_location['longitude'], radius):
+        # Enrich with P1 data from database
+        enriched_school = enrich_school_with_p1_data(school)
+        nearby_schools.append(enriched_school)
     
     return jsonify({
         'user_location': user_location,
@@ -421,7 +203,35 @@ def search_schools():
         'total_found': len(nearby_schools)
     })
 
+@schools_bp.route('/nearest', methods=['POST'])
+def nearest_schools():
+    """Get the k nearest schools to a given location"""
+    data = request.get_json()
+    address = data.get('address', '')
+    try:
+        k = parse_nearest_count(data.get('k', 5))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not address:
+        return jsonify({'error': 'Address is required'}), 400
+    
+    user_location = geocode_address(address)
+    if not user_location:
+        return jsonify({'error': 'Could not geocode address'}), 400
+    
+    schools = []
+    for school in find_nearest_schools(user_location['latitude'], user_location['longitude'], k):
+        schools.append(enrich_school_with_p1_data(school))
+    
+    return jsonify({
+        'user_location': user_location,
+        'schools': schools,
+        'total_found': len(schools)
+    })
+
 @schools_bp.route('/school/<school_name>/p1-data', methods=['GET'])
+@conditional_on_dataset()
 def get_school_p1_data(school_name):
     """Get detailed P1 data for a specific school"""
     year = request.args.get('year', 2024, type=int)
@@ -430,13 +240,22 @@ def get_school_p1_data(school_name):
     if not p1_data:
         return jsonify({'error': 'P1 data not found'}), 404
     
-    return jsonify(p1_data)
+    response = jsonify(p1_data)
+    if 'error' in p1_data:
+        # Lookup failed; the next request may succeed
+        response.cache_control.no_store = True
+    return response
 
 @schools_bp.route('/all', methods=['GET'])
+@conditional_on_dataset(school_data=False, government_data=True)
 def get_all_schools():
     """Get all primary schools"""
-    schools = get_schools_data()
-    return jsonify({'schools': schools, 'total': len(schools)})
+    def build_payload():
+        schools = get_loaded_schools_data()
+        return {'schools': schools, 'total': len(schools)}
+    
+    # Rendered and gzipped once per government dataset version
+    return prerendered_json(get_schools_data_version(), 'all', build_payload)
 
 @schools_bp.route('/geocode', methods=['POST'])
 def geocode():
@@ -453,28 +272,85 @@ def geocode():
     
     return jsonify(location)
 
+@schools_bp.route('/locations/refresh', methods=['POST'])
+def refresh_locations():
+    """Locate schools without stored coordinates and reload the location snapshot (admin only)
+
+    Re-geocoding every school is only available through backfill_school_coordinates.py --force.
+    """
+    admin_token = os.getenv('ADMIN_API_TOKEN')
+    if not admin_token:
+        return jsonify({'error': 'Location refresh is disabled'}), 403
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {admin_token}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        located_count = refresh_school_locations()
+        return jsonify({'located_schools': located_count})
+    except Exception as e:
+        return jsonify({'error': f'Location refresh error: {str(e)}'}), 500
+
+@schools_bp.route('/aliases/unmatched', methods=['GET'])
+def get_unmatched_school_names():
+    """Government school names that could not be matched to a school in the database"""
+    try:
+        unmatched = get_unmatched_aliases()
+        return jsonify({'unmatched_schools': unmatched, 'total_count': len(unmatched)})
+    except Exception as e:
+        return jsonify({'error': f'Alias report error: {str(e)}'}), 500
+
+def build_database_payload(schools):
+    """Full dataset response: every school's to_dict()"""
+    schools_data = []
+    for school in schools:
+        school_dict = school.to_dict()
+        schools_data.append(school_dict)
+    
+    return {
+        'schools': schools_data,
+        'total_count': len(schools_data)
+    }
+
 @schools_bp.route('/database', methods=['GET'])
+@conditional_on_dataset()
 def get_schools_from_database():
     """Get all schools from database - useful for debugging"""
     try:
-        schools = School.query.all()
-        schools_data = []
-        for school in schools:
-            school_dict = school.to_dict()
-            schools_data.append(school_dict)
+        snapshot = get_school_snapshot()
+        if snapshot is not None:
+            # Rendered and gzipped once per dataset version
+            return prerendered_json(snapshot.version, 'database', lambda: build_database_payload(snapshot.records))
         
-        return jsonify({
-            'schools': schools_data,
-            'total_count': len(schools_data)
-        })
+        return jsonify(build_database_payload(School.query.options(*SCHOOL_FULL_LOAD).all()))
     except Exception as e:
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
+@schools_bp.route('/export', methods=['GET'])
+def export_schools():
+    """Stream every school from the database as NDJSON (default) or CSV"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    # Rows are fetched batch by batch while the response is written
+    mimetype, chunks = EXPORT_FORMATS[export_format]
+    response = Response(stream_with_context(chunks()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=schools.{export_format}'
+    return response
+
 @schools_bp.route('/database/<school_key>', methods=['GET'])
+@conditional_on_dataset()
 def get_school_by_key(school_key):
     """Get a specific school by its key from database"""
     try:
-        school = School.query.filter_by(school_key=school_key).first()
+        snapshot = get_school_snapshot()
+        if snapshot is not None:
+            school = snapshot.by_key.get(school_key)
+            if not school:
+                return jsonify({'error': 'School not found'}), 404
+            return prerendered_json(snapshot.version, ('database', school_key), school.to_dict)
+        
+        school = query_school_by_key(school_key)
         if not school:
             return jsonify({'error': 'School not found'}), 404
         
@@ -495,99 +371,36 @@ def search_schools_by_name():
         return jsonify({'suggestions': [], 'total': 0, 'message': 'Query too short, minimum 2 characters'})
     
     try:
-        # Search in database first (most relevant)
-        db_suggestions = []
-        db_schools = School.query.filter(School.name.ilike(f'%{query}%')).limit(limit).all()
-        
-        for school in db_schools:
-            db_suggestions.append({
-                'id': school.school_key,
-                'name': school.name,
-                'source': 'database',
-                'has_p1_data': True,
-                'year': school.year,
-                'competitiveness_tier': school.competitiveness_tier,
-                'total_vacancy': school.total_vacancy,
-                'balloted': school.balloted
-            })
-        
-        # If we have enough suggestions from database, return them
-        if len(db_suggestions) >= limit:
-            return jsonify({
-                'suggestions': db_suggestions[:limit],
-                'total': len(db_suggestions),
-                'query': query
-            })
-        
-        # Otherwise, supplement with government API data
-        try:
-            gov_schools = get_schools_data()
-            gov_suggestions = []
-            
-            query_lower = query.lower()
-            for school in gov_schools:
-                school_name = school.get('name', '')
-                if query_lower in school_name.lower():
-                    # Check if we already have this school from database
-                    already_included = any(db_school['name'].lower() == school_name.lower() 
-                                         for db_school in db_suggestions)
-                    
-                    if not already_included:
-                        gov_suggestions.append({
-                            'id': school_name.lower().replace(' ', '_').replace('-', '_'),
-                            'name': school_name,
-                            'source': 'government',
-                            'has_p1_data': False,
-                            'address': school.get('address', ''),
-                            'phone': school.get('phone', ''),
-                            'email': school.get('email', '')
-                        })
-            
-            # Sort government suggestions by relevance (exact match first, then starts with, then contains)
-            def sort_relevance(item):
-                name_lower = item['name'].lower()
-                if name_lower == query_lower:
-                    return 0  # Exact match
-                elif name_lower.startswith(query_lower):
-                    return 1  # Starts with query
-                else:
-                    return 2  # Contains query
-            
-            gov_suggestions.sort(key=sort_relevance)
-            
-            # Combine results (database first, then government)
-            all_suggestions = db_suggestions + gov_suggestions
-            
-            return jsonify({
-                'suggestions': all_suggestions[:limit],
-                'total': len(all_suggestions),
-                'query': query,
-                'database_matches': len(db_suggestions),
-                'government_matches': len(gov_suggestions)
-            })
-            
-        except Exception as e:
-            print(f"Error fetching government data: {e}")
-            # Return only database results if government API fails
-            return jsonify({
-                'suggestions': db_suggestions,
-                'total': len(db_suggestions),
-                'query': query,
-                'note': 'Limited to database results due to external API error'
-            })
+        # Ranked suggestions from the in-memory index over database and government names
+        result = get_name_search_index().search(query, limit)
+        return jsonify({
+            'suggestions': result['suggestions'],
+            'total': result['total'],
+            'query': query,
+            'database_matches': result['database_matches'],
+            'government_matches': result['government_matches']
+        })
     
     except Exception as e:
         return jsonify({'error': f'Search error: {str(e)}'}), 500
 
 @schools_bp.route('/school-detail/<path:school_name>', methods=['GET'])
+@conditional_on_dataset(government_data=True)
 def get_school_detail(school_name):
     """Get comprehensive school details including P1 data, contact info, and analysis"""
     try:
         # Decode URL-encoded school name
         school_name = school_name.replace('%20', ' ')
         
-        # Try to find in database first
-        db_school = School.query.filter(School.name.ilike(school_name)).first()
+        # Try to find in database first (names with LIKE wildcards keep using the SQL match)
+        snapshot = get_school_snapshot()
+        if snapshot is not None and not any(char in school_name for char in '%_\\'):
+            db_school = snapshot.by_name.get(school_name.lower())
+        else:
+            db_school = query_school_by_name(school_name)
+            if db_school is not None and snapshot is not None:
+                # Serve the analysis from the snapshot's precomputed phase statistics
+                db_school = snapshot.by_key.get(db_school.school_key, db_school)
         
         if db_school:
             # Found in database - return comprehensive data
@@ -616,71 +429,52 @@ def get_school_detail(school_name):
                 'analysis': {
                     'overall_success_rate': db_school.calculate_overall_success_rate(),
                     'most_competitive_phase': db_school.get_most_competitive_phase(),
+                    'competitiveness_percentile': db_school.get_competitiveness_percentile(),
                     'recommendation': db_school.get_strategy_recommendation()
                 }
             }
             
             # Try to get additional contact info from government API
+            contact_lookup_failed = False
             try:
-                gov_schools = get_schools_data()
-                db_school_name_lower = db_school.name.lower()
+                contact_name = lookup_contact_name(db_school)
+                gov_school = find_government_school(contact_name) if contact_name else None
                 
-                # First try exact match
-                for gov_school in gov_schools:
-                    if gov_school['name'].lower() == db_school_name_lower:
-                        school_detail['contact_info'] = {
-                            'address': gov_school.get('address', 'Not available'),
-                            'postal_code': gov_school.get('postal_code', 'Not available'),
-                            'phone': gov_school.get('phone', 'Not available'),
-                            'email': gov_school.get('email', 'Not available'),
-                            'website': gov_school.get('website', 'Not available'),
-                            'mrt_desc': gov_school.get('mrt_desc', 'Not available'),
-                            'bus_desc': gov_school.get('bus_desc', 'Not available')
-                        }
-                        break
+                if gov_school:
+                    school_detail['contact_info'] = {
+                        'address': gov_school.get('address', 'Not available'),
+                        'postal_code': gov_school.get('postal_code', 'Not available'),
+                        'phone': gov_school.get('phone', 'Not available'),
+                        'email': gov_school.get('email', 'Not available'),
+                        'website': gov_school.get('website', 'Not available'),
+                        'mrt_desc': gov_school.get('mrt_desc', 'Not available'),
+                        'bus_desc': gov_school.get('bus_desc', 'Not available')
+                    }
+                elif contact_match_possible(db_school):
+                    # No good match found
+                    school_detail['contact_info'] = {
+                        'message': 'Contact information not available - no matching school found in government database'
+                    }
                 else:
-                    # If no exact match, try enhanced fuzzy matching
-                    db_words = [word for word in db_school_name_lower.replace('(', '').replace(')', '').split() 
-                               if len(word) >= 3 and word not in ['school', 'primary']]
-                    
-                    if len(db_words) >= 2:  # Only try fuzzy match if we have significant words
-                        for gov_school in gov_schools:
-                            gov_name_lower = gov_school['name'].lower()
-                            # Require at least 80% of significant words to match
-                            matches = sum(1 for word in db_words if word in gov_name_lower)
-                            match_ratio = matches / len(db_words)
-                            
-                            if match_ratio >= 0.8:  # 80% match required
-                                school_detail['contact_info'] = {
-                                    'address': gov_school.get('address', 'Not available'),
-                                    'postal_code': gov_school.get('postal_code', 'Not available'),
-                                    'phone': gov_school.get('phone', 'Not available'),
-                                    'email': gov_school.get('email', 'Not available'),
-                                    'website': gov_school.get('website', 'Not available'),
-                                    'mrt_desc': gov_school.get('mrt_desc', 'Not available'),
-                                    'bus_desc': gov_school.get('bus_desc', 'Not available')
-                                }
-                                break
-                        else:
-                            # No good match found
-                            school_detail['contact_info'] = {
-                                'message': 'Contact information not available - no matching school found in government database'
-                            }
-                    else:
-                        school_detail['contact_info'] = {
-                            'message': 'Contact information not available - insufficient data for matching'
-                        }
+                    school_detail['contact_info'] = {
+                        'message': 'Contact information not available - insufficient data for matching'
+                    }
             except:
                 school_detail['contact_info'] = {
                     'message': 'Contact information could not be retrieved'
                 }
-                
-            return jsonify(school_detail)
+                contact_lookup_failed = True
+            
+            response = jsonify(school_detail)
+            if contact_lookup_failed:
+                # Transient failure; don't let caches keep this body
+                response.cache_control.no_store = True
+            return response
         
         else:
             # Not in database - try to find in government API
             try:
-                gov_schools = get_schools_data()
+                gov_schools = get_loaded_schools_data()
                 for gov_school in gov_schools:
                     if gov_school['name'].lower() == school_name.lower():
                         school_detail = {
@@ -722,7 +516,45 @@ def get_school_detail(school_name):
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 
+def build_rankings_payload(schools, total_count, limit, offset, competitiveness_filter, balloted_filter):
+    """Rankings response for one page of schools ordered by competitiveness"""
+    rankings = []
+    for i, school in enumerate(schools):
+        # Phase 2C figures stored at ingest: vacancies, applicants and applicants per vacancy
+        vacancies_2c, applicants_2c, ratio_2c = school.get_phase_2c_figures()
+        
+        school_data = {
+            'rank': offset + i + 1,
+            'name': school.name,
+            'competitiveness_tier': school.competitiveness_tier,
+            'balloted': school.balloted,
+            'total_vacancy': school.total_vacancy,
+            'year': school.year,
+            'vacancies_2c': vacancies_2c,
+            'applicants_2c': applicants_2c,
+            'ratio_2c': ratio_2c
+        }
+        rankings.append(school_data)
+    
+    has_more = offset + limit < total_count
+    return {
+        'rankings': rankings,
+        'pagination': {
+            'total': total_count,
+            'limit': limit,
+            'offset': offset,
+            'has_more': has_more,
+            # Pass as ?cursor= to get the next page without an OFFSET scan
+            'next_cursor': encode_rankings_cursor(schools[-1], offset + len(schools)) if has_more and schools else None
+        },
+        'filters_applied': {
+            'competitiveness': competitiveness_filter,
+            'balloted': balloted_filter
+        }
+    }
+
 @schools_bp.route('/rankings', methods=['GET'])
+@conditional_on_dataset()
 def get_school_rankings():
     """Get school rankings based on competitiveness"""
     try:
@@ -732,68 +564,77 @@ def get_school_rankings():
         competitiveness_filter = request.args.get('competitiveness')  # 'High', 'Medium', 'Low'
         balloted_filter = request.args.get('balloted')  # 'true', 'false'
         
-        # Base query
-        query = School.query
-        
-        # Apply filters
-        if competitiveness_filter:
-            query = query.filter(School.competitiveness_tier == competitiveness_filter)
-        
-        if balloted_filter is not None:
-            balloted_bool = balloted_filter.lower() == 'true'
-            query = query.filter(School.balloted == balloted_bool)
-        
-        # Order by competitiveness score (descending)
-        query = query.order_by(School.overall_competitiveness_score.desc())
-        
-        # Get total count for pagination
-        total_count = query.count()
+        balloted_bool = balloted_filter.lower() == 'true' if balloted_filter is not None else None
         
-        # Apply pagination
-        schools = query.offset(offset).limit(limit).all()
+        # Keyset pagination: a cursor from a previous page replaces offset
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            try:
+                after = decode_rankings_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
         
-        # Format results
-        rankings = []
-        for i, school in enumerate(schools):
-            # Get Phase 2C data
-            phase_2c_data = school.get_phase_data('phase_2c')
-            vacancies_2c = phase_2c_data.get('vacancies', 0) if phase_2c_data else 0
-            applicants_2c = phase_2c_data.get('applicants', 0) if phase_2c_data else 0
+        # Custom order and metric filters: ?sort=ratio_2b:desc,total_vacancy&min_ballot_odds_2c=0.5
+        sort_param = request.args.get('sort')
+        try:
+            limit, offset = parse_page(limit, offset)
+            location = parse_location(request.args)
+            sort_keys = parse_sort(sort_param, location) if sort_param else ()
+            metric_filters = parse_metric_filters(request.args, location)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        snapshot = get_school_snapshot()
+        if sort_keys or metric_filters or location is not None:
+            # Served from the snapshot's precomputed sort orders only
+            if snapshot is None:
+                return jsonify({'error': 'Custom sorting and metric filters are temporarily unavailable'}), 503
             
-            # Calculate ratio (applicants per vacancy)
-            if vacancies_2c > 0:
-                ratio_2c = applicants_2c / vacancies_2c
-            elif applicants_2c > 0:
-                ratio_2c = float('inf')  # Infinity when no vacancies but have applicants
-            else:
-                ratio_2c = 0  # No competition
+            def build_custom_payload():
+                rows, metric_values = custom_rankings(snapshot, sort_keys, metric_filters,
+                                                      competitiveness_filter, balloted_bool, location)
+                # Cursors of custom rankings resume at their position in the order
+                start = after[2] if after else offset
+                page_rows = rows[start:start + limit]
+                payload = build_rankings_payload([snapshot.records[row] for row in page_rows], len(rows), limit, start,
+                                                 competitiveness_filter, balloted_filter)
+                
+                names = [name for name, _ in sort_keys] + [name for name, _, _ in metric_filters]
+                names = list(dict.fromkeys(names + (['distance', 'distance_band'] if location is not None else [])))
+                for school_data, row in zip(payload['rankings'], page_rows):
+                    school_data['metrics'] = metric_values(row, names)
+                payload['sort'] = [{'metric': name, 'order': 'desc' if descending else 'asc'}
+                                   for name, descending in sort_keys]
+                payload['filters_applied']['metrics'] = {
+                    name: {'min': minimum, 'max': maximum} for name, minimum, maximum in metric_filters
+                }
+                payload['filters_applied']['location'] = (
+                    {'latitude': location[0], 'longitude': location[1]} if location is not None else None
+                )
+                return payload
             
-            school_data = {
-                'rank': offset + i + 1,
-                'name': school.name,
-                'competitiveness_tier': school.competitiveness_tier,
-                'balloted': school.balloted,
-                'total_vacancy': school.total_vacancy,
-                'year': school.year,
-                'vacancies_2c': vacancies_2c,
-                'applicants_2c': applicants_2c,
-                'ratio_2c': ratio_2c
-            }
-            rankings.append(school_data)
+            if location is not None:
+                return jsonify(build_custom_payload())
+            cache_key = ('rankings', limit, offset, competitiveness_filter, balloted_filter, cursor,
+                         sort_keys, metric_filters)
+            return prerendered_json(snapshot.version, cache_key, build_custom_payload, parameterized=True)
+        
+        if snapshot is not None:
+            def build_payload():
+                # Pre-sorted in memory by competitiveness score (descending)
+                ranked = snapshot.rankings(tier=competitiveness_filter or None, balloted=balloted_bool)
+                start = ranking_position(ranked, after[0], after[1]) if after else offset
+                page = ranked[start:start + limit]
+                return build_rankings_payload(page, len(ranked), limit, start, competitiveness_filter, balloted_filter)
+            
+            cache_key = ('rankings', limit, offset, competitiveness_filter, balloted_filter, cursor)
+            return prerendered_json(snapshot.version, cache_key, build_payload,
+                                    parameterized=cache_key != DEFAULT_RANKINGS_KEY)
         
-        return jsonify({
-            'rankings': rankings,
-            'pagination': {
-                'total': total_count,
-                'limit': limit,
-                'offset': offset,
-                'has_more': offset + limit < total_count
-            },
-            'filters_applied': {
-                'competitiveness': competitiveness_filter,
-                'balloted': balloted_filter
-            }
-        })
+        schools, total_count = query_rankings(competitiveness_filter, balloted_bool, limit, offset, after)
+        offset = after[2] if after else offset
+        return jsonify(build_rankings_payload(schools, total_count, limit, offset, competitiveness_filter, balloted_filter))
         
     except Exception as e:
         return jsonify({
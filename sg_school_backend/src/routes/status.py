@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify
+from src.services.conditional_get import get_conditional_get_stats
+from src.services.geocode_cache import get_geocode_cache_stats
+from src.services.government_data import get_schools_data_status
+from src.services.dataset_sync import get_sync_status
+from src.services.http_client import get_circuit_breaker_status
+from src.services.name_matching import get_name_lookup_stats
+from src.services.prerendered import get_prerendered_stats
+from src.services.rankings import get_rankings_count_stats
+
+status_bp = Blueprint('status', __name__)
+
+@status_bp.route('/caches', methods=['GET'])
+def get_cache_status():
+    """Get hit/miss counters and state of the in-process caches"""
+    return jsonify({
+        'geocode': get_geocode_cache_stats(),
+        'schools_data': get_schools_data_status(),
+        'dataset_sync': get_sync_status(),
+        'name_lookups': get_name_lookup_stats(),
+        'prerendered_responses': get_prerendered_stats(),
+        'rankings_counts': get_rankings_count_stats(),
+        'conditional_get': get_conditional_get_stats()
+    })
+
+@status_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Get circuit breaker state for every external API"""
+    return jsonify({
+        'circuit_breakers': get_circuit_breaker_status()
+    })
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-import requests
 import json
 import os
+from src.services.http_client import http_post
 
 strategy_bp = Blueprint('strategy', __name__)
 
@@ -29,7 +29,7 @@ def call_deepseek_api(messages):
             'max_tokens': 2500  # Increased for more detailed responses
         }
         
-        response = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=60)
+        response = http_post('deepseek', DEEPSEEK_API_URL, headers=headers, json=payload)
         
         if response.status_code == 200:
             result = response.json()
@@ -0,0 +1,151 @@
+"""
+Small thread-safe in-process caches shared by the service modules.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+class LRUTTLCache:
+    """Bounded LRU cache whose entries expire after a per-entry TTL"""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (found, value); expired entries count as not found"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class StaleWhileRevalidateCache:
+    """Single-value cache with TTL, background refresh and single-flight loading"""
+
+    def __init__(self, name, loader, ttl, retry_interval):
+        self.name = name
+        self._loader = loader
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_at = None  # time.monotonic() of the last successful load
+        self._loaded_at_wall = None
+        self._loading = None  # threading.Event while a load is in flight
+        self._next_attempt_at = 0.0
+        self._refresh_count = 0
+        self._failure_count = 0
+        self._last_error = None
+        self._last_error_at = None
+
+    def _load(self, done):
+        try:
+            value = self._loader()
+            with self._lock:
+                self._value = value
+                self._loaded_at = time.monotonic()
+                self._loaded_at_wall = datetime.utcnow()
+                self._refresh_count += 1
+        except Exception as e:
+            print(f"Error refreshing {self.name}: {e}")
+            with self._lock:
+                self._failure_count += 1
+                self._last_error = str(e)
+                self._last_error_at = datetime.utcnow()
+                self._next_attempt_at = time.monotonic() + self.retry_interval
+        finally:
+            with self._lock:
+                self._loading = None
+            done.set()
+
+    def _load_in_background(self, now):
+        # Caller holds the lock
+        if self._loading is None and now >= self._next_attempt_at:
+            self._loading = threading.Event()
+            threading.Thread(target=self._load, args=(self._loading,), daemon=True).start()
+
+    def get(self):
+        """Return the cached value (possibly stale), or None if nothing could be loaded"""
+        with self._lock:
+            now = time.monotonic()
+            if self._value is not None:
+                if now - self._loaded_at >= self.ttl:
+                    # Serve the stale copy while one background thread refreshes it
+                    self._load_in_background(now)
+                return self._value
+
+            done = self._loading
+            owner = done is None
+            if owner:
+                if now < self._next_attempt_at:
+                    # Cold cache and the last attempt just failed - fail fast
+                    return None
+                self._loading = done = threading.Event()
+
+        if owner:
+            self._load(done)
+        else:
+            done.wait()
+
+        with self._lock:
+            return self._value
+
+    def get_nowait(self):
+        """Like get(), but never waits for a load: on a cold cache one starts in the background and None is returned"""
+        with self._lock:
+            now = time.monotonic()
+            if self._value is None or now - self._loaded_at >= self.ttl:
+                self._load_in_background(now)
+            return self._value
+
+    def invalidate(self):
+        """Mark the cached value stale so the next read triggers a refresh"""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._loaded_at = time.monotonic() - self.ttl
+            self._next_attempt_at = 0.0
+
+    def status(self):
+        """Age, size and refresh failure counters"""
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+            return {
+                'loaded': self._value is not None,
+                'record_count': len(self._value) if self._value is not None else 0,
+                'age_seconds': round(age, 1) if age is not None else None,
+                'ttl_seconds': self.ttl,
+                'stale': age is None or age >= self.ttl,
+                'refreshing': self._loading is not None,
+                'last_refreshed_at': self._loaded_at_wall.isoformat() + 'Z' if self._loaded_at_wall else None,
+                'refresh_count': self._refresh_count,
+                'refresh_failures': self._failure_count,
+                'last_error': self._last_error,
+                'last_error_at': self._last_error_at.isoformat() + 'Z' if self._last_error_at else None
+            }
@@ -0,0 +1,104 @@
+"""
+Per-upstream circuit breaker.
+
+A breaker opens after ``failure_threshold`` consecutive failed or slow calls.
+While open, calls fail immediately with ``CircuitOpenError`` so callers can
+serve cached or fallback results instead of waiting out a timeout. After
+``reset_timeout`` seconds a limited number of half-open trial calls are let
+through: a success closes the breaker, a failure opens it again.
+"""
+import threading
+import time
+from datetime import datetime
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with slow-call detection"""
+
+    def __init__(self, name, failure_threshold=5, slow_call_seconds=None, reset_timeout=30, half_open_max_calls=1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._opened_at_wall = None
+        self._half_open_calls = 0
+        self._counters = {'calls': 0, 'successes': 0, 'failures': 0, 'slow_calls': 0, 'rejected': 0, 'opened': 0}
+        self._last_failure = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """Reserve a call slot; raises CircuitOpenError if the call must not be made"""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._counters['rejected'] += 1
+                    raise CircuitOpenError(f"Circuit for {self.name} is open")
+                self._state = HALF_OPEN
+                self._half_open_calls = 0
+
+            if self._state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self._counters['rejected'] += 1
+                    raise CircuitOpenError(f"Circuit for {self.name} is half-open and a trial call is in progress")
+                self._half_open_calls += 1
+
+            self._counters['calls'] += 1
+
+    def record_success(self, duration=None):
+        """Record a completed call; calls slower than slow_call_seconds count as failures"""
+        if self.slow_call_seconds is not None and duration is not None and duration >= self.slow_call_seconds:
+            with self._lock:
+                self._counters['slow_calls'] += 1
+            self.record_failure(f"slow call ({duration:.1f}s)")
+            return
+
+        with self._lock:
+            self._counters['successes'] += 1
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._opened_at = None
+
+    def record_failure(self, reason=None):
+        """Record a failed call, opening the circuit when the threshold is reached"""
+        with self._lock:
+            self._counters['failures'] += 1
+            self._consecutive_failures += 1
+            self._last_failure = reason
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._counters['opened'] += 1
+                    print(f"⚡ Circuit for {self.name} opened after {self._consecutive_failures} consecutive failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._opened_at_wall = datetime.utcnow()
+
+    def status(self):
+        """Current state and counters"""
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'slow_call_seconds': self.slow_call_seconds,
+                'reset_timeout_seconds': self.reset_timeout,
+                'opened_at': self._opened_at_wall.isoformat() + 'Z' if self._state != CLOSED and self._opened_at_wall else None,
+                'last_failure': self._last_failure,
+                **self._counters
+            }
@@ -0,0 +1,114 @@
+"""
+ETags and conditional GET for responses that only change with the datasets.
+
+The read endpoints return the same body for a URL until School data is
+re-migrated or the government dataset changes. Views decorated with
+``conditional_on_dataset`` get a strong ETag derived from the content hash
+of those datasets (``SchoolSnapshot.version``, ``get_schools_data_version``)
+and the request URL, plus a public ``Cache-Control`` header, so browsers
+and CDNs can keep them. A request whose ``If-None-Match`` names the current
+tag gets ``304 Not Modified`` before the view builds anything. Tags are
+compared weakly, as RFC 7232 requires for If-None-Match, so a proxy that
+weakens them (e.g. nginx when it gzips) still gets 304s.
+
+A gzipped body gets its own tag. Whether a view gzips depends on the body
+and on the client's ``Accept-Encoding``, so the tag each URL and version
+was served with, for clients with and without gzip, is remembered; a
+conditional request is only compared with the tag of the representation it
+would be served. Until this process has served that representation the
+request is passed to the view.
+
+Only 200 responses are tagged; views mark bodies that must not be reused
+(e.g. ones reporting a transient lookup error) with ``Cache-Control:
+no-store``. Without a School snapshot the version is unknown and responses
+go out untagged.
+"""
+import functools
+import hashlib
+import os
+import threading
+from flask import current_app, make_response, request
+from src.services.cache import LRUTTLCache
+from src.services.government_data import get_schools_data_version
+from src.services.school_snapshot import get_school_snapshot
+
+DATASET_CACHE_MAX_AGE_SECONDS = int(os.getenv('DATASET_CACHE_MAX_AGE_SECONDS', 300))
+SERVED_TAG_CACHE_SIZE = 4096
+SERVED_TAG_TTL_SECONDS = 24 * 3600
+
+# A gzipped body is a different representation, so it gets its own strong tag
+GZIP_ETAG_SUFFIX = '-gzip'
+
+# (dataset tag, client accepts gzip) -> tag of the representation served
+_served_tags = LRUTTLCache(maxsize=SERVED_TAG_CACHE_SIZE, ttl=SERVED_TAG_TTL_SECONDS)
+
+_stats_lock = threading.Lock()
+_stats = {'tagged': 0, 'not_modified': 0}
+
+def _count(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+def dataset_versions(school_data=True, government_data=False):
+    """Versions of the datasets a response depends on; None when one is unavailable"""
+    versions = []
+    if school_data:
+        snapshot = get_school_snapshot()
+        if snapshot is None:
+            return None
+        versions.append(snapshot.version)
+    if government_data:
+        try:
+            versions.append(get_schools_data_version())
+        except Exception as e:
+            print(f"Error getting government dataset version: {e}")
+            return None
+    return tuple(versions)
+
+def dataset_etag(versions):
+    """Strong ETag for the current request URL at these dataset versions"""
+    digest = hashlib.sha256()
+    for part in versions + (request.full_path,):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+def _add_cache_headers(response):
+    response.cache_control.public = True
+    response.cache_control.max_age = DATASET_CACHE_MAX_AGE_SECONDS
+    response.vary.add('Accept-Encoding')
+    return response
+
+def conditional_on_dataset(school_data=True, government_data=False):
+    """Decorator: ETag, Cache-Control and 304 handling for a view that depends only on the URL and the datasets"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = dataset_versions(school_data, government_data)
+            if versions is None:
+                return view(*args, **kwargs)
+
+            etag = dataset_etag(versions)
+            served_key = (etag, bool(request.accept_encodings['gzip']))
+            found, tag = _served_tags.get(served_key)
+            if found and request.if_none_match.contains_weak(tag):
+                _count('not_modified')
+                response = current_app.response_class(status=304)
+                response.set_etag(tag)
+                return _add_cache_headers(response)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.cache_control.no_store:
+                tag = etag + GZIP_ETAG_SUFFIX if response.content_encoding == 'gzip' else etag
+                response.set_etag(tag)
+                _served_tags.set(served_key, tag)
+                _add_cache_headers(response)
+                _count('tagged')
+            return response
+        return wrapper
+    return decorator
+
+def get_conditional_get_stats():
+    """Counters of tagged responses and 304 answers"""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,55 @@
+"""
+Change notifications for the P1 school data.
+
+In-memory structures derived from the School table (name indexes, caches,
+snapshots) register a callback with ``on_school_data_changed``. The callbacks
+run after any committed transaction that inserted, updated or deleted School
+or PhaseStat rows, including bulk ``query.delete()``/``query.update()`` statements.
+Changes made by another process (e.g. a migration script) are only picked up
+after a restart or an explicit ``notify_school_data_changed()``.
+"""
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.models.user import School, PhaseStat
+
+WATCHED_MODELS = [School, PhaseStat]
+
+_listeners = []
+_CHANGED_FLAG = 'school_data_changed'
+
+def on_school_data_changed(callback):
+    """Register a callback to run after School data changes (usable as a decorator)"""
+    _listeners.append(callback)
+    return callback
+
+def notify_school_data_changed():
+    """Run every registered callback"""
+    for callback in list(_listeners):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error handling school data change in {getattr(callback, '__name__', callback)}: {e}")
+
+def _is_watched(instance):
+    return isinstance(instance, tuple(WATCHED_MODELS))
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flushed_changes(session, flush_context):
+    if any(_is_watched(instance) for instance in chain(session.new, session.dirty, session.deleted)):
+        session.info[_CHANGED_FLAG] = True
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_changes(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is not None:
+        if orm_execute_state.bind_mapper.class_ in WATCHED_MODELS:
+            orm_execute_state.session.info[_CHANGED_FLAG] = True
+
+@event.listens_for(Session, 'after_commit')
+def _notify_after_commit(session):
+    if session.info.pop(_CHANGED_FLAG, False):
+        notify_school_data_changed()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_CHANGED_FLAG, None)
@@ -0,0 +1,163 @@
+"""
+Incremental sync of the data.gov.sg school dataset into the local mirror.
+
+Each run pages through the dataset, hashes every primary school record and
+upserts only the rows whose hash changed; schools that disappeared from the
+dataset are removed. When rows changed, new and moved schools are located and
+the search index is rebuilt. Read endpoints serve from the mirror, so the government
+API is no longer on the request path.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from src.models.user import db, GovernmentSchool
+from src.services.government_data import fetch_schools_data, invalidate_schools_data
+from src.services.name_aliases import rebuild_school_aliases
+from src.services.school_locations import refresh_school_locations
+
+DATASET_SYNC_INTERVAL_SECONDS = int(os.getenv('DATASET_SYNC_INTERVAL_SECONDS', 6 * 3600))
+DATASET_SYNC_PAGE_SIZE = int(os.getenv('DATASET_SYNC_PAGE_SIZE', 500))
+
+MIRRORED_FIELDS = ['address', 'postal_code', 'phone', 'email', 'website', 'mrt_desc', 'bus_desc']
+
+_sync_lock = threading.Lock()
+_sync_status = {
+    'last_run_at': None,
+    'last_success_at': None,
+    'last_result': None,
+    'last_error': None,
+    'runs': 0,
+    'failures': 0
+}
+
+def record_hash(school):
+    """Stable hash of the government fields of a school record"""
+    payload = json.dumps({field: school.get(field, '') for field in ['name'] + MIRRORED_FIELDS}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def sync_government_schools(page_size=None):
+    """Sync the GovernmentSchool mirror with data.gov.sg
+
+    Returns counts of inserted, updated, deleted and unchanged rows. Raises if
+    the dataset could not be fetched; an empty response leaves the mirror as is.
+    """
+    with _sync_lock:
+        _sync_status['runs'] += 1
+        _sync_status['last_run_at'] = datetime.utcnow()
+        try:
+            result = _sync(page_size or DATASET_SYNC_PAGE_SIZE)
+        except Exception as e:
+            _sync_status['failures'] += 1
+            _sync_status['last_error'] = str(e)
+            raise
+
+        _sync_status['last_success_at'] = datetime.utcnow()
+        _sync_status['last_result'] = result
+        _sync_status['last_error'] = None
+        return result
+
+def _sync(page_size):
+    schools = fetch_schools_data(page_size=page_size)
+    if not schools:
+        raise ValueError('data.gov.sg returned no primary school records - mirror left unchanged')
+
+    incoming = {}
+    for school in schools:
+        if school['name']:
+            incoming[school['name']] = school
+
+    existing = {row.name: row for row in GovernmentSchool.query.all()}
+    now = datetime.utcnow()
+    result = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    try:
+        for name, school in incoming.items():
+            new_hash = record_hash(school)
+            row = existing.get(name)
+
+            if row is None:
+                row = GovernmentSchool(name=name, record_hash=new_hash, synced_at=now)
+                for field in MIRRORED_FIELDS:
+                    setattr(row, field, school.get(field, ''))
+                db.session.add(row)
+                result['inserted'] += 1
+            elif row.record_hash != new_hash:
+                # A changed address invalidates the stored coordinates
+                if row.address != school.get('address', '') or row.postal_code != school.get('postal_code', ''):
+                    row.latitude = None
+                    row.longitude = None
+                for field in MIRRORED_FIELDS:
+                    setattr(row, field, school.get(field, ''))
+                row.record_hash = new_hash
+                row.synced_at = now
+                result['updated'] += 1
+            else:
+                result['unchanged'] += 1
+
+        for name, row in existing.items():
+            if name not in incoming:
+                db.session.delete(row)
+                result['deleted'] += 1
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if result['inserted'] or result['updated'] or result['deleted']:
+        invalidate_schools_data()
+
+    print(f"🔄 Government dataset sync: {result['inserted']} inserted, {result['updated']} updated, "
+          f"{result['deleted']} deleted, {result['unchanged']} unchanged")
+
+    # Re-match government names on every run so School changes since the last sync are picked up
+    rebuild_school_aliases(list(incoming.values()))
+
+    # Locate new and moved schools and swap the spatial index so searches see the synced school set
+    if result['inserted'] or result['updated'] or result['deleted']:
+        refresh_school_locations()
+    return result
+
+def get_sync_status():
+    """Last run time, result and failure counters of the dataset sync"""
+    status = dict(_sync_status)
+    for key in ['last_run_at', 'last_success_at']:
+        if status[key] is not None:
+            status[key] = status[key].isoformat() + 'Z'
+    status['interval_seconds'] = DATASET_SYNC_INTERVAL_SECONDS
+    return status
+
+def _run_scheduler(app, interval_seconds):
+    # Sync straight away when the mirror is empty, otherwise wait one interval
+    with app.app_context():
+        try:
+            mirror_empty = GovernmentSchool.query.count() == 0
+        except Exception:
+            mirror_empty = True
+
+    delay = 0 if mirror_empty else interval_seconds
+    while True:
+        time.sleep(delay)
+        delay = interval_seconds
+        with app.app_context():
+            try:
+                sync_government_schools()
+            except Exception as e:
+                print(f"❌ Government dataset sync failed: {e}")
+            finally:
+                db.session.remove()
+
+def start_sync_scheduler(app, interval_seconds=None):
+    """Start the background sync job; an interval of 0 disables it"""
+    interval_seconds = DATASET_SYNC_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+    if interval_seconds <= 0:
+        print("⏸️  Government dataset sync scheduler disabled")
+        return None
+
+    thread = threading.Thread(target=_run_scheduler, args=(app, interval_seconds), daemon=True, name='dataset-sync')
+    thread.start()
+    print(f"🕒 Government dataset sync scheduled every {interval_seconds}s")
+    return thread
@@ -0,0 +1,53 @@
+"""
+Vectorized haversine distances.
+
+The haversine formula evaluated over NumPy coordinate arrays, so ranking one
+origin (or N origins) against every school is a single array operation
+instead of a Python loop.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+def _haversine(lat1, lon1, lat2, lon2):
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    delta_lat = np.radians(lat2 - lat1)
+    delta_lon = np.radians(lon2 - lon1)
+
+    a = np.sin(delta_lat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon / 2) ** 2
+    # Clip guards against tiny negative values of 1 - a from rounding
+    a = np.clip(a, 0.0, 1.0)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_KM * c
+
+def haversine_vector(latitude, longitude, latitudes, longitudes):
+    """Distances in km from one origin to each destination
+
+    Returns a float array with the same length as ``latitudes``.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    return _haversine(float(latitude), float(longitude), latitudes, longitudes)
+
+def haversine_matrix(origin_latitudes, origin_longitudes, latitudes, longitudes):
+    """Distance matrix in km for N origins x M destinations
+
+    Returns a float array of shape (N, M).
+    """
+    origin_latitudes = np.asarray(origin_latitudes, dtype=np.float64)[:, np.newaxis]
+    origin_longitudes = np.asarray(origin_longitudes, dtype=np.float64)[:, np.newaxis]
+    latitudes = np.asarray(latitudes, dtype=np.float64)[np.newaxis, :]
+    longitudes = np.asarray(longitudes, dtype=np.float64)[np.newaxis, :]
+    return _haversine(origin_latitudes, origin_longitudes, latitudes, longitudes)
+
+# Upper bounds (km) of the distance bands; band 1 is within the first bound, the last band is beyond all of them
+DISTANCE_BANDS_KM = (1.0, 2.0)
+
+def distance_bands(distances):
+    """Distance band (1-based) of each distance; NaN where the distance is unknown"""
+    distances = np.asarray(distances, dtype=np.float64)
+    bands = np.searchsorted(DISTANCE_BANDS_KM, distances, side='left') + 1.0
+    bands[np.isnan(distances)] = np.nan
+    return bands
@@ -0,0 +1,75 @@
+"""
+Streaming export of the School table as NDJSON or CSV.
+
+Rows are read in batches of ``EXPORT_BATCH_SIZE`` with ``yield_per`` (a
+server-side cursor on PostgreSQL) and each batch is encoded and handed to
+the response before the next one is fetched, so memory use stays at one
+batch however many schools and years the table holds. Exported batches are
+expunged from the session to keep its identity map from growing.
+"""
+import csv
+import io
+import os
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import lazyload
+from src.models.user import db, School, PHASE_NAMES, SCHOOL_FULL_LOAD
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 200))
+
+# CSV columns: school fields, then the main figures of each phase as <phase>_<field>
+CSV_SCHOOL_FIELDS = (
+    'school_key', 'name', 'year', 'total_vacancy', 'balloted', 'overall_competitiveness_score',
+    'competitiveness_tier', 'address', 'postal_code', 'phone', 'email', 'website', 'latitude', 'longitude'
+)
+CSV_PHASE_FIELDS = ('vacancies', 'applicants', 'taken', 'balloting')
+CSV_COLUMNS = CSV_SCHOOL_FIELDS + tuple(f"{phase_name}_{field}" for phase_name in PHASE_NAMES
+                                        for field in CSV_PHASE_FIELDS)
+
+def iter_school_batches(batch_size=EXPORT_BATCH_SIZE):
+    """Every School in id order, as lists of at most batch_size rows"""
+    # Phases are read from the JSON columns, so PhaseStat rows are not loaded
+    statement = (select(School).options(*SCHOOL_FULL_LOAD, lazyload(School.phase_stats))
+                 .order_by(School.id).execution_options(yield_per=batch_size))
+    for batch in db.session.scalars(statement).partitions():
+        yield batch
+        for school in batch:
+            db.session.expunge(school)
+
+def export_record(school):
+    """One school as exported to NDJSON: to_dict() plus its key"""
+    record = school.to_dict()
+    record['school_key'] = school.school_key
+    return record
+
+def ndjson_chunks():
+    """NDJSON export, one chunk per batch; non-finite floats are written as null"""
+    for batch in iter_school_batches():
+        yield ''.join(current_app.json.dumps(export_record(school)) + '\n' for school in batch)
+
+def csv_row(school):
+    row = [getattr(school, field) for field in CSV_SCHOOL_FIELDS]
+    for phase_name in PHASE_NAMES:
+        phase = school.get_phase_data(phase_name)
+        row.extend(phase.get(field) for field in CSV_PHASE_FIELDS)
+    return row
+
+def csv_chunks():
+    """CSV export with a header row, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for batch in iter_school_batches():
+        writer.writerows(csv_row(school) for school in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when there are no schools
+    if buffer.tell():
+        yield buffer.getvalue()
+
+# format: (mimetype, chunk generator)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_chunks),
+    'csv': ('text/csv', csv_chunks),
+}
@@ -0,0 +1,137 @@
+"""
+Two-tier cache for geocoding results.
+
+Lookups check an in-process LRU with TTL first, then the persistent
+``GeocodeCache`` table (shared across workers and restarts), and only then call
+the upstream geocoder. "Not found" answers are cached too, with a short TTL.
+The persistent tier uses its own connection so cache writes never commit or
+roll back the caller's session.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db, GeocodeCache
+from src.services.cache import LRUTTLCache
+
+GEOCODE_CACHE_SIZE = int(os.getenv('GEOCODE_CACHE_SIZE', 4096))
+GEOCODE_CACHE_TTL_SECONDS = int(os.getenv('GEOCODE_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+GEOCODE_NEGATIVE_TTL_SECONDS = int(os.getenv('GEOCODE_NEGATIVE_TTL_SECONDS', 600))
+
+_memory_cache = LRUTTLCache(maxsize=GEOCODE_CACHE_SIZE, ttl=GEOCODE_CACHE_TTL_SECONDS)
+_stats_lock = threading.Lock()
+_stats = {
+    'memory_hits': 0,
+    'database_hits': 0,
+    'negative_hits': 0,
+    'misses': 0,
+    'upstream_errors': 0,
+    'database_errors': 0
+}
+
+def _count(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+def normalize_query(address):
+    """Normalize an address so equivalent lookups share one cache entry"""
+    return ' '.join((address or '').upper().split())[:500]
+
+def _read_database(query_key):
+    """Return (found, location) from the persistent tier, honoring TTLs"""
+    table = GeocodeCache.__table__
+    with db.engine.connect() as connection:
+        row = connection.execute(select(table).where(table.c.query_key == query_key)).first()
+
+    if row is None:
+        return False, None
+
+    ttl = GEOCODE_CACHE_TTL_SECONDS if row.found else GEOCODE_NEGATIVE_TTL_SECONDS
+    if row.updated_at is None or row.updated_at + timedelta(seconds=ttl) <= datetime.utcnow():
+        return False, None
+
+    if not row.found:
+        return True, None
+    return True, {'latitude': row.latitude, 'longitude': row.longitude, 'address': row.address}
+
+def _write_database(query_key, location):
+    """Upsert a lookup result into the persistent tier"""
+    table = GeocodeCache.__table__
+    values = {
+        'found': location is not None,
+        'latitude': location['latitude'] if location else None,
+        'longitude': location['longitude'] if location else None,
+        'address': location['address'][:500] if location and location.get('address') else None,
+        'updated_at': datetime.utcnow()
+    }
+
+    with db.engine.begin() as connection:
+        result = connection.execute(update(table).where(table.c.query_key == query_key).values(**values))
+        if result.rowcount:
+            return
+
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(insert(table).values(query_key=query_key, **values))
+    except IntegrityError:
+        # Another worker inserted the same key first - keep the newest answer
+        with db.engine.begin() as connection:
+            connection.execute(update(table).where(table.c.query_key == query_key).values(**values))
+
+def cached_geocode(address, fetch):
+    """Resolve an address through the cache tiers, calling fetch(address) on a miss
+
+    ``fetch`` returns a location dictionary, None when the address is not found,
+    and raises on upstream errors (errors are not cached).
+    """
+    query_key = normalize_query(address)
+    if not query_key:
+        return None
+
+    found, location = _memory_cache.get(query_key)
+    if found:
+        _count('memory_hits' if location else 'negative_hits')
+        return dict(location) if location else None
+
+    try:
+        found, location = _read_database(query_key)
+    except Exception as e:
+        print(f"Geocode cache read error: {e}")
+        _count('database_errors')
+        found = False
+
+    if found:
+        _count('database_hits' if location else 'negative_hits')
+        _memory_cache.set(query_key, location, None if location else GEOCODE_NEGATIVE_TTL_SECONDS)
+        return dict(location) if location else None
+
+    _count('misses')
+    try:
+        location = fetch(address)
+    except Exception as e:
+        print(f"Geocoding error: {e}")
+        _count('upstream_errors')
+        return None
+
+    _memory_cache.set(query_key, location, None if location else GEOCODE_NEGATIVE_TTL_SECONDS)
+    try:
+        _write_database(query_key, location)
+    except Exception as e:
+        print(f"Geocode cache write error: {e}")
+        _count('database_errors')
+
+    return dict(location) if location else None
+
+def get_geocode_cache_stats():
+    """Hit/miss counters for the geocode cache"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['memory_hits'] + stats['database_hits'] + stats['negative_hits'] + stats['misses']
+    stats['memory_entries'] = len(_memory_cache)
+    stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+    return stats
+
+def clear_geocode_memory_cache():
+    """Drop the in-process tier (the persistent table is kept)"""
+    _memory_cache.clear()
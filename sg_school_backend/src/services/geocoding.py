@@ -0,0 +1,35 @@
+from src.services.http_client import http_get
+from src.services.geocode_cache import cached_geocode
+from src.services.postal_codes import lookup_address_postal_code
+
+# OneMap API for geocoding
+ONEMAP_API = "https://www.onemap.gov.sg/api/common/elastic/search"
+
+def fetch_onemap_location(address):
+    """Look up an address on OneMap
+
+    Returns None when OneMap has no result; raises on request errors.
+    """
+    params = {
+        'searchVal': address,
+        'returnGeom': 'Y',
+        'getAddrDetails': 'Y'
+    }
+    response = http_get('onemap', ONEMAP_API, params=params)
+    data = response.json()
+
+    if data['found'] > 0:
+        result = data['results'][0]
+        return {
+            'latitude': float(result['LATITUDE']),
+            'longitude': float(result['LONGITUDE']),
+            'address': result['ADDRESS']
+        }
+    return None
+
+def geocode_address(address):
+    """Geocode address, offline via postal code when possible, else OneMap (cached)"""
+    location = lookup_address_postal_code(address)
+    if location:
+        return location
+    return cached_geocode(address, fetch_onemap_location)
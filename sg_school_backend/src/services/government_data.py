@@ -0,0 +1,183 @@
+"""
+Government school dataset (data.gov.sg) access.
+
+``get_schools_data`` serves a process-wide snapshot of the primary school
+records, read from the local ``GovernmentSchool`` mirror (kept up to date by
+``dataset_sync``) and from the live API only while the mirror is empty. The
+snapshot is loaded once, served from memory for ``SCHOOLS_DATA_TTL_SECONDS`` and
+then refreshed by a background thread while the stale copy keeps being served.
+Concurrent cold misses wait on a single fetch.
+
+Request handlers use the ``get_loaded_*`` functions instead, which never wait
+for data.gov.sg: until a snapshot is loaded (in the background) they serve the
+rows of the local mirror, which are empty until the first sync.
+"""
+import hashlib
+import json
+import os
+from src.models.user import GovernmentSchool
+from src.services.cache import StaleWhileRevalidateCache
+from src.services.http_client import http_get
+
+# Singapore government data API
+DATA_GOV_SG_API = "https://data.gov.sg/api/action/datastore_search"
+SCHOOL_DATASET_ID = "d_688b934f82c1059ed0a6993d2a829089"
+
+SCHOOLS_DATA_TTL_SECONDS = int(os.getenv('SCHOOLS_DATA_TTL_SECONDS', 3600))
+# Minimum wait before retrying after a failed refresh
+SCHOOLS_DATA_RETRY_SECONDS = int(os.getenv('SCHOOLS_DATA_RETRY_SECONDS', 60))
+
+# Flask app used to read the local mirror from background refresh threads
+_app = None
+
+def init_app(app):
+    """Register the Flask app whose database holds the GovernmentSchool mirror"""
+    global _app
+    _app = app
+
+def _to_school_record(record):
+    """Map a data.gov.sg record to the school dictionary format"""
+    return {
+        'name': record.get('school_name', ''),
+        'address': record.get('address', ''),
+        'postal_code': record.get('postal_code', ''),
+        'phone': record.get('telephone_no', ''),
+        'email': record.get('email_address', ''),
+        'website': record.get('url_address', ''),
+        'mrt_desc': record.get('mrt_desc', ''),
+        'bus_desc': record.get('bus_desc', '')
+    }
+
+def fetch_schools_data(page_size=1000):
+    """Fetch primary school records from data.gov.sg, following pagination; raises on failure"""
+    schools = []
+    offset = 0
+
+    while True:
+        params = {
+            'resource_id': SCHOOL_DATASET_ID,
+            'limit': page_size,
+            'offset': offset
+        }
+        response = http_get('data_gov', DATA_GOV_SG_API, params=params)
+        data = response.json()
+
+        if not data['success']:
+            raise ValueError('data.gov.sg returned success=false')
+
+        records = data['result']['records']
+        for record in records:
+            # Filter for primary schools only
+            if 'PRIMARY' in record.get('school_name', '').upper():
+                schools.append(_to_school_record(record))
+
+        offset += len(records)
+        total = data['result'].get('total', offset)
+        if not records or len(records) < page_size or offset >= total:
+            return schools
+
+def load_mirrored_schools():
+    """Read primary school records from the local GovernmentSchool mirror"""
+    return [school.to_dict() for school in GovernmentSchool.query.order_by(GovernmentSchool.id).all()]
+
+def _load_schools_data():
+    """Load the snapshot from the local mirror, falling back to the live API"""
+    if _app is not None:
+        try:
+            with _app.app_context():
+                schools = load_mirrored_schools()
+            if schools:
+                return tuple(schools)
+        except Exception as e:
+            print(f"Error reading government school mirror: {e}")
+    return tuple(fetch_schools_data())
+
+_schools_data_cache = StaleWhileRevalidateCache(
+    'schools data',
+    _load_schools_data,
+    ttl=SCHOOLS_DATA_TTL_SECONDS,
+    retry_interval=SCHOOLS_DATA_RETRY_SECONDS
+)
+
+def get_schools_data():
+    """Get primary school records from the cached data.gov.sg snapshot
+
+    Returns fresh dictionaries so callers can annotate them per request.
+    """
+    return [dict(school) for school in get_schools_snapshot()]
+
+def get_schools_snapshot():
+    """Get the cached snapshot itself as a tuple of shared records
+
+    The tuple is replaced, never modified, on refresh, so its identity can key
+    derived indexes. Callers must not mutate the records.
+    """
+    schools = _schools_data_cache.get()
+    return schools if schools is not None else ()
+
+# Mirror rows served by get_loaded_schools_snapshot while no snapshot is loaded
+_mirror_snapshot = None
+
+def get_loaded_schools_snapshot():
+    """Get the government schools already available locally, never calling data.gov.sg
+
+    Returns the cached snapshot when one is loaded, otherwise starts loading it
+    in the background and returns the rows of the local mirror (empty until the
+    first sync). Needs an app context.
+    """
+    global _mirror_snapshot
+    schools = _schools_data_cache.get_nowait()
+    if schools is not None:
+        return schools
+    mirror = _mirror_snapshot
+    if mirror is None:
+        try:
+            mirror = _mirror_snapshot = tuple(load_mirrored_schools())
+        except Exception as e:
+            print(f"Error reading government school mirror: {e}")
+            return ()
+    return mirror
+
+def get_loaded_schools_data():
+    """Fresh dictionaries of get_loaded_schools_snapshot(), for callers that annotate them"""
+    return [dict(school) for school in get_loaded_schools_snapshot()]
+
+_name_index = (None, {})
+
+def find_government_school(name):
+    """Get one government school record by exact name from the locally available records"""
+    global _name_index
+    schools = get_loaded_schools_snapshot()
+
+    snapshot, by_name = _name_index
+    if snapshot is not schools:
+        by_name = {}
+        for school in schools:
+            by_name.setdefault(school['name'], school)
+        _name_index = (schools, by_name)
+
+    school = by_name.get(name)
+    return dict(school) if school else None
+
+_snapshot_version = (None, None)
+
+def get_schools_data_version():
+    """Content hash of the locally available government records, computed once per snapshot"""
+    global _snapshot_version
+    schools = get_loaded_schools_snapshot()
+
+    snapshot, version = _snapshot_version
+    if snapshot is not schools:
+        version = hashlib.sha256(json.dumps(schools, sort_keys=True).encode('utf-8')).hexdigest()
+        _snapshot_version = (schools, version)
+    return version
+
+def invalidate_schools_data():
+    """Force a refresh of the government snapshot on the next read"""
+    global _mirror_snapshot
+    _mirror_snapshot = None
+    _schools_data_cache.invalidate()
+
+def get_schools_data_status():
+    """Age, size and refresh failures of the government snapshot"""
+    return _schools_data_cache.status()
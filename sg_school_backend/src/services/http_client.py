@@ -0,0 +1,137 @@
+"""
+Shared outbound HTTP client.
+
+Every external API gets one pooled ``requests.Session`` (keep-alive, bounded
+connection pool), its own connect/read timeouts and a cap on concurrent
+requests. Idempotent calls (GET/HEAD) are retried with jittered exponential
+backoff on connection errors and 429/5xx responses; POSTs are never retried.
+Each API also has a circuit breaker, so a failing or slow upstream fails fast
+with ``CircuitOpenError`` instead of tying up worker threads.
+
+Settings can be overridden per API with environment variables such as
+``HTTP_ONEMAP_READ_TIMEOUT`` or ``HTTP_DEEPSEEK_MAX_CONNECTIONS``.
+"""
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+API_SETTINGS = {
+    'onemap': {'connect_timeout': 3.05, 'read_timeout': 5, 'retries': 2, 'max_connections': 10,
+               'failure_threshold': 5, 'slow_call_seconds': 4.0, 'reset_timeout': 30},
+    'data_gov': {'connect_timeout': 3.05, 'read_timeout': 20, 'retries': 3, 'max_connections': 4,
+                 'failure_threshold': 3, 'slow_call_seconds': 15.0, 'reset_timeout': 120},
+    'deepseek': {'connect_timeout': 5, 'read_timeout': 60, 'retries': 0, 'max_connections': 8,
+                 'failure_threshold': 3, 'slow_call_seconds': 45.0, 'reset_timeout': 60},
+}
+DEFAULT_SETTINGS = {'connect_timeout': 3.05, 'read_timeout': 10, 'retries': 1, 'max_connections': 4,
+                    'failure_threshold': 5, 'slow_call_seconds': 8.0, 'reset_timeout': 30}
+
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+class OutboundCapacityError(requests.exceptions.ConnectionError):
+    """Raised when an API already has its maximum number of requests in flight; not counted by its breaker"""
+
+def _api_settings(api):
+    settings = dict(API_SETTINGS.get(api, DEFAULT_SETTINGS))
+    for key, value in settings.items():
+        override = os.getenv(f"HTTP_{api.upper()}_{key.upper()}")
+        if override is not None:
+            settings[key] = type(value)(float(override))
+    return settings
+
+class _APIClient:
+    """Pooled session, timeouts and concurrency cap for one external API"""
+
+    def __init__(self, api):
+        self.api = api
+        self.settings = _api_settings(api)
+        self.timeout = (self.settings['connect_timeout'], self.settings['read_timeout'])
+        self._slots = threading.BoundedSemaphore(self.settings['max_connections'])
+        self.breaker = CircuitBreaker(
+            api,
+            failure_threshold=self.settings['failure_threshold'],
+            slow_call_seconds=self.settings['slow_call_seconds'],
+            reset_timeout=self.settings['reset_timeout']
+        )
+
+        retry = Retry(
+            total=self.settings['retries'],
+            connect=self.settings['retries'],
+            read=self.settings['retries'],
+            status=self.settings['retries'],
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            backoff_factor=0.3,
+            backoff_jitter=0.3,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.settings['max_connections'],
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+
+        # Wait at most one connect timeout for a free slot rather than queueing forever. Running
+        # out of slots is local overload, not an upstream failure, so the breaker is not involved.
+        if not self._slots.acquire(timeout=self.settings['connect_timeout']):
+            raise OutboundCapacityError(f"Too many concurrent requests to {self.api}")
+
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._slots.release()
+            raise
+
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.breaker.record_failure(type(e).__name__)
+            raise
+        finally:
+            self._slots.release()
+
+        if response.status_code in RETRY_STATUS_CODES:
+            self.breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            self.breaker.record_success(time.monotonic() - started)
+        return response
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(api):
+    """Get the shared client for an API name such as 'onemap'"""
+    client = _clients.get(api)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api)
+            if client is None:
+                client = _clients[api] = _APIClient(api)
+    return client
+
+def http_get(api, url, params=None, **kwargs):
+    """GET through the shared client for ``api`` (retried on transient failures)"""
+    return get_client(api).request('GET', url, params=params, **kwargs)
+
+def http_post(api, url, json=None, **kwargs):
+    """POST through the shared client for ``api`` (never retried)"""
+    return get_client(api).request('POST', url, json=json, **kwargs)
+
+def get_circuit_breaker_status():
+    """State and counters of every API circuit breaker created so far"""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.api: client.breaker.status() for client in clients}
@@ -0,0 +1,93 @@
+"""
+Flask JSON provider with an optional fast encoder.
+
+When ``orjson`` is installed it encodes every response; otherwise the stdlib
+``json`` module is used. Output is the same JSON either way:
+
+- keys are sorted, as with Flask's default provider
+- non-finite floats (``float('inf')`` for a ``ratio_2c`` with no vacancies,
+  NaN) are written as ``null`` so responses are always valid JSON
+- dates, UUIDs, dataclasses and NumPy scalars/arrays are converted the
+  same way by both backends
+
+Anything orjson cannot encode (e.g. integers above 64 bits) falls back to
+the stdlib path.
+"""
+import json
+import math
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+def _replace_non_finite(value):
+    """Copy of value with inf/NaN floats replaced by None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+    return value
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes with orjson when available"""
+
+    backend = 'orjson' if orjson is not None else 'json'
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, pretty):
+        options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                   | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def encode(self, obj, pretty=False):
+        """Serialize obj to UTF-8 JSON bytes"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(pretty))
+            except orjson.JSONEncodeError:
+                pass  # retry with the stdlib encoder, which raises a clearer error if it also fails
+
+        dump_args = {'default': self.default, 'ensure_ascii': self.ensure_ascii, 'sort_keys': self.sort_keys}
+        if pretty:
+            dump_args['indent'] = 2
+        else:
+            dump_args['separators'] = (',', ':')
+        try:
+            text = json.dumps(obj, allow_nan=False, **dump_args)
+        except ValueError:
+            text = json.dumps(_replace_non_finite(obj), allow_nan=False, **dump_args)
+        return text.encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(_replace_non_finite(obj), **kwargs)
+        return self.encode(obj, pretty=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # the stdlib parser also accepts NaN/Infinity literals
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.encode(obj, pretty=pretty) + b'\n', mimetype=self.mimetype)
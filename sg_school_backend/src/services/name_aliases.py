@@ -0,0 +1,217 @@
+"""
+Persistent government name -> school_key aliases.
+
+Government school names are matched to School rows once, when the dataset is
+synced or the database is initialized, and stored in the SchoolNameAlias
+table together with known variants of each School name (lowercased and
+suffix-stripped). Request handlers then do a single dictionary lookup instead
+of re-running the fuzzy matching cascade; names that are not in the table yet
+(or while School data changed since the last rebuild) fall back to the
+in-memory resolver. Names that matched nothing are kept with a NULL
+school_key so they can be reported. Only changes to School names or keys make
+the table out of date; other School updates (coordinates, contact details,
+phase data) leave it in use.
+"""
+import threading
+from datetime import datetime
+from src.models.user import db, School, SchoolNameAlias
+from src.services.data_events import on_school_data_changed
+from src.services.government_data import get_loaded_schools_snapshot, get_schools_data, load_mirrored_schools
+from src.services.name_matching import get_name_resolver, strip_name_suffixes
+
+_MISSING = object()
+
+def school_name_variants(school_name):
+    """Known spellings of a School name that government data may use"""
+    variants = [school_name.lower(), strip_name_suffixes(school_name)]
+    return [variant for variant in dict.fromkeys(variants) if len(variant) > 2]
+
+def _contact_words(school_name):
+    """Significant words used to check a government record belongs to a School"""
+    return [word for word in school_name.lower().replace('(', '').replace(')', '').split()
+            if len(word) >= 3 and word not in ['school', 'primary']]
+
+def _match_contact_name(school_name, government_names):
+    """First government name equal to the School name, else the first containing 80% of its words"""
+    school_name_lower = school_name.lower()
+    for name in government_names:
+        if name.lower() == school_name_lower:
+            return name
+    words = _contact_words(school_name)
+    if len(words) >= 2:
+        for name in government_names:
+            if sum(1 for word in words if word in name.lower()) / len(words) >= 0.8:
+                return name
+    return None
+
+def rebuild_school_aliases(government_schools=None):
+    """Recompute the alias table from the government dataset and School names
+
+    Returns counts of government names matched and unmatched and of variants.
+    """
+    if government_schools is None:
+        government_schools = get_schools_data()
+    resolver = get_name_resolver()
+    now = datetime.utcnow()
+
+    aliases = {}
+    for school in government_schools:
+        name = school.get('name') or ''
+        if name and name.lower() not in aliases:
+            aliases[name.lower()] = (name, resolver.resolve_government_name(name), 'government')
+
+    for school_name, in db.session.query(School.name).all():
+        for variant in school_name_variants(school_name):
+            if variant not in aliases:
+                aliases[variant] = (school_name, resolver.resolve_government_name(variant), 'variant')
+
+    school_rows = _school_rows()
+    try:
+        SchoolNameAlias.query.delete()
+        db.session.add_all([
+            SchoolNameAlias(alias=alias, display_name=display_name, school_key=school_key,
+                            source=source, updated_at=now)
+            for alias, (display_name, school_key, source) in aliases.items()
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    invalidate_alias_index(school_rows)
+
+    result = {
+        'matched': sum(1 for _, key, source in aliases.values() if source == 'government' and key),
+        'unmatched': sum(1 for _, key, source in aliases.values() if source == 'government' and not key),
+        'variants': sum(1 for _, _, source in aliases.values() if source == 'variant')
+    }
+    print(f"🏷️  School name aliases rebuilt: {result['matched']} matched, {result['unmatched']} unmatched, "
+          f"{result['variants']} variants")
+    return result
+
+def ensure_school_aliases():
+    """Rebuild the alias table if it is empty or out of date and government data is mirrored locally"""
+    global _alias_school_rows
+    _check_school_names()
+    if _alias_index_stale or SchoolNameAlias.query.first() is None:
+        government_schools = load_mirrored_schools()
+        if government_schools:
+            return rebuild_school_aliases(government_schools)
+    elif _alias_school_rows is None:
+        # Stored aliases are current: remember the School names and keys they belong to
+        _alias_school_rows = _school_rows()
+    return None
+
+class _AliasIndex:
+    """Alias lookups plus, per school_key, the government record holding its contact details"""
+
+    def __init__(self, alias_rows, school_rows):
+        self.school_key_by_alias = {}
+        government_names = []
+        government_names_by_key = {}
+        for alias, display_name, school_key, source in alias_rows:
+            self.school_key_by_alias[alias] = school_key
+            if source == 'government':
+                government_names.append(display_name)
+                if school_key:
+                    government_names_by_key.setdefault(school_key, []).append(display_name)
+
+        # Prefer the government records matched to the School; without a match there, scan all of them
+        # in dataset order like a lookup without the alias table
+        self.contact_name_by_key = {}
+        for school_key, school_name in school_rows:
+            name = (_match_contact_name(school_name, government_names_by_key.get(school_key, []))
+                    or _match_contact_name(school_name, government_names))
+            if name:
+                self.contact_name_by_key[school_key] = name
+
+    def __len__(self):
+        return len(self.school_key_by_alias)
+
+_alias_index = None
+_alias_index_stale = False
+_alias_index_lock = threading.Lock()
+
+# (school_key, name) of every School when the stored aliases were last known to be current
+_alias_school_rows = None
+_alias_names_check_pending = False
+
+def _school_rows():
+    return [tuple(row) for row in db.session.query(School.school_key, School.name).order_by(School.id).all()]
+
+def _check_school_names():
+    # School data changed: the aliases only go out of date if a School was added, removed, renamed or re-keyed
+    global _alias_index, _alias_index_stale, _alias_names_check_pending
+    with _alias_index_lock:
+        if not _alias_names_check_pending:
+            return
+        _alias_names_check_pending = False
+        if _alias_school_rows is None or _school_rows() != _alias_school_rows:
+            _alias_index = None
+            _alias_index_stale = True
+
+def _get_alias_index():
+    global _alias_index
+    if _alias_names_check_pending:
+        _check_school_names()
+    if _alias_index_stale:
+        return None
+    index = _alias_index
+    if index is None:
+        with _alias_index_lock:
+            if _alias_index is None:
+                alias_rows = db.session.query(
+                    SchoolNameAlias.alias, SchoolNameAlias.display_name,
+                    SchoolNameAlias.school_key, SchoolNameAlias.source
+                ).order_by(SchoolNameAlias.id).all()
+                _alias_index = _AliasIndex(alias_rows, _school_rows())
+            index = _alias_index
+    return index if len(index) else None
+
+def lookup_school_key(government_name):
+    """school_key for a government school name, or None if it does not match any School"""
+    index = _get_alias_index()
+    if index is not None:
+        school_key = index.school_key_by_alias.get(government_name.lower(), _MISSING)
+        if school_key is not _MISSING:
+            return school_key
+    return get_name_resolver().resolve_government_name(government_name)
+
+def lookup_contact_name(school):
+    """Government name whose record holds the contact details of a School, or None"""
+    index = _get_alias_index()
+    if index is not None:
+        return index.contact_name_by_key.get(school.school_key)
+
+    # No usable alias table: match against the government records directly
+    government_names = [government_school['name'] for government_school in get_loaded_schools_snapshot()]
+    return _match_contact_name(school.name, government_names)
+
+def contact_match_possible(school):
+    """Whether a School name has enough significant words for a non-exact contact match"""
+    return len(_contact_words(school.name)) >= 2
+
+def get_unmatched_aliases():
+    """Government school names that matched no School at the last rebuild"""
+    rows = SchoolNameAlias.query.filter(
+        SchoolNameAlias.source == 'government',
+        SchoolNameAlias.school_key.is_(None)
+    ).order_by(SchoolNameAlias.display_name).all()
+    return [{'name': row.display_name, 'updated_at': row.updated_at.isoformat() + 'Z' if row.updated_at else None}
+            for row in rows]
+
+def invalidate_alias_index(school_rows=None):
+    """Reload the alias table on next use; school_rows are the (school_key, name) rows it was built from"""
+    global _alias_index, _alias_index_stale, _alias_school_rows, _alias_names_check_pending
+    with _alias_index_lock:
+        _alias_index = None
+        _alias_index_stale = False
+        _alias_school_rows = school_rows
+        _alias_names_check_pending = False
+
+@on_school_data_changed
+def _check_alias_index():
+    # Runs after commit, where no SQL can be emitted: compare School names and keys on the next lookup
+    global _alias_names_check_pending
+    with _alias_index_lock:
+        _alias_names_check_pending = True
@@ -0,0 +1,251 @@
+"""
+In-memory school name resolution.
+
+``SchoolNameResolver`` is built once from the (id, school_key, name) of every
+School row and reproduces the cascading name matching previously done with
+ILIKE/LIKE queries and full-table scans, stage for stage, using dictionaries
+and a trigram index. "First match" means lowest School.id, like the unordered
+``.first()`` queries it replaces. Results are memoized per input string and
+the resolver is rebuilt whenever School data changes. The memo covers names
+that resolved to nothing too, so repeated lookups for schools without P1
+data (e.g. non-participating schools) skip the cascade.
+"""
+import threading
+from functools import lru_cache
+from src.models.user import db, School
+from src.services.data_events import on_school_data_changed
+
+RESOLVER_MEMO_SIZE = 4096
+
+# Suffixes stripped from government API names, applied in this order
+SUFFIXES_TO_REMOVE = [
+    ' school (primary)',
+    ' primary school',
+    ' school',
+    ' primary',
+    ' (primary)',
+    ' (pri)',
+    ' pri'
+]
+
+# Known naming patterns tried as the last resort
+SEARCH_PATTERNS = {
+    'fairfield': ['fairfield'],
+    'methodist': ['methodist'],
+    'anderson': ['anderson'],
+    'ang_mo_kio': ['ang_mo_kio', 'ang mo kio'],
+    'ai_tong': ['ai_tong', 'ai tong'],
+    'chij': ['chij'],
+    'nanyang': ['nanyang'],
+    'raffles': ['raffles'],
+    'catholic': ['catholic'],
+    'tao_nan': ['tao_nan', 'tao nan'],
+    'new_town': ['new_town', 'new town'],
+    'anglo_chinese': ['anglo_chinese', 'anglo-chinese'],
+    'st_': ['st_', 'saint'],
+    'geylang': ['geylang'],
+    'queenstown': ['queenstown']
+}
+
+def name_to_school_key(school_name):
+    """Normalize a school name to the school_key format used for direct lookups"""
+    return (school_name.lower().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '')
+            .replace('.', '').replace("'", '').replace(',', '').replace('&', 'and'))
+
+def strip_name_suffixes(school_name):
+    """Lowercase a name and remove government API suffixes such as ' primary school'"""
+    cleaned_name = school_name.lower()
+    for suffix in SUFFIXES_TO_REMOVE:
+        cleaned_name = cleaned_name.replace(suffix, '').strip()
+    return ' '.join(cleaned_name.split())
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class _SubstringIndex:
+    """Trigram postings answering "which positions' text contains s" """
+
+    def __init__(self, texts):
+        self.texts = texts
+        self._postings = {}
+        for position, text in enumerate(texts):
+            for trigram in _trigrams(text):
+                self._postings.setdefault(trigram, set()).add(position)
+
+    def all_containing(self, fragment):
+        """Set of positions whose text contains fragment"""
+        if len(fragment) < 3:
+            return {position for position, text in enumerate(self.texts) if fragment in text}
+
+        candidates = None
+        for trigram in sorted(_trigrams(fragment), key=lambda t: len(self._postings.get(t, ()))):
+            postings = self._postings.get(trigram)
+            if not postings:
+                return set()
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+
+        return {position for position in candidates if fragment in self.texts[position]}
+
+    def first_containing(self, fragment):
+        """Lowest position whose text contains fragment, or None"""
+        positions = self.all_containing(fragment)
+        return min(positions) if positions else None
+
+class SchoolNameResolver:
+    """Resolve free-form school names to school_keys without database queries"""
+
+    def __init__(self, rows):
+        """Build from (id, school_key, name) tuples"""
+        rows = sorted(rows, key=lambda row: row[0])
+        self.school_keys = [row[1] for row in rows]
+        self.lower_names = [row[2].lower() for row in rows]
+
+        self._position_by_key = {}
+        self._position_by_name = {}
+        for position, (school_key, lower_name) in enumerate(zip(self.school_keys, self.lower_names)):
+            self._position_by_key.setdefault(school_key, position)
+            self._position_by_name.setdefault(lower_name, position)
+
+        self._names = _SubstringIndex(self.lower_names)
+        self._keys = _SubstringIndex(self.school_keys)
+
+        self.resolve_p1_lookup = lru_cache(maxsize=RESOLVER_MEMO_SIZE)(self._resolve_p1_lookup)
+        self.resolve_government_name = lru_cache(maxsize=RESOLVER_MEMO_SIZE)(self._resolve_government_name)
+
+    def __len__(self):
+        return len(self.school_keys)
+
+    def _key_at(self, position):
+        return self.school_keys[position] if position is not None else None
+
+    def _match_cleaned_name(self, school_name, cleaned_name):
+        """Exact then partial match on the suffix-stripped name"""
+        if cleaned_name != school_name.lower() and len(cleaned_name) > 2:
+            position = self._position_by_name.get(cleaned_name)
+            if position is None:
+                position = self._names.first_containing(cleaned_name)
+            return position
+        return None
+
+    def _match_words(self, cleaned_name):
+        """Schools containing all, then 80% of, the significant words"""
+        search_words = [word.strip() for word in cleaned_name.split() if len(word.strip()) >= 3]
+        if not search_words:
+            return None
+
+        candidates = self._names.all_containing(search_words[0])
+        for word in search_words[1:]:
+            if not candidates:
+                break
+            candidates &= self._names.all_containing(word)
+        if candidates:
+            return min(candidates)
+
+        if len(search_words) > 1:
+            min_matches = max(1, int(len(search_words) * 0.8))  # 80% of words must match
+            for position, name in enumerate(self.lower_names):
+                if sum(1 for word in search_words if word in name) >= min_matches:
+                    return position
+        return None
+
+    def _match_key_words(self, cleaned_name):
+        """Schools whose key contains one of the significant words"""
+        cleaned_key = cleaned_name.replace(' ', '_').replace('-', '_').replace('&', 'and')
+        for word in [word for word in cleaned_key.split('_') if len(word) >= 3]:
+            position = self._keys.first_containing(word)
+            if position is not None:
+                return position
+        return None
+
+    def _match_patterns(self, cleaned_name):
+        """Known naming patterns, tried against keys then names"""
+        spaced_name = cleaned_name.replace('_', ' ')
+        for variants in SEARCH_PATTERNS.values():
+            if any(variant in spaced_name for variant in variants):
+                for variant in variants:
+                    position = self._keys.first_containing(variant.replace(' ', '_'))
+                    if position is not None:
+                        return position
+                    position = self._names.first_containing(variant)
+                    if position is not None:
+                        return position
+        return None
+
+    def _resolve_p1_lookup(self, school_name):
+        """Cascade used by the P1 data lookup: key, partial name, cleaned name, words, key words, patterns"""
+        position = self._position_by_key.get(name_to_school_key(school_name))
+        if position is None:
+            position = self._names.first_containing(school_name.lower())
+        if position is None:
+            position = self._resolve_cleaned(school_name)
+        return self._key_at(position)
+
+    def _resolve_government_name(self, school_name):
+        """Cascade used for government names: exact name, cleaned name, words, key words, patterns"""
+        position = self._position_by_name.get(school_name.lower())
+        if position is None:
+            position = self._resolve_cleaned(school_name)
+        return self._key_at(position)
+
+    def _resolve_cleaned(self, school_name):
+        cleaned_name = strip_name_suffixes(school_name)
+        for match in (
+            lambda: self._match_cleaned_name(school_name, cleaned_name),
+            lambda: self._match_words(cleaned_name),
+            lambda: self._match_key_words(cleaned_name),
+            lambda: self._match_patterns(cleaned_name)
+        ):
+            position = match()
+            if position is not None:
+                return position
+        return None
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_name_resolver():
+    """Get the process-wide resolver, building it from the School table on first use"""
+    global _resolver
+    resolver = _resolver
+    if resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                rows = db.session.query(School.id, School.school_key, School.name).all()
+                _resolver = SchoolNameResolver(rows)
+            resolver = _resolver
+    return resolver
+
+def get_school_count():
+    """Number of School rows, without a COUNT query"""
+    return len(get_name_resolver())
+
+_lookup_stats_lock = threading.Lock()
+_lookup_stats = {'lookups': 0, 'unmatched': 0}
+
+def find_p1_school_key(school_name):
+    """school_key for a P1 data lookup, or None; results, misses included, are memoized by the resolver"""
+    school_key = get_name_resolver().resolve_p1_lookup(school_name)
+    with _lookup_stats_lock:
+        _lookup_stats['lookups'] += 1
+        if school_key is None:
+            _lookup_stats['unmatched'] += 1
+    return school_key
+
+def get_name_lookup_stats():
+    """P1 lookup counters and the current resolver's memo hits and size"""
+    with _lookup_stats_lock:
+        stats = dict(_lookup_stats)
+    resolver = _resolver
+    if resolver is not None:
+        memo = resolver.resolve_p1_lookup.cache_info()
+        stats.update({'memo_hits': memo.hits, 'memo_misses': memo.misses, 'memo_entries': memo.currsize})
+    return stats
+
+@on_school_data_changed
+def invalidate_name_resolver():
+    """Drop the resolver so the next lookup rebuilds it from the current School rows"""
+    global _resolver
+    with _resolver_lock:
+        _resolver = None
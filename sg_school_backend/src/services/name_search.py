@@ -0,0 +1,216 @@
+"""
+In-memory autocomplete over school names.
+
+``SchoolNameSearchIndex`` holds the suggestion for every School row and every
+government school that is not already in the database, plus trigram postings
+over their names. A query is answered from memory in tiers:
+
+    0. exact name
+    1. name starts with the query
+    2. every query word starts a word of the name
+    3. name contains the query
+    4. fuzzy: most of the query's trigrams occur in the name (typos)
+
+Within a tier database schools come first, then shorter names. The index is
+rebuilt when School data changes or the government snapshot is refreshed.
+Government schools come from the snapshot already in memory or the local
+mirror; a search never fetches from data.gov.sg.
+"""
+import threading
+from functools import lru_cache
+from src.models.user import db, School
+from src.services.data_events import on_school_data_changed
+from src.services.government_data import get_loaded_schools_snapshot
+
+FUZZY_MIN_SIMILARITY = 0.6
+SEARCH_MEMO_SIZE = 2048
+
+# Words shared by most names; ignored when fuzzy matching a query that has other words
+GENERIC_WORDS = {'primary', 'school', 'pri', 'the'}
+
+EXACT, PREFIX, WORD_PREFIX, CONTAINS, FUZZY = range(5)
+
+def normalize_search_text(text):
+    """Lowercase and collapse whitespace"""
+    return ' '.join(text.lower().split())
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _word_trigrams(text, pad_end=True):
+    """Trigrams of each word padded with spaces, so short words and word starts count"""
+    words = text.split()
+    trigrams = set()
+    for position, word in enumerate(words):
+        last = position == len(words) - 1
+        trigrams |= _trigrams(f"  {word} " if pad_end or not last else f"  {word}")
+    return trigrams
+
+class SchoolNameSearchIndex:
+    """Ranked, typo-tolerant name suggestions for database and government schools"""
+
+    def __init__(self, database_rows, government_schools):
+        """Build from School rows (ordered by id) and government school records"""
+        self.suggestions = []
+        self.sources = []
+        self.names = []
+
+        seen_names = set()
+        for school in database_rows:
+            self._add(school.name, 'database', {
+                'id': school.school_key,
+                'name': school.name,
+                'source': 'database',
+                'has_p1_data': True,
+                'year': school.year,
+                'competitiveness_tier': school.competitiveness_tier,
+                'total_vacancy': school.total_vacancy,
+                'balloted': school.balloted
+            })
+            seen_names.add(school.name.lower())
+
+        for school in government_schools:
+            school_name = school.get('name', '')
+            if not school_name or school_name.lower() in seen_names:
+                continue
+            seen_names.add(school_name.lower())
+            self._add(school_name, 'government', {
+                'id': school_name.lower().replace(' ', '_').replace('-', '_'),
+                'name': school_name,
+                'source': 'government',
+                'has_p1_data': False,
+                'address': school.get('address', ''),
+                'phone': school.get('phone', ''),
+                'email': school.get('email', '')
+            })
+
+        self._substring_postings = {}
+        self._fuzzy_postings = {}
+        for position, name in enumerate(self.names):
+            for trigram in _trigrams(name):
+                self._substring_postings.setdefault(trigram, set()).add(position)
+            for trigram in _word_trigrams(name):
+                self._fuzzy_postings.setdefault(trigram, []).append(position)
+
+        self._words = [name.split() for name in self.names]
+        self._ranked = lru_cache(maxsize=SEARCH_MEMO_SIZE)(self._rank)
+
+    def _add(self, name, source, suggestion):
+        self.names.append(normalize_search_text(name))
+        self.sources.append(source)
+        self.suggestions.append(suggestion)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _containing(self, fragment):
+        """Positions whose name contains fragment"""
+        if len(fragment) < 3:
+            return {position for position, name in enumerate(self.names) if fragment in name}
+
+        candidates = None
+        for trigram in sorted(_trigrams(fragment), key=lambda t: len(self._substring_postings.get(t, ()))):
+            postings = self._substring_postings.get(trigram)
+            if not postings:
+                return set()
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+        return {position for position in candidates if fragment in self.names[position]}
+
+    def _fuzzy(self, query, exclude):
+        """Positions sharing at least FUZZY_MIN_SIMILARITY of the query's word trigrams"""
+        significant_words = [word for word in query.split() if word not in GENERIC_WORDS]
+        query_trigrams = _word_trigrams(' '.join(significant_words or query.split()), pad_end=False)
+        if not query_trigrams:
+            return {}
+
+        shared = {}
+        for trigram in query_trigrams:
+            for position in self._fuzzy_postings.get(trigram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        return {
+            position: count / len(query_trigrams)
+            for position, count in shared.items()
+            if position not in exclude and count / len(query_trigrams) >= FUZZY_MIN_SIMILARITY
+        }
+
+    def _rank(self, query):
+        """Positions matching query, best first"""
+        tiers = {}
+        for position in self._containing(query):
+            name = self.names[position]
+            if name == query:
+                tiers[position] = EXACT
+            elif name.startswith(query):
+                tiers[position] = PREFIX
+            elif any(word.startswith(query) for word in self._words[position]):
+                tiers[position] = WORD_PREFIX
+            else:
+                tiers[position] = CONTAINS
+
+        query_words = query.split()
+        if len(query_words) > 1:
+            candidates = None
+            for word in query_words:
+                containing = self._containing(word)
+                candidates = containing if candidates is None else candidates & containing
+            for position in candidates - tiers.keys():
+                name_words = self._words[position]
+                if all(any(name_word.startswith(word) for name_word in name_words) for word in query_words):
+                    tiers[position] = WORD_PREFIX
+
+        similarity = self._fuzzy(query, tiers)
+        for position in similarity:
+            tiers[position] = FUZZY
+
+        return tuple(sorted(tiers, key=lambda position: (
+            tiers[position],
+            -similarity.get(position, 1.0),
+            self.sources[position] != 'database',
+            len(self.names[position]),
+            position
+        )))
+
+    def search(self, query, limit=10):
+        """Suggestions for query, plus total match counts per source"""
+        ranked = self._ranked(normalize_search_text(query))
+        database_matches = sum(1 for position in ranked if self.sources[position] == 'database')
+        return {
+            'suggestions': [dict(self.suggestions[position]) for position in ranked[:max(limit, 0)]],
+            'total': len(ranked),
+            'database_matches': database_matches,
+            'government_matches': len(ranked) - database_matches
+        }
+
+def load_database_rows():
+    """School rows for the index, projected to the columns a suggestion shows"""
+    return db.session.query(
+        School.school_key, School.name, School.year, School.competitiveness_tier,
+        School.total_vacancy, School.balloted
+    ).order_by(School.id).all()
+
+_index = None
+_index_snapshot = None
+_index_lock = threading.Lock()
+
+def get_name_search_index():
+    """Get the autocomplete index, rebuilding it if School data or the government snapshot changed"""
+    global _index, _index_snapshot
+    government_schools = get_loaded_schools_snapshot()
+    index = _index
+    if index is None or _index_snapshot is not government_schools:
+        with _index_lock:
+            if _index is None or _index_snapshot is not government_schools:
+                _index = SchoolNameSearchIndex(load_database_rows(), government_schools)
+                _index_snapshot = government_schools
+            index = _index
+    return index
+
+@on_school_data_changed
+def invalidate_name_search_index():
+    """Drop the index so the next search rebuilds it from the current School rows"""
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,205 @@
+"""
+Columnar phase statistics and vectorized competitiveness math.
+
+``PhaseStatsStore`` holds the phase figures of every school as NumPy arrays
+of shape (schools, phases), columns in ``PHASE_NAMES`` order, and computes
+applicant/vacancy ratios, ballot odds, most competitive phase, success rate
+and score percentile for all schools at once. The school snapshot builds one
+store per dataset version; ingest scores and tiers all schools with the same
+functions.
+
+The store also serves custom rankings: every metric in ``METRIC_NAMES`` has a
+precomputed dense rank, and the row order for a list of sort keys is a
+single ``np.lexsort`` over those ranks, memoized per sort spec.
+
+Results match the per-school Python versions (``School._get_most_competitive_phase``,
+``School.calculate_overall_success_rate``) exactly.
+"""
+from functools import lru_cache
+import numpy as np
+from src.models.user import PHASE_NAMES
+
+# Phase 2C is the strongest competitiveness indicator, then 2B and 2A
+SCORE_WEIGHTS = (('phase_2c', 0.5), ('phase_2b', 0.3), ('phase_2a', 0.2))
+
+# Tier thresholds on the score, highest first
+TIER_THRESHOLDS = ((2.0, 'Very High'), (1.5, 'High'), (1.2, 'Medium'))
+
+# Key used for a phase in the source data files, where it differs from PHASE_NAMES
+SOURCE_PHASE_KEYS = {'phase_2c_supp': 'phase_2c_supplementary'}
+
+# Sortable metrics: per school, and per phase as <metric>_<phase> (e.g. ratio_2c, ballot_odds_2b)
+SCHOOL_METRICS = ('score', 'total_vacancy')
+PHASE_METRICS = ('ratio', 'ballot_odds', 'vacancies', 'applicants')
+PHASE_METRIC_NAMES = {f"{metric}_{phase_name[len('phase_'):]}": (metric, column)
+                      for metric in PHASE_METRICS for column, phase_name in enumerate(PHASE_NAMES)}
+METRIC_NAMES = SCHOOL_METRICS + tuple(PHASE_METRIC_NAMES)
+
+SORT_ORDER_MEMO_SIZE = 128
+
+def _count(value, default):
+    if isinstance(value, bool):
+        return int(value)
+    return value if isinstance(value, (int, float)) else default
+
+def phase_matrix(phases_by_school, field, default=0, detail=False, dtype=float):
+    """(schools, phases) array of one numeric phase field
+
+    phases_by_school holds one {phase_name: phase_dict} mapping per school;
+    missing phases and fields, and non-numeric values, read as default. With
+    detail the field is read from the phase's balloting_details.
+    """
+    rows = []
+    for phases in phases_by_school:
+        row = [default] * len(PHASE_NAMES)
+        if isinstance(phases, dict):
+            for column, phase_name in enumerate(PHASE_NAMES):
+                phase = phases.get(phase_name, phases.get(SOURCE_PHASE_KEYS.get(phase_name)))
+                if detail and isinstance(phase, dict):
+                    phase = phase.get('balloting_details')
+                if isinstance(phase, dict) and field in phase:
+                    row[column] = _count(phase[field], default)
+        rows.append(row)
+    return np.array(rows, dtype=dtype).reshape(len(rows), len(PHASE_NAMES))
+
+def phase_ratios(numerators, denominators):
+    """Elementwise numerators / denominators, NaN where the denominator is not positive"""
+    ratios = np.full(numerators.shape, np.nan)
+    np.divide(numerators, denominators, out=ratios, where=denominators > 0)
+    return ratios
+
+def competitiveness_scores(vacancies, applicants):
+    """Weighted Phase 2C/2B/2A applicant ratio per school; 0.0 when none of them had applicants"""
+    total_score = np.zeros(len(vacancies))
+    weight_sum = np.zeros(len(vacancies))
+    for phase_name, weight in SCORE_WEIGHTS:
+        column = PHASE_NAMES.index(phase_name)
+        counted = (applicants[:, column] > 0) & (vacancies[:, column] > 0)
+        ratio = phase_ratios(applicants[:, column], vacancies[:, column])
+        total_score += np.where(counted, ratio * weight, 0.0)
+        weight_sum += np.where(counted, weight, 0.0)
+    scores = np.zeros(len(vacancies))
+    np.divide(total_score, weight_sum, out=scores, where=weight_sum > 0)
+    return scores
+
+def competitiveness_tiers(scores):
+    """Tier name per score"""
+    conditions = [scores >= threshold for threshold, _ in TIER_THRESHOLDS] + [scores > 0]
+    choices = [tier for _, tier in TIER_THRESHOLDS] + ['Low']
+    return np.select(conditions, choices, default='Unknown')
+
+def competition_ratios(applicants, vacancies):
+    """Applicants per vacancy like School.get_phase_2c_figures: inf with applicants but no vacancies, 0 with neither"""
+    ratios = np.where(applicants > 0, np.inf, 0.0)
+    np.divide(applicants, vacancies, out=ratios, where=vacancies > 0)
+    return ratios
+
+def dense_ranks(values):
+    """Ascending dense rank of each value (equal values share a rank); -1 for NaN"""
+    ranks = np.full(values.shape, -1, dtype=np.int64)
+    present = ~np.isnan(values)
+    ranks[present] = np.unique(values[present], return_inverse=True)[1].reshape(-1)
+    return ranks
+
+def most_competitive_phases(ratios):
+    """Name of the phase with the highest applicant ratio per school (first on ties), None if no ratio is above 0"""
+    filled = np.nan_to_num(ratios, nan=0.0)
+    best = filled.argmax(axis=1)
+    names = np.array(PHASE_NAMES, dtype=object)[best]
+    names[filled[np.arange(len(filled)), best] <= 0] = None
+    return names
+
+def score_percentiles(scores):
+    """Share of scored schools (%) at or below each score, rounded to 0.1; NaN for unscored schools"""
+    scored = np.sort(scores[~np.isnan(scores)])
+    percentiles = np.full(scores.shape, np.nan)
+    if len(scored):
+        valid = ~np.isnan(scores)
+        percentiles[valid] = np.round(np.searchsorted(scored, scores[valid], side='right') / len(scored) * 100, 1)
+    return percentiles
+
+class PhaseStatsStore:
+    """Phase statistics of all schools as (school, phase) arrays with derived metrics"""
+
+    def __init__(self, phases_by_school, scores, total_vacancies=None):
+        """Build from one normalized {phase_name: phase_dict} per school, their stored scores and total vacancies"""
+        self.vacancies = phase_matrix(phases_by_school, 'vacancies')
+        self.applicants = phase_matrix(phases_by_school, 'applicants')
+        self.taken = phase_matrix(phases_by_school, 'taken')
+        self.balloting = phase_matrix(phases_by_school, 'balloting', default=False, dtype=bool)
+        self.ballot_vacancies = phase_matrix(phases_by_school, 'vacancies_for_ballot', detail=True)
+        self.ballot_applicants = phase_matrix(phases_by_school, 'balloting_applicants', detail=True)
+        self.scores = np.array([np.nan if score is None else score for score in scores], dtype=float)
+
+        self.ratios = phase_ratios(self.applicants, self.vacancies)
+        self.ballot_odds = phase_ratios(self.ballot_vacancies, self.ballot_applicants)
+        self.most_competitive_phase = most_competitive_phases(self.ratios)
+        self.total_applicants = self.applicants.sum(axis=1)
+        # Balloted phases record their vacancies as taken, so admissions are capped at the applicants
+        self.admitted = np.minimum(self.taken, self.applicants)
+        self.success_rates = phase_ratios(self.admitted.sum(axis=1), self.total_applicants) * 100
+        self.percentiles = score_percentiles(self.scores)
+
+        if total_vacancies is None:
+            total_vacancies = [None] * len(self.scores)
+        self.total_vacancies = np.array([np.nan if total is None else total for total in total_vacancies], dtype=float)
+        self.competition_ratios = competition_ratios(self.applicants, self.vacancies)
+
+        # Default ranking position of each row: score descending, unscored last, ties by row (School.id order)
+        default_order = np.lexsort((np.arange(len(self.scores)), -np.nan_to_num(self.scores), np.isnan(self.scores)))
+        self.default_positions = np.empty(len(default_order), dtype=np.int64)
+        self.default_positions[default_order] = np.arange(len(default_order))
+
+        self.metric_ranks = lru_cache(maxsize=len(METRIC_NAMES))(self._metric_ranks)
+        self.sort_order = lru_cache(maxsize=SORT_ORDER_MEMO_SIZE)(self._sort_order)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def analysis(self, row):
+        """Precomputed analysis of one school, as the School model methods return it"""
+        percentile = self.percentiles[row]
+        return {
+            'most_competitive_phase': self.most_competitive_phase[row],
+            'overall_success_rate': float(self.success_rates[row]) if self.total_applicants[row] > 0 else 0,
+            'competitiveness_percentile': None if np.isnan(percentile) else float(percentile)
+        }
+
+    def metric(self, name):
+        """Values of a metric in METRIC_NAMES for every school; NaN where it does not apply"""
+        if name == 'score':
+            return self.scores
+        if name == 'total_vacancy':
+            return self.total_vacancies
+        metric, column = PHASE_METRIC_NAMES[name]
+        arrays = {'ratio': self.competition_ratios, 'ballot_odds': self.ballot_odds,
+                  'vacancies': self.vacancies, 'applicants': self.applicants}
+        return arrays[metric][:, column]
+
+    def _metric_ranks(self, name):
+        return dense_ranks(self.metric(name))
+
+    def order(self, sort_keys, extra_metrics=None):
+        """Row order for (metric, descending) sort keys, most significant first
+
+        Rows without a value for a key sort after those with one; remaining
+        ties keep the default ranking order. extra_metrics maps names of
+        request-specific metrics (e.g. distance) to arrays; orders that use
+        none of them are memoized.
+        """
+        sort_keys = tuple(sort_keys)
+        if not extra_metrics or not any(name in extra_metrics for name, _ in sort_keys):
+            return self.sort_order(sort_keys)
+        return self._sort_order(sort_keys, extra_metrics)
+
+    def _sort_order(self, sort_keys, extra_metrics=None):
+        # np.lexsort sorts by its last key first
+        keys = [self.default_positions]
+        for name, descending in reversed(sort_keys):
+            if extra_metrics and name in extra_metrics:
+                ranks = dense_ranks(np.asarray(extra_metrics[name], dtype=float))
+            else:
+                ranks = self.metric_ranks(name)
+            keys.append(-ranks if descending else ranks)
+            keys.append(ranks < 0)
+        return np.lexsort(keys)
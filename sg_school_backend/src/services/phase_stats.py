@@ -0,0 +1,37 @@
+"""
+Backfill of the normalized PhaseStat table and the School Phase 2C columns
+from the phase JSON columns.
+
+New and edited schools get their PhaseStat rows and Phase 2C columns on flush
+(see ``School.sync_phase_stats`` and ``School.refresh_phase_2c_columns``);
+this covers rows written before the table and columns existed.
+"""
+from sqlalchemy.orm import undefer_group
+from src.models.user import db, School, PhaseStat
+
+def backfill_phase_stats(batch_size=200):
+    """Create or refresh PhaseStat rows and Phase 2C columns for every school; returns the number of schools processed"""
+    processed = 0
+    school_ids = [school_id for school_id, in db.session.query(School.id).order_by(School.id).all()]
+    try:
+        for start in range(0, len(school_ids), batch_size):
+            batch = School.query.options(undefer_group('phase_data')).filter(School.id.in_(school_ids[start:start + batch_size])).all()
+            for school in batch:
+                school.sync_phase_stats()
+                school.refresh_phase_2c_columns()
+                processed += 1
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    print(f"📊 Phase stats backfilled for {processed} schools ({PhaseStat.query.count()} rows)")
+    return processed
+
+def ensure_phase_stats():
+    """Backfill when schools exist but the PhaseStat table is still empty or Phase 2C columns are unset"""
+    if School.query.first() is None:
+        return 0
+    if PhaseStat.query.first() is None or School.query.filter(School.vacancies_2c.is_(None)).first() is not None:
+        return backfill_phase_stats()
+    return 0
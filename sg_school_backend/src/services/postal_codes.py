@@ -0,0 +1,131 @@
+"""
+Offline Singapore postal code -> coordinate lookup.
+
+The table is loaded once from a CSV or Parquet file with ``postal_code``,
+``latitude`` and ``longitude`` columns (``address`` is optional) and held as
+sorted NumPy arrays. Addresses that contain a known 6-digit postal code are
+resolved with a binary search instead of a OneMap request.
+
+The file location defaults to ``src/database/postal_codes.csv`` and can be
+overridden with ``POSTAL_CODES_FILE``. When no file exists the lookup is simply
+empty and geocoding falls back to OneMap.
+"""
+import csv
+import os
+import re
+import threading
+import numpy as np
+
+DEFAULT_POSTAL_CODES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'postal_codes.csv')
+
+# Six digits not embedded in a longer number, e.g. "Singapore 560123" or "S(560123)"
+POSTAL_CODE_PATTERN = re.compile(r'(?<!\d)(\d{6})(?!\d)')
+
+class PostalCodeTable:
+    """Sorted postal code arrays with binary-search lookup"""
+
+    def __init__(self, postal_codes, latitudes, longitudes, addresses=None):
+        codes = np.asarray(postal_codes, dtype=np.int32)
+        order = np.argsort(codes, kind='stable')
+        self._codes = codes[order]
+        self._latitudes = np.asarray(latitudes, dtype=np.float64)[order]
+        self._longitudes = np.asarray(longitudes, dtype=np.float64)[order]
+        self._addresses = np.asarray(addresses if addresses is not None else [''] * len(codes), dtype=object)[order]
+
+    def __len__(self):
+        return len(self._codes)
+
+    def entries(self):
+        """Yield (postal_code, latitude, longitude, address) in postal code order"""
+        for code, latitude, longitude, address in zip(self._codes.tolist(), self._latitudes.tolist(),
+                                                      self._longitudes.tolist(), self._addresses.tolist()):
+            yield f"{code:06d}", latitude, longitude, address
+
+    def lookup(self, postal_code):
+        """Return a location dictionary for a 6-digit postal code, or None"""
+        try:
+            code = int(postal_code)
+        except (TypeError, ValueError):
+            return None
+
+        position = int(np.searchsorted(self._codes, code))
+        if position >= len(self._codes) or self._codes[position] != code:
+            return None
+
+        return {
+            'latitude': float(self._latitudes[position]),
+            'longitude': float(self._longitudes[position]),
+            'address': self._addresses[position] or f"SINGAPORE {code:06d}"
+        }
+
+def _read_rows(file_path):
+    """Yield (postal_code, latitude, longitude, address) tuples from CSV or Parquet"""
+    if file_path.endswith('.parquet'):
+        import pandas as pd
+        frame = pd.read_parquet(file_path)
+        addresses = frame['address'] if 'address' in frame.columns else [''] * len(frame)
+        for postal_code, latitude, longitude, address in zip(frame['postal_code'], frame['latitude'], frame['longitude'], addresses):
+            yield postal_code, latitude, longitude, address
+    else:
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                yield row.get('postal_code'), row.get('latitude'), row.get('longitude'), row.get('address', '')
+
+def load_postal_code_table(file_path=None):
+    """Load a PostalCodeTable from file; returns an empty table if the file is missing"""
+    file_path = file_path or os.getenv('POSTAL_CODES_FILE', DEFAULT_POSTAL_CODES_FILE)
+    postal_codes, latitudes, longitudes, addresses = [], [], [], []
+
+    if not os.path.exists(file_path):
+        return PostalCodeTable(postal_codes, latitudes, longitudes, addresses)
+
+    try:
+        for postal_code, latitude, longitude, address in _read_rows(file_path):
+            try:
+                code = int(str(postal_code).strip())
+                lat = float(latitude)
+                lon = float(longitude)
+            except (TypeError, ValueError):
+                continue
+            postal_codes.append(code)
+            latitudes.append(lat)
+            longitudes.append(lon)
+            addresses.append(str(address or '').strip())
+        print(f"📮 Loaded {len(postal_codes)} postal codes from {os.path.basename(file_path)}")
+    except Exception as e:
+        print(f"⚠️  Could not load postal codes from {file_path}: {e}")
+        postal_codes, latitudes, longitudes, addresses = [], [], [], []
+
+    return PostalCodeTable(postal_codes, latitudes, longitudes, addresses)
+
+_postal_code_table = None
+_table_lock = threading.Lock()
+
+def get_postal_code_table():
+    """Get the process-wide postal code table, loading it on first use"""
+    global _postal_code_table
+    if _postal_code_table is None:
+        with _table_lock:
+            if _postal_code_table is None:
+                _postal_code_table = load_postal_code_table()
+    return _postal_code_table
+
+def reload_postal_code_table(file_path=None):
+    """Reload the postal code file and swap in the new table"""
+    global _postal_code_table
+    table = load_postal_code_table(file_path)
+    with _table_lock:
+        _postal_code_table = table
+    return len(table)
+
+def extract_postal_code(address):
+    """Return the last 6-digit postal code in an address, or None"""
+    matches = POSTAL_CODE_PATTERN.findall(address or '')
+    return matches[-1] if matches else None
+
+def lookup_address_postal_code(address):
+    """Resolve an address offline via its postal code; None if not possible"""
+    postal_code = extract_postal_code(address)
+    if not postal_code:
+        return None
+    return get_postal_code_table().lookup(postal_code)
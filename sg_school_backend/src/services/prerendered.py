@@ -0,0 +1,86 @@
+"""
+Pre-rendered JSON responses for endpoints whose output depends only on a dataset.
+
+The body is serialized with the app's JSON provider (exactly as ``jsonify``
+would) and gzipped once per dataset version and cache key, then served as
+bytes. A new dataset version means new cache keys, so responses are rendered
+again lazily after data changes and old versions age out of the LRU.
+
+Responses whose key comes from client parameters (e.g. a rankings page with
+a given limit, offset or sort) are kept in a separate LRU, so clients cycling
+through parameter values can only evict each other's pages, never the fixed
+responses such as /database or the default rankings page.
+"""
+import gzip
+import os
+import threading
+from flask import current_app, request
+from src.services.cache import LRUTTLCache
+
+PRERENDERED_CACHE_SIZE = int(os.getenv('PRERENDERED_CACHE_SIZE', 256))
+PRERENDERED_PAGE_CACHE_SIZE = int(os.getenv('PRERENDERED_PAGE_CACHE_SIZE', 256))
+PRERENDERED_TTL_SECONDS = int(os.getenv('PRERENDERED_TTL_SECONDS', 24 * 3600))
+GZIP_LEVEL = 6
+
+_rendered = LRUTTLCache(maxsize=PRERENDERED_CACHE_SIZE, ttl=PRERENDERED_TTL_SECONDS)
+_rendered_pages = LRUTTLCache(maxsize=PRERENDERED_PAGE_CACHE_SIZE, ttl=PRERENDERED_TTL_SECONDS)
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'renders': 0, 'gzip_responses': 0}
+
+def _count(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+class RenderedBody:
+    """Encoded JSON body and its gzipped form"""
+    __slots__ = ('body', 'gzipped')
+
+    def __init__(self, body):
+        self.body = body
+        gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        self.gzipped = gzipped if len(gzipped) < len(body) else None
+
+def render_json(payload):
+    """Encode a payload the way jsonify does for the current app"""
+    return RenderedBody(current_app.json.response(payload).get_data())
+
+def get_rendered(version, key, build_payload, parameterized=False):
+    """Rendered body for (version, key), calling build_payload() only on a miss"""
+    cache = _rendered_pages if parameterized else _rendered
+    cache_key = (version, key)
+    found, rendered = cache.get(cache_key)
+    if found:
+        _count('hits')
+        return rendered
+
+    rendered = render_json(build_payload())
+    cache.set(cache_key, rendered)
+    _count('renders')
+    return rendered
+
+def rendered_response(rendered, status=200):
+    """Response for a rendered body, gzipped when the client accepts it"""
+    response = current_app.response_class(status=status, mimetype=current_app.json.mimetype)
+    if rendered.gzipped is not None and request.accept_encodings['gzip']:
+        response.set_data(rendered.gzipped)
+        response.headers['Content-Encoding'] = 'gzip'
+        _count('gzip_responses')
+    else:
+        response.set_data(rendered.body)
+    response.vary.add('Accept-Encoding')
+    return response
+
+def prerendered_json(version, key, build_payload, parameterized=False):
+    """Serve a dataset-only JSON response from the pre-rendered cache
+
+    Pass parameterized=True when the key is built from client parameters.
+    """
+    return rendered_response(get_rendered(version, key, build_payload, parameterized))
+
+def get_prerendered_stats():
+    """Hit counters and size of the pre-rendered response cache"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['entries'] = len(_rendered)
+    stats['page_entries'] = len(_rendered_pages)
+    return stats
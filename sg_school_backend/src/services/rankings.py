@@ -0,0 +1,223 @@
+"""
+Competitiveness rankings read from the database.
+
+Rankings are ordered by overall_competitiveness_score (highest first), ties
+by School.id, the same order as the in-memory snapshot. Pages can be fetched
+by offset or, in constant time however deep the page, with a keyset cursor
+naming the last row already seen. Filters use the indexed tier/balloted/score
+columns and the Phase 2C columns stored on each row, so no phase JSON is
+parsed. Total counts are cached per filter combination until School data
+changes.
+
+Custom rankings (``?sort=ratio_2b:desc,total_vacancy`` and
+``?min_<metric>=``/``?max_<metric>=`` filters on any metric in
+``METRIC_NAMES``, plus distance and distance band from a given location) are
+served from the school snapshot: its PhaseStatsStore keeps a dense rank per
+metric and memoizes the row order per sort spec, so a request filters and
+slices a precomputed order instead of sorting schools in Python.
+"""
+import base64
+import json
+import os
+import threading
+import numpy as np
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import lazyload, load_only
+from src.models.user import db, School
+from src.services.cache import LRUTTLCache
+from src.services.data_events import on_school_data_changed
+from src.services.distance import distance_bands, haversine_vector
+from src.services.phase_analytics import METRIC_NAMES
+
+RANKINGS_COUNT_CACHE_SIZE = 64
+RANKINGS_COUNT_TTL_SECONDS = int(os.getenv('RANKINGS_COUNT_TTL_SECONDS', 3600))
+
+# Columns read by build_rankings_payload and the cursor; phase JSON, text columns and PhaseStat rows stay unloaded
+RANKING_COLUMNS = (
+    School.id, School.name, School.competitiveness_tier, School.balloted, School.total_vacancy,
+    School.year, School.overall_competitiveness_score, School.vacancies_2c, School.applicants_2c, School.ratio_2c
+)
+
+# Metrics available when the request gives a location
+# Largest page accepted by /rankings
+MAX_RANKINGS_LIMIT = 500
+
+LOCATION_METRICS = ('distance', 'distance_band')
+
+# Metrics reported as whole numbers
+COUNT_METRICS = ('total_vacancy', 'distance_band') + tuple(
+    name for name in METRIC_NAMES if name.startswith(('vacancies_', 'applicants_')))
+
+_counts = LRUTTLCache(maxsize=RANKINGS_COUNT_CACHE_SIZE, ttl=RANKINGS_COUNT_TTL_SECONDS)
+_count_stats_lock = threading.Lock()
+_count_stats = {'hits': 0, 'misses': 0}
+
+def _count_lookup(counter):
+    with _count_stats_lock:
+        _count_stats[counter] += 1
+
+def encode_rankings_cursor(school, position):
+    """Opaque cursor for the page after school, the row at 1-based rank position"""
+    raw = json.dumps([school.overall_competitiveness_score, school.id, position], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_rankings_cursor(cursor):
+    """(score, school_id, position) from a cursor; raises ValueError if it is malformed"""
+    try:
+        score, school_id, position = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if (score is not None and not isinstance(score, (int, float))) or isinstance(score, bool) \
+            or not isinstance(school_id, int) or not isinstance(position, int) or position < 0:
+        raise ValueError('Invalid cursor')
+    return score, school_id, position
+
+def _filtered(competitiveness_filter, balloted_bool):
+    query = School.query
+    if competitiveness_filter:
+        query = query.filter(School.competitiveness_tier == competitiveness_filter)
+    if balloted_bool is not None:
+        query = query.filter(School.balloted == balloted_bool)
+    return query
+
+def count_rankings(competitiveness_filter, balloted_bool):
+    """Number of schools matching the filters, cached per filter combination"""
+    key = (competitiveness_filter or None, balloted_bool)
+    found, total = _counts.get(key)
+    if found:
+        _count_lookup('hits')
+        return total
+
+    _count_lookup('misses')
+    total = _filtered(competitiveness_filter, balloted_bool).with_entities(db.func.count(School.id)).scalar()
+    _counts.set(key, total)
+    return total
+
+def query_rankings(competitiveness_filter, balloted_bool, limit, offset=0, after=None):
+    """One page of schools by competitiveness score, plus the total match count
+
+    after is a decoded cursor (score, school_id, position); the page then starts
+    right after that row instead of at offset.
+    """
+    query = _filtered(competitiveness_filter, balloted_bool)
+    if after is not None:
+        score, school_id = after[0], after[1]
+        if score is None:
+            query = query.filter(School.overall_competitiveness_score.is_(None), School.id > school_id)
+        else:
+            query = query.filter(or_(School.overall_competitiveness_score < score,
+                                     and_(School.overall_competitiveness_score == score, School.id > school_id)))
+
+    # Order by competitiveness score (descending), selecting only the columns the payload reads
+    query = query.options(load_only(*RANKING_COLUMNS), lazyload(School.phase_stats)).order_by(
+        School.overall_competitiveness_score.desc(), School.id)
+    if after is None:
+        query = query.offset(offset)
+    return query.limit(limit).all(), count_rankings(competitiveness_filter, balloted_bool)
+
+def _check_metric(name, location):
+    if name in LOCATION_METRICS and location is None:
+        raise ValueError(f"Metric '{name}' requires latitude and longitude")
+    if name not in METRIC_NAMES and name not in LOCATION_METRICS:
+        raise ValueError(f"Unknown metric '{name}'")
+
+def parse_sort(sort, location=None):
+    """(metric, descending) pairs from 'metric[:asc|desc],...'; descending by default"""
+    sort_keys = []
+    for part in sort.split(','):
+        name, _, direction = part.strip().partition(':')
+        _check_metric(name, location)
+        if direction not in ('', 'asc', 'desc'):
+            raise ValueError(f"Invalid sort direction '{direction}'")
+        sort_keys.append((name, direction != 'asc'))
+    return tuple(sort_keys)
+
+def parse_metric_filters(args, location=None):
+    """(metric, minimum, maximum) bounds from min_<metric>/max_<metric> query parameters"""
+    bounds = {}
+    for param, value in args.items():
+        bound, _, name = param.partition('_')
+        if bound not in ('min', 'max') or not name:
+            continue
+        _check_metric(name, location)
+        try:
+            bounds.setdefault(name, [None, None])[bound == 'max'] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for {param}")
+    return tuple((name, minimum, maximum) for name, (minimum, maximum) in sorted(bounds.items()))
+
+def parse_page(limit, offset):
+    """Check page size and offset; raises ValueError when either is out of range"""
+    if not 0 <= limit <= MAX_RANKINGS_LIMIT:
+        raise ValueError(f'limit must be between 0 and {MAX_RANKINGS_LIMIT}')
+    if offset < 0:
+        raise ValueError('offset must not be negative')
+    return limit, offset
+
+def parse_location(args):
+    """(latitude, longitude) from the query parameters, or None when not given"""
+    latitude, longitude = args.get('latitude'), args.get('longitude')
+    if latitude is None and longitude is None:
+        return None
+    try:
+        return float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError('latitude and longitude must both be numbers')
+
+def custom_rankings(snapshot, sort_keys, metric_filters, competitiveness_filter, balloted_bool, location=None):
+    """Snapshot rows in sort order that pass the filters, and a metric lookup for them
+
+    Returns (rows, metric_values) where rows is an array of indexes into
+    snapshot.records and metric_values(row, names) gives a row's metrics as
+    JSON-ready numbers (None where a metric does not apply).
+    """
+    store = snapshot.phase_stats
+    extra_metrics = {}
+    if location is not None:
+        distances = haversine_vector(location[0], location[1], snapshot.latitudes, snapshot.longitudes)
+        extra_metrics = {'distance': distances, 'distance_band': distance_bands(distances)}
+
+    def metric(name):
+        return extra_metrics[name] if name in extra_metrics else store.metric(name)
+
+    # NULL tier/balloted match no filter, as in SQL
+    mask = np.ones(len(snapshot), dtype=bool)
+    if competitiveness_filter:
+        mask &= snapshot.tiers == competitiveness_filter
+    if balloted_bool is not None:
+        mask &= snapshot.balloted_flags == balloted_bool
+    for name, minimum, maximum in metric_filters:
+        values = metric(name)
+        if minimum is not None:
+            mask &= values >= minimum
+        if maximum is not None:
+            mask &= values <= maximum
+
+    order = store.order(sort_keys or (('score', True),), extra_metrics)
+    rows = order[mask[order]]
+
+    def metric_values(row, names):
+        values = {}
+        for name in names:
+            value = float(metric(name)[row])
+            if np.isnan(value):
+                values[name] = None
+            elif name == 'distance':
+                values[name] = round(value, 2)
+            else:
+                values[name] = int(value) if name in COUNT_METRICS else value
+        return values
+
+    return rows, metric_values
+
+def get_rankings_count_stats():
+    """Hit counters and size of the rankings count cache"""
+    with _count_stats_lock:
+        stats = dict(_count_stats)
+    stats['entries'] = len(_counts)
+    return stats
+
+@on_school_data_changed
+def invalidate_rankings_counts():
+    """Drop cached counts so the next rankings request counts the current School rows"""
+    _counts.clear()
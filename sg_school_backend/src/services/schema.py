@@ -0,0 +1,77 @@
+"""
+In-place schema upgrades for databases created by older versions.
+
+``db.create_all()`` creates missing tables but leaves existing ones as they
+are. ``upgrade_schema`` adds the columns and indexes declared on the models
+that an existing table lacks. New columns start out NULL; filling them is up
+to the owning backfill (e.g. ``ensure_phase_stats`` for the Phase 2C columns).
+On PostgreSQL it also creates optional indexes that need an extension the
+database role may not be allowed to install; those are skipped with a
+warning, and the queries they speed up still work without them.
+"""
+from sqlalchemy import inspect, text
+from src.models.user import db
+
+# name: (table, statements) of optional PostgreSQL indexes, created best-effort
+OPTIONAL_POSTGRESQL_INDEXES = {
+    # Trigram index for School.name ILIKE patterns
+    'ix_school_name_trgm': ('school', (
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        'CREATE INDEX IF NOT EXISTS ix_school_name_trgm ON school USING gin (name gin_trgm_ops)',
+    )),
+}
+
+def _index_names(inspector, table):
+    # SQLite reflection skips expression indexes such as lower(name); read their names from sqlite_master
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.connect() as connection:
+            return {name for name, in connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                {'table': table.name})}
+    return {index['name'] for index in inspector.get_indexes(table.name)}
+
+def _create_optional_index(name, statements):
+    try:
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+        return True
+    except Exception as e:
+        print(f"⚠️  Skipped optional index {name}: {e}")
+        return False
+
+def upgrade_schema():
+    """Add missing columns and indexes to existing tables; returns the names added"""
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+                ))
+            added.append(f"{table.name}.{column.name}")
+
+        existing_indexes = _index_names(inspector, table)
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(db.engine)
+                added.append(index.name)
+
+        if db.engine.dialect.name == 'postgresql':
+            for name, (table_name, statements) in OPTIONAL_POSTGRESQL_INDEXES.items():
+                if table_name == table.name and name not in existing_indexes and _create_optional_index(name, statements):
+                    added.append(name)
+
+    if added:
+        print(f"🧱 Schema upgraded: added {', '.join(added)}")
+    return added
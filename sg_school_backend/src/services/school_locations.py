@@ -0,0 +1,222 @@
+"""
+School coordinate pipeline.
+
+Government school records are geocoded once and the coordinates are persisted on
+the GovernmentSchool mirror and the matching School rows. Search requests read school positions from an
+in-memory snapshot instead of calling OneMap for every school.
+
+The backfill (postal code table, then OneMap for the rest) runs in the background at
+startup and after a dataset sync that changed the mirror; it then swaps in a new index.
+The request path only reads coordinates already stored in the database.
+"""
+import threading
+from sqlalchemy.orm import undefer
+from src.models.user import db, School, GovernmentSchool
+from src.services.geocoding import geocode_address
+from src.services.government_data import get_schools_data
+from src.services.postal_codes import get_postal_code_table
+from src.services.spatial_index import SchoolSpatialIndex
+
+# Spatial index over the located schools (government fields + latitude/longitude).
+# The index owns the snapshot tuple and is replaced as a whole on refresh.
+_location_index = None
+_snapshot_lock = threading.Lock()
+# One backfill at a time (startup, dataset sync, admin refresh)
+_refresh_lock = threading.Lock()
+
+def normalize_match_name(name):
+    """Normalize a school name for exact matching between data sources"""
+    return ' '.join((name or '').lower().split())
+
+def _copy_government_fields(db_school, gov_school):
+    """Store government contact fields on a School row"""
+    db_school.address = gov_school.get('address', '')
+    db_school.postal_code = gov_school.get('postal_code', '')
+    db_school.phone = gov_school.get('phone', '')
+    db_school.email = gov_school.get('email', '')
+    db_school.website = gov_school.get('website', '')
+    db_school.mrt_desc = gov_school.get('mrt_desc', '')
+    db_school.bus_desc = gov_school.get('bus_desc', '')
+
+def backfill_school_coordinates(force=False):
+    """Geocode government schools and persist coordinates on the mirror and School rows
+
+    Coordinates already stored on the GovernmentSchool mirror, or on a School
+    row whose postal code still matches the government record, are reused
+    unless ``force`` is set. Returns the list of located government school
+    dictionaries.
+    """
+    gov_schools = get_schools_data()
+    if not gov_schools:
+        return []
+
+    db_schools = {}
+    for db_school in School.query.order_by(School.id).all():
+        db_schools.setdefault(normalize_match_name(db_school.name), db_school)
+    mirror_rows = {normalize_match_name(row.name): row for row in GovernmentSchool.query.all()}
+
+    located = []
+    geocoded_count = 0
+    updated_count = 0
+
+    for gov_school in gov_schools:
+        match_name = normalize_match_name(gov_school['name'])
+        db_school = db_schools.get(match_name)
+        mirror_row = mirror_rows.get(match_name)
+        postal_code = gov_school.get('postal_code', '')
+
+        stored_location = None
+        if not force:
+            if mirror_row is not None and mirror_row.latitude is not None and mirror_row.longitude is not None:
+                stored_location = (mirror_row.latitude, mirror_row.longitude)
+            elif (db_school is not None and db_school.latitude is not None and db_school.longitude is not None
+                    and (db_school.postal_code or '') == postal_code):
+                stored_location = (db_school.latitude, db_school.longitude)
+
+        if stored_location:
+            latitude, longitude = stored_location
+        else:
+            location = get_postal_code_table().lookup(postal_code)
+            if not location:
+                location = geocode_address(gov_school['address'])
+                geocoded_count += 1
+            if not location:
+                continue
+            latitude, longitude = location['latitude'], location['longitude']
+
+        if db_school is not None and (db_school.latitude != latitude or db_school.longitude != longitude
+                                      or (db_school.postal_code or '') != postal_code):
+            _copy_government_fields(db_school, gov_school)
+            db_school.latitude = latitude
+            db_school.longitude = longitude
+            updated_count += 1
+        if mirror_row is not None and (mirror_row.latitude != latitude or mirror_row.longitude != longitude):
+            mirror_row.latitude = latitude
+            mirror_row.longitude = longitude
+            updated_count += 1
+
+        school = dict(gov_school)
+        school['latitude'] = latitude
+        school['longitude'] = longitude
+        located.append(school)
+
+    if updated_count:
+        try:
+            db.session.commit()
+        except Exception as e:
+            print(f"Error saving school coordinates: {e}")
+            db.session.rollback()
+
+    print(f"📍 Located {len(located)} schools ({geocoded_count} geocoded, {updated_count} rows updated)")
+    return located
+
+def _locations_from_mirror():
+    """Build located schools from coordinates stored on the GovernmentSchool mirror (no network calls)"""
+    schools = []
+    located_rows = (GovernmentSchool.query
+                    .filter(GovernmentSchool.latitude.isnot(None), GovernmentSchool.longitude.isnot(None))
+                    .order_by(GovernmentSchool.id))
+    for row in located_rows.all():
+        school = row.to_dict()
+        school['latitude'] = row.latitude
+        school['longitude'] = row.longitude
+        schools.append(school)
+    return schools
+
+def _locations_from_database():
+    """Build located schools from stored School coordinates (no network calls)"""
+    schools = []
+    located_schools = (School.query.options(undefer(School.mrt_desc), undefer(School.bus_desc))
+                       .filter(School.latitude.isnot(None), School.longitude.isnot(None)).order_by(School.id))
+    for db_school in located_schools.all():
+        schools.append({
+            'name': db_school.name,
+            'address': db_school.address or '',
+            'postal_code': db_school.postal_code or '',
+            'phone': db_school.phone or '',
+            'email': db_school.email or '',
+            'website': db_school.website or '',
+            'mrt_desc': db_school.mrt_desc or '',
+            'bus_desc': db_school.bus_desc or '',
+            'latitude': db_school.latitude,
+            'longitude': db_school.longitude
+        })
+    return schools
+
+def _load_stored_locations():
+    """Located schools from stored coordinates: the government mirror, else the School table"""
+    return _locations_from_mirror() or _locations_from_database()
+
+def get_school_index():
+    """Get the spatial index of located schools, building it from stored coordinates on first use
+
+    Never geocodes; schools without stored coordinates appear once the background
+    backfill has located them and swapped in a new index.
+    """
+    global _location_index
+    index = _location_index
+    if index is None:
+        with _snapshot_lock:
+            if _location_index is None:
+                _location_index = SchoolSpatialIndex(_load_stored_locations())
+            index = _location_index
+    return index
+
+def get_school_locations():
+    """Get located schools from the snapshot
+
+    Returns fresh dictionaries so callers can annotate them per request.
+    """
+    return [dict(school) for school in get_school_index().schools]
+
+def find_schools_within(latitude, longitude, radius_km):
+    """Get located schools within radius_km, nearest first, with a 'distance' field"""
+    index = get_school_index()
+    schools = []
+    for position, distance in index.within_radius(latitude, longitude, radius_km):
+        school = dict(index.schools[position])
+        school['distance'] = round(distance, 2)
+        schools.append(school)
+    return schools
+
+def find_nearest_schools(latitude, longitude, k=5):
+    """Get the k nearest located schools with a 'distance' field"""
+    index = get_school_index()
+    schools = []
+    for position, distance in index.nearest(latitude, longitude, k):
+        school = dict(index.schools[position])
+        school['distance'] = round(distance, 2)
+        schools.append(school)
+    return schools
+
+def refresh_school_locations(force=False):
+    """Re-run the coordinate backfill and atomically swap in the new index
+
+    Returns the number of located schools.
+    """
+    global _location_index
+    with _refresh_lock:
+        located = backfill_school_coordinates(force=force)
+        if not located:
+            # Government data unavailable - fall back to coordinates already in the database
+            located = _load_stored_locations()
+    index = SchoolSpatialIndex(located)
+    if len(index):
+        with _snapshot_lock:
+            _location_index = index
+    return len(index)
+
+def _run_location_backfill(app):
+    with app.app_context():
+        try:
+            refresh_school_locations()
+        except Exception as e:
+            print(f"❌ School coordinate backfill failed: {e}")
+        finally:
+            db.session.remove()
+
+def start_location_backfill(app):
+    """Locate schools without stored coordinates in a background thread"""
+    thread = threading.Thread(target=_run_location_backfill, args=(app,), daemon=True, name='location-backfill')
+    thread.start()
+    return thread
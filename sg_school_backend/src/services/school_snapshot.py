@@ -0,0 +1,165 @@
+"""
+Immutable in-memory snapshot of the P1 school dataset.
+
+The School table is small and read-only at runtime, so read endpoints serve it
+from a ``SchoolSnapshot``: one ``SchoolRecord`` per row with its phases parsed
+up front, plus indexes by school_key, name, competitiveness tier and balloted
+flag, a ``PhaseStatsStore`` of every school's phase figures and a content hash
+identifying the dataset version. The snapshot is built on first use, dropped
+when School data changes and replaced as a whole, so a request always sees one
+consistent version.
+
+Records reuse the School model's formatting methods and read their analysis
+from the store, so every response is identical to the one built from ORM
+objects.
+"""
+import bisect
+import hashlib
+import json
+import threading
+import numpy as np
+from src.models.user import School, PHASE_NAMES, SCHOOL_FULL_LOAD
+from src.services.data_events import on_school_data_changed
+from src.services.phase_analytics import PhaseStatsStore
+
+RECORD_FIELDS = (
+    'id', 'school_key', 'name', 'total_vacancy', 'balloted', 'year',
+    'overall_competitiveness_score', 'competitiveness_tier', 'vacancies_2c', 'applicants_2c', 'ratio_2c',
+    'address', 'postal_code', 'phone', 'email', 'website', 'mrt_desc', 'bus_desc', 'latitude', 'longitude'
+)
+
+def _copy_nested(data):
+    """Copy a parsed dictionary together with its nested dictionaries and lists"""
+    return {key: value.copy() if isinstance(value, (dict, list)) else value for key, value in data.items()}
+
+class SchoolRecord:
+    """Read-only copy of one School row"""
+    __slots__ = RECORD_FIELDS + ('_phases', '_competitiveness_metrics', '_analysis')
+
+    def __init__(self, school):
+        for field in RECORD_FIELDS:
+            object.__setattr__(self, field, getattr(school, field))
+        object.__setattr__(self, '_phases', {phase: school.get_phase_data(phase) for phase in PHASE_NAMES})
+        object.__setattr__(self, '_competitiveness_metrics', school.get_competitiveness_metrics())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('SchoolRecord is read-only')
+
+    def __repr__(self):
+        return f'<SchoolRecord {self.name}>'
+
+    def get_phase_data(self, phase_name):
+        """Same as School.get_phase_data; returns a copy"""
+        return _copy_nested(self._phases.get(phase_name, {}))
+
+    def get_competitiveness_metrics(self):
+        """Same as School.get_competitiveness_metrics; returns a copy"""
+        return _copy_nested(self._competitiveness_metrics)
+
+    # Analysis computed for all schools at once by the snapshot's PhaseStatsStore
+    def _get_most_competitive_phase(self, phases_data=None):
+        return self._analysis['most_competitive_phase']
+
+    def get_most_competitive_phase(self):
+        return self._analysis['most_competitive_phase']
+
+    def calculate_overall_success_rate(self):
+        return self._analysis['overall_success_rate']
+
+    def get_competitiveness_percentile(self):
+        return self._analysis['competitiveness_percentile']
+
+    # Formatting and analysis are shared with the model so outputs cannot drift apart
+    to_dict = School.to_dict
+    to_p1_data_format = School.to_p1_data_format
+    get_phase_2c_figures = School.get_phase_2c_figures
+    get_strategy_recommendation = School.get_strategy_recommendation
+
+def _score_order(record):
+    # Highest score first like ORDER BY ... DESC; missing scores last, ties by id
+    score = record.overall_competitiveness_score
+    return (score is None, -(score or 0.0), record.id)
+
+def ranking_position(ranked, score, school_id):
+    """Index in a ranking of the first record after the one with this score and id"""
+    return bisect.bisect_right(ranked, (score is None, -(score or 0.0), school_id), key=_score_order)
+
+class SchoolSnapshot:
+    """All School records with lookup indexes, columnar phase statistics and a version hash"""
+
+    def __init__(self, records):
+        self.records = tuple(sorted(records, key=lambda record: record.id))
+        self.phase_stats = PhaseStatsStore([record._phases for record in self.records],
+                                           [record.overall_competitiveness_score for record in self.records],
+                                           [record.total_vacancy for record in self.records])
+        for row, record in enumerate(self.records):
+            object.__setattr__(record, '_analysis', self.phase_stats.analysis(row))
+
+        # Row-aligned columns for filtering and distance in custom rankings
+        self.tiers = np.array([record.competitiveness_tier for record in self.records], dtype=object)
+        self.balloted_flags = np.array([record.balloted for record in self.records], dtype=object)
+        self.latitudes = np.array([np.nan if record.latitude is None else record.latitude for record in self.records], dtype=float)
+        self.longitudes = np.array([np.nan if record.longitude is None else record.longitude for record in self.records], dtype=float)
+
+        self.by_key = {}
+        self.by_name = {}
+        for record in self.records:
+            self.by_key.setdefault(record.school_key, record)
+            self.by_name.setdefault(record.name.lower(), record)
+
+        # Competitiveness rankings, overall and per tier / balloted flag (NULLs match no filter, as in SQL)
+        self.ranked = tuple(sorted(self.records, key=_score_order))
+        ranked_by_tier = {}
+        ranked_by_balloted = {}
+        for record in self.ranked:
+            ranked_by_tier.setdefault(record.competitiveness_tier, []).append(record)
+            ranked_by_balloted.setdefault(record.balloted, []).append(record)
+        self.ranked_by_tier = {tier: tuple(records) for tier, records in ranked_by_tier.items() if tier is not None}
+        self.ranked_by_balloted = {flag: tuple(records) for flag, records in ranked_by_balloted.items() if flag is not None}
+
+        content = json.dumps([[record.id, record.school_key, record.to_dict()] for record in self.records],
+                             sort_keys=True, default=str)
+        self.version = hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self.records)
+
+    def rankings(self, tier=None, balloted=None):
+        """Records by competitiveness score, optionally filtered by tier and balloted flag"""
+        if tier is not None:
+            records = self.ranked_by_tier.get(tier, ())
+            if balloted is not None:
+                records = tuple(record for record in records if record.balloted == balloted)
+            return records
+        if balloted is not None:
+            return self.ranked_by_balloted.get(balloted, ())
+        return self.ranked
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+def build_school_snapshot():
+    """Load every School row into a new snapshot"""
+    return SchoolSnapshot(SchoolRecord(school) for school in School.query.options(*SCHOOL_FULL_LOAD).order_by(School.id).all())
+
+def get_school_snapshot():
+    """Get the current snapshot, building it on first use; None if the database can't be read"""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                try:
+                    _snapshot = build_school_snapshot()
+                except Exception as e:
+                    print(f"Error building school snapshot: {e}")
+                    return None
+            snapshot = _snapshot
+    return snapshot
+
+@on_school_data_changed
+def invalidate_school_snapshot():
+    """Drop the snapshot so the next read rebuilds it from the current School rows"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
@@ -0,0 +1,118 @@
+"""
+In-process spatial index over school coordinates.
+
+Schools are bucketed into a uniform latitude/longitude grid whose cells are at
+least ``cell_km`` wide. Radius and nearest-neighbour queries only visit the
+cells that can contain a match and use the vectorized haversine as the exact
+final check. Instances are immutable - rebuild and swap the whole index when
+the school set changes.
+"""
+import math
+import numpy as np
+from src.services.distance import haversine_vector
+
+KM_PER_DEGREE_LAT = 111.32
+
+class SchoolSpatialIndex:
+    """Uniform grid index answering radius and k-nearest queries"""
+
+    def __init__(self, schools, cell_km=1.0):
+        """Build the index from dictionaries with 'latitude' and 'longitude' keys"""
+        self.schools = tuple(schools)
+        self.cell_km = cell_km
+        self._cells = {}
+        self._latitudes = np.array([school['latitude'] for school in self.schools], dtype=np.float64)
+        self._longitudes = np.array([school['longitude'] for school in self.schools], dtype=np.float64)
+
+        max_abs_lat = max((abs(school['latitude']) for school in self.schools), default=0.0)
+        # Size longitude cells at the highest latitude so no cell is narrower than cell_km
+        self._lat_step = cell_km / KM_PER_DEGREE_LAT
+        self._lon_step = cell_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(max_abs_lat)), 0.01))
+
+        for position, school in enumerate(self.schools):
+            cell = self._cell_for(school['latitude'], school['longitude'])
+            self._cells.setdefault(cell, []).append(position)
+        self._cells = {cell: np.array(positions, dtype=np.intp) for cell, positions in self._cells.items()}
+
+        if self._cells:
+            rows = [cell[0] for cell in self._cells]
+            cols = [cell[1] for cell in self._cells]
+            self._bounds = (min(rows), max(rows), min(cols), max(cols))
+        else:
+            self._bounds = None
+
+    def __len__(self):
+        return len(self.schools)
+
+    def _cell_for(self, latitude, longitude):
+        return (math.floor(latitude / self._lat_step), math.floor(longitude / self._lon_step))
+
+    def _distances(self, latitude, longitude, cell_positions):
+        if not cell_positions:
+            return []
+        positions = np.concatenate(cell_positions)
+        distances = haversine_vector(latitude, longitude, self._latitudes[positions], self._longitudes[positions])
+        return list(zip(positions.tolist(), distances.tolist()))
+
+    def distances_from(self, latitude, longitude):
+        """Distances in km from one origin to every indexed school, in index order"""
+        return haversine_vector(latitude, longitude, self._latitudes, self._longitudes)
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """Return (position, distance_km) pairs within radius_km, nearest first"""
+        if self._bounds is None or radius_km < 0:
+            return []
+
+        # Degree deltas covering the radius, widened for the query latitude
+        delta_lat = radius_km / KM_PER_DEGREE_LAT
+        widest_lat = min(abs(latitude) + delta_lat, 89.0)
+        delta_lon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(widest_lat)), 0.01))
+
+        min_row, min_col = self._cell_for(latitude - delta_lat, longitude - delta_lon)
+        max_row, max_col = self._cell_for(latitude + delta_lat, longitude + delta_lon)
+        min_row, max_row = max(min_row, self._bounds[0]), min(max_row, self._bounds[1])
+        min_col, max_col = max(min_col, self._bounds[2]), min(max_col, self._bounds[3])
+
+        candidates = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                if (row, col) in self._cells:
+                    candidates.append(self._cells[(row, col)])
+
+        matches = [(position, distance) for position, distance in self._distances(latitude, longitude, candidates)
+                   if distance <= radius_km]
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def nearest(self, latitude, longitude, k=5):
+        """Return the k nearest (position, distance_km) pairs, nearest first"""
+        if self._bounds is None or k <= 0:
+            return []
+        if k >= len(self.schools):
+            matches = self._distances(latitude, longitude, [np.arange(len(self.schools), dtype=np.intp)])
+            matches.sort(key=lambda match: (match[1], match[0]))
+            return matches
+
+        center_row, center_col = self._cell_for(latitude, longitude)
+        max_ring = max(
+            abs(center_row - self._bounds[0]), abs(center_row - self._bounds[1]),
+            abs(center_col - self._bounds[2]), abs(center_col - self._bounds[3])
+        )
+
+        matches = []
+        for ring in range(max_ring + 1):
+            ring_positions = []
+            for row in range(center_row - ring, center_row + ring + 1):
+                for col in range(center_col - ring, center_col + ring + 1):
+                    if max(abs(row - center_row), abs(col - center_col)) == ring and (row, col) in self._cells:
+                        ring_positions.append(self._cells[(row, col)])
+            matches.extend(self._distances(latitude, longitude, ring_positions))
+
+            # Anything outside the searched rings is at least `ring` full cells away
+            if len(matches) >= k:
+                matches.sort(key=lambda match: (match[1], match[0]))
+                if matches[k - 1][1] <= ring * self.cell_km * 0.99:
+                    break
+
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches[:k]
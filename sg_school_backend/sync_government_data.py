@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Sync the local GovernmentSchool mirror with the data.gov.sg school dataset
+
+Only records whose content changed are written. Run it on a schedule (cron) or
+rely on the in-process job controlled by DATASET_SYNC_INTERVAL_SECONDS.
+
+Usage:
+    python sync_government_data.py
+"""
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from flask import Flask
+
+from src.config import get_database_url
+from src.models.user import db
+from src.services import government_data
+from src.services.dataset_sync import sync_government_schools
+from src.services.schema import upgrade_schema
+
+def create_app():
+    """Create Flask app for the sync, without the web app's startup work and background jobs"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    # Government school data is read from the local mirror
+    government_data.init_app(app)
+    return app
+
+if __name__ == "__main__":
+    app = create_app()
+    print("🚀 Starting government dataset sync...")
+
+    with app.app_context():
+        # Create tables, columns and indexes the web app would create on startup
+        db.create_all()
+        upgrade_schema()
+        try:
+            result = sync_government_schools()
+        except Exception as e:
+            print(f"\n❌ Sync failed: {e}")
+            sys.exit(1)
+
+    print(f"\n🎉 Sync completed: {result}")